@@ -0,0 +1,138 @@
+/**
+ * Binary Stats Decoding
+ *
+ * Counterpart of binary_protocol.py on the PC. The byte stream from the PC
+ * carries newline-delimited JSON messages and length-prefixed binary stats
+ * frames:
+ *
+ *   u8  0xB5 magic | u16 payload length | u16 schema_id | u32 seq | values...
+ *
+ * Slot order and types come from the JSON "stats_schema" message.
+ */
+
+const MAGIC = 0xB5;
+const HEADER_SIZE = 3;
+const U16_NULL = 0xFFFF;
+
+/**
+ * Splits incoming chunks into complete JSON messages and binary frames.
+ */
+class FrameSplitter {
+    constructor() {
+        this.buffer = Buffer.alloc(0);
+    }
+
+    /**
+     * Add received bytes.
+     * @returns {Array} [{kind: 'json', message}] / [{kind: 'binary', frame}]
+     */
+    feed(chunk) {
+        this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk;
+        const out = [];
+
+        while (this.buffer.length) {
+            if (this.buffer[0] === MAGIC) {
+                if (this.buffer.length < HEADER_SIZE) break;
+                const end = HEADER_SIZE + this.buffer.readUInt16LE(1);
+                if (this.buffer.length < end) break;
+                out.push({ kind: 'binary', frame: this.buffer.subarray(0, end) });
+                this.buffer = this.buffer.subarray(end);
+            } else {
+                const newline = this.buffer.indexOf(0x0A);
+                if (newline < 0) break;
+                const line = this.buffer.subarray(0, newline).toString('utf8').trim();
+                this.buffer = this.buffer.subarray(newline + 1);
+                if (line) {
+                    try {
+                        out.push({ kind: 'json', message: JSON.parse(line) });
+                    } catch (err) {
+                        console.error('Error parsing USB message:', err);
+                    }
+                }
+            }
+        }
+
+        // Don't keep a reference to the (possibly large) original chunk
+        if (this.buffer.length) this.buffer = Buffer.from(this.buffer);
+        return out;
+    }
+}
+
+/**
+ * Decodes binary frames using the schemas announced by the PC.
+ */
+class BinaryStatsDecoder {
+    constructor() {
+        this.schemas = new Map();
+    }
+
+    applySchema(message) {
+        const fields = [...(message.fields || [])].sort((a, b) => a.slot - b.slot);
+        this.schemas.set(message.schema_id, fields);
+    }
+
+    hasSchema(schemaId) {
+        return this.schemas.has(schemaId);
+    }
+
+    /**
+     * @returns {{seq: number, schemaId: number, data: object|null}}
+     *          data is null when the schema is unknown
+     */
+    decode(frame) {
+        const schemaId = frame.readUInt16LE(3);
+        const seq = frame.readUInt32LE(5);
+        const fields = this.schemas.get(schemaId);
+        if (!fields) return { seq, schemaId, data: null };
+
+        const data = {};
+        let offset = 9;
+
+        for (const field of fields) {
+            let value;
+            if (field.type === 'f32') {
+                value = frame.readFloatLE(offset);
+                offset += 4;
+                // Undo float32 noise (45.2 -> 45.20000076) for display
+                value = Number.isNaN(value) ? null : parseFloat(value.toPrecision(7));
+            } else if (field.type === 'u16' || field.type === 'bool') {
+                value = frame.readUInt16LE(offset);
+                offset += 2;
+                if (value === U16_NULL) value = null;
+                else if (field.type === 'bool') value = value !== 0;
+            } else {
+                const length = frame.readUInt16LE(offset);
+                offset += 2;
+                if (length === U16_NULL) {
+                    value = null;
+                } else {
+                    value = frame.toString('utf8', offset, offset + length);
+                    offset += length;
+                }
+            }
+            setPath(data, field.source, value);
+        }
+
+        return { seq, schemaId, data };
+    }
+}
+
+// Write a value at 'cpu.usage' / 'cpu.cores[3]' style paths
+function setPath(data, source, value) {
+    const keys = source.split('.');
+    let node = data;
+    for (let i = 0; i < keys.length - 1; i++) {
+        if (!node[keys[i]]) node[keys[i]] = {};
+        node = node[keys[i]];
+    }
+    const last = keys[keys.length - 1];
+    const match = last.match(/^(.*)\[(\d+)\]$/);
+    if (match) {
+        if (!node[match[1]]) node[match[1]] = [];
+        node[match[1]][Number(match[2])] = value;
+    } else {
+        node[last] = value;
+    }
+}
+
+module.exports = { FrameSplitter, BinaryStatsDecoder, MAGIC };
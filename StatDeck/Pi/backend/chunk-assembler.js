@@ -0,0 +1,111 @@
+/**
+ * Chunked Message Reassembly
+ *
+ * Counterpart of usb/chunked_transfer.py on the PC. Large messages (layouts)
+ * arrive as "chunk" messages interleaved with stats:
+ *
+ *   {type: 'chunk', id, seq, total, crc, data: <base64>}
+ *
+ * Chunks are accepted strictly in order. A corrupted or missing chunk is
+ * answered with {type: 'chunk_ack', id, next} asking the PC to continue
+ * from `next`; the same message, sent on reconnect, resumes an interrupted
+ * transfer. The partial transfer survives disconnects for that reason.
+ */
+
+const CRC_TABLE = (() => {
+    const table = new Uint32Array(256);
+    for (let n = 0; n < 256; n++) {
+        let c = n;
+        for (let k = 0; k < 8; k++) {
+            c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+        }
+        table[n] = c >>> 0;
+    }
+    return table;
+})();
+
+/**
+ * CRC-32 (same as Python's zlib.crc32)
+ */
+function crc32(buffer) {
+    let crc = 0xFFFFFFFF;
+    for (let i = 0; i < buffer.length; i++) {
+        crc = CRC_TABLE[(crc ^ buffer[i]) & 0xFF] ^ (crc >>> 8);
+    }
+    return (crc ^ 0xFFFFFFFF) >>> 0;
+}
+
+class ChunkAssembler {
+    constructor() {
+        this.transfer = null;
+    }
+
+    /**
+     * Add a received chunk.
+     * @returns {{ack: object|null, message: object|null}}
+     *          ack: chunk_ack to send back; message: the completed message
+     */
+    feed(chunk) {
+        const { id, seq, total } = chunk;
+        let transfer = this.transfer;
+
+        if (!transfer || transfer.id !== id) {
+            // A new transfer replaces any unfinished one
+            transfer = this.transfer = { id, total, next: 0, parts: [], requested: null };
+        }
+
+        if (seq < transfer.next) {
+            // Already have it (resent after a rewind)
+            return { ack: null, message: null };
+        }
+
+        if (seq > transfer.next) {
+            // Missed one: ask once, and ignore the chunks already in flight
+            // behind it
+            if (transfer.requested === transfer.next) {
+                return { ack: null, message: null };
+            }
+            transfer.requested = transfer.next;
+            return { ack: this.ack(), message: null };
+        }
+
+        const piece = Buffer.from(chunk.data || '', 'base64');
+        if (crc32(piece) !== chunk.crc) {
+            console.warn(`Chunk ${seq}/${total} of ${id} failed its checksum`);
+            transfer.requested = transfer.next;
+            return { ack: this.ack(), message: null };
+        }
+
+        transfer.parts.push(piece);
+        transfer.next++;
+        transfer.requested = null;
+        if (transfer.next < transfer.total) {
+            return { ack: null, message: null };
+        }
+
+        this.transfer = null;
+        try {
+            return { ack: null, message: JSON.parse(Buffer.concat(transfer.parts).toString('utf8')) };
+        } catch (err) {
+            console.error('Error parsing chunked message:', err);
+            return { ack: null, message: null };
+        }
+    }
+
+    /**
+     * chunk_ack for the unfinished transfer (null if there is none)
+     */
+    ack() {
+        if (!this.transfer) {
+            return null;
+        }
+        return {
+            type: 'chunk_ack',
+            id: this.transfer.id,
+            next: this.transfer.next,
+            timestamp: Date.now()
+        };
+    }
+}
+
+module.exports = { ChunkAssembler, crc32 };
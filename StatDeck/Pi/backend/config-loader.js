@@ -2,6 +2,10 @@
  * Configuration Loader
  * 
  * Handles loading and saving layout configuration.
+ * 
+ * Layouts the PC sends with a content hash are also kept in a small cache
+ * (config/layouts/<hash>.json) so a later profile switch back to one of
+ * them only needs an "activate" message with the hash.
  */
 
 const fs = require('fs');
@@ -9,11 +13,16 @@ const path = require('path');
 
 const CONFIG_DIR = path.join(__dirname, 'config');
 const CONFIG_FILE = path.join(CONFIG_DIR, 'layout.json');
+const HASH_FILE = path.join(CONFIG_DIR, 'layout.hash');
+const CACHE_DIR = path.join(CONFIG_DIR, 'layouts');
+const MAX_CACHED = 16;
+const HASH_PATTERN = /^[0-9a-f]{64}$/;
 const EXAMPLE_CONFIG = path.join(__dirname, '../../Shared/example-layout.json');
 
 class ConfigLoader {
     constructor() {
         this.currentConfig = null;
+        this.currentHash = null;
         this.ensureConfigDir();
     }
     
@@ -29,6 +38,7 @@ class ConfigLoader {
             if (fs.existsSync(CONFIG_FILE)) {
                 const data = fs.readFileSync(CONFIG_FILE, 'utf8');
                 this.currentConfig = JSON.parse(data);
+                this.currentHash = this.readHash();
                 console.log('Loaded configuration from', CONFIG_FILE);
                 return this.currentConfig;
             }
@@ -57,14 +67,29 @@ class ConfigLoader {
         }
     }
     
-    save(config) {
+    save(config, hash = null) {
+        if (hash && !HASH_PATTERN.test(hash)) {
+            hash = null;
+        }
+        if (hash && hash === this.currentHash && this.currentConfig !== null) {
+            // Same layout again (e.g. resent after a reconnect)
+            return true;
+        }
         try {
             this.ensureConfigDir();
             
             const data = JSON.stringify(config, null, 2);
             fs.writeFileSync(CONFIG_FILE, data, 'utf8');
             
+            if (hash) {
+                fs.writeFileSync(HASH_FILE, hash, 'utf8');
+                this.cacheLayout(hash, data);
+            } else if (fs.existsSync(HASH_FILE)) {
+                fs.unlinkSync(HASH_FILE);
+            }
+            
             this.currentConfig = config;
+            this.currentHash = hash;
             console.log('Configuration saved to', CONFIG_FILE);
             
             return true;
@@ -74,6 +99,79 @@ class ConfigLoader {
         }
     }
     
+    /**
+     * Make a cached layout current.
+     * @param {string} hash - Content hash sent by the PC
+     * @returns {Object|null} The layout, or null if it isn't cached
+     */
+    activate(hash) {
+        if (!HASH_PATTERN.test(hash || '')) {
+            return null;
+        }
+        if (hash === this.currentHash && this.currentConfig !== null) {
+            return this.currentConfig;
+        }
+        try {
+            const file = path.join(CACHE_DIR, hash + '.json');
+            const config = JSON.parse(fs.readFileSync(file, 'utf8'));
+            // Bump it so pruning keeps recently used layouts
+            const now = new Date();
+            fs.utimesSync(file, now, now);
+            return this.save(config, hash) ? config : null;
+        } catch (err) {
+            return null;
+        }
+    }
+    
+    /**
+     * Hashes of the layouts in the cache (most recently used first).
+     */
+    getCachedHashes() {
+        return this.listCache().map(entry => entry.hash);
+    }
+    
+    getCurrentHash() {
+        return this.currentHash;
+    }
+    
+    readHash() {
+        try {
+            const hash = fs.readFileSync(HASH_FILE, 'utf8').trim();
+            return HASH_PATTERN.test(hash) ? hash : null;
+        } catch (err) {
+            return null;
+        }
+    }
+    
+    cacheLayout(hash, data) {
+        try {
+            if (!fs.existsSync(CACHE_DIR)) {
+                fs.mkdirSync(CACHE_DIR, { recursive: true });
+            }
+            fs.writeFileSync(path.join(CACHE_DIR, hash + '.json'), data, 'utf8');
+            
+            for (const entry of this.listCache().slice(MAX_CACHED)) {
+                fs.unlinkSync(path.join(CACHE_DIR, entry.hash + '.json'));
+            }
+        } catch (err) {
+            console.error('Error caching layout:', err);
+        }
+    }
+    
+    listCache() {
+        try {
+            return fs.readdirSync(CACHE_DIR)
+                .filter(name => HASH_PATTERN.test(name.replace(/\.json$/, '')))
+                .map(name => ({
+                    hash: name.replace(/\.json$/, ''),
+                    mtime: fs.statSync(path.join(CACHE_DIR, name)).mtimeMs
+                }))
+                .sort((a, b) => b.mtime - a.mtime);
+        } catch (err) {
+            return [];
+        }
+    }
+    
     getDefaultConfig() {
         return {
             version: '1.0',
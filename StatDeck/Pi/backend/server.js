@@ -14,12 +14,17 @@ const path = require('path');
 const fs = require('fs');
 const USBHandler = require('./usb/usb-handler');
 const ConfigLoader = require('./config-loader');
+const { BinaryStatsDecoder } = require('./binary-stats');
+const { ChunkAssembler } = require('./chunk-assembler');
 
 // Configuration
 const HTTP_PORT = 3000;
 const WS_PORT = 3001;
 const USB_PORT = '/dev/ttyGS0';  // USB gadget serial port
 
+// Optional protocol features this backend understands (negotiated via hello)
+const PI_FEATURES = ['stats_delta', 'stats_binary', 'layout_hash', 'chunked'];
+
 // Initialize Express app
 const app = express();
 
@@ -46,6 +51,19 @@ console.log(`WebSocket server listening on port ${WS_PORT}`);
 // Track connected clients
 let clients = new Set();
 
+// Last full stats frame, kept so stats_delta messages can be applied
+let statsState = null;
+let statsSeq = null;
+
+// Schemas for binary stats frames
+const binaryDecoder = new BinaryStatsDecoder();
+
+// Large messages sent in chunks (kept across reconnects to resume)
+const chunkAssembler = new ChunkAssembler();
+
+// Page the frontend is showing (the PC streams only that page's values)
+let activePage = null;
+
 wss.on('connection', (ws) => {
     console.log('Frontend client connected');
     clients.add(ws);
@@ -82,10 +100,16 @@ wss.on('connection', (ws) => {
 const usb = new USBHandler(USB_PORT);
 
 // Handle incoming messages from Windows PC
-usb.on('message', (message) => {
+usb.on('message', handlePCMessage);
+
+function handlePCMessage(message) {
     const msgType = message.type;
     
     if (msgType === 'stats') {
+        // Full frame (keyframe)
+        statsState = message.data;
+        statsSeq = message.seq;
+        
         // Broadcast stats to all connected frontend clients
         broadcastToClients({
             type: 'stats',
@@ -93,12 +117,65 @@ usb.on('message', (message) => {
             timestamp: message.timestamp
         });
     }
+    else if (msgType === 'stats_delta') {
+        // Only changed values since frame `base`; resync if we missed it
+        if (statsState === null || message.base !== statsSeq) {
+            usb.send({ type: 'keyframe_request', timestamp: Date.now() });
+            return;
+        }
+        
+        applyDelta(statsState, message.data);
+        statsSeq = message.seq;
+        
+        // Frontend always gets full frames
+        broadcastToClients({
+            type: 'stats',
+            data: statsState,
+            timestamp: message.timestamp
+        });
+    }
+    else if (msgType === 'stats_schema') {
+        // Slot layout for the binary frames that follow
+        binaryDecoder.applySchema(message);
+    }
+    else if (msgType === 'chunk') {
+        // Piece of a large message; handled once complete
+        const { ack, message: complete } = chunkAssembler.feed(message);
+        if (ack) {
+            usb.send(ack);
+        }
+        if (complete) {
+            handlePCMessage(complete);
+        }
+    }
+    else if (msgType === 'hello') {
+        // Acknowledge the subset of offered features we support
+        const offered = message.features || [];
+        if (offered.includes('chunked') && chunkAssembler.ack()) {
+            // Before hello_ack, so the PC knows where to resume when it
+            // re-sends the layout
+            usb.send(chunkAssembler.ack());
+        }
+        const ack = {
+            type: 'hello_ack',
+            features: offered.filter(f => PI_FEATURES.includes(f)),
+            timestamp: Date.now()
+        };
+        if (ack.features.includes('layout_hash')) {
+            // Lets the PC skip or shorten the layout sync
+            Object.assign(ack, layoutState());
+        }
+        usb.send(ack);
+        if (activePage !== null) {
+            sendPage();
+        }
+    }
     else if (msgType === 'config') {
         // New configuration from PC
         const layout = message.layout;
         
-        // Save configuration
-        ConfigLoader.save(layout);
+        // Save configuration (hash is present when layout_hash was negotiated)
+        ConfigLoader.save(layout, message.hash || null);
         
         // Broadcast to frontend
         broadcastToClients({
@@ -108,9 +185,69 @@ usb.on('message', (message) => {
         
         console.log('Configuration updated from PC');
     }
+    else if (msgType === 'activate') {
+        // Switch to a layout the PC knows we have cached
+        const layout = ConfigLoader.activate(message.hash);
+        if (layout === null) {
+            // Cache miss (pruned or lost): ask for the full layout
+            usb.send(Object.assign({
+                type: 'config_request',
+                missing_hash: message.hash,
+                timestamp: Date.now()
+            }, layoutState()));
+            return;
+        }
+        
+        broadcastToClients({
+            type: 'config',
+            layout: layout
+        });
+    }
     else {
         console.log('Unknown message type from PC:', msgType);
     }
+}
+
+/**
+ * Tell the PC which page is on screen
+ */
+function sendPage() {
+    usb.send({
+        type: 'page_changed',
+        page: activePage,
+        timestamp: Date.now()
+    });
+}
+
+/**
+ * Hash of the layout on screen and of the cached layouts
+ */
+function layoutState() {
+    if (!ConfigLoader.isLoaded()) {
+        ConfigLoader.load();
+    }
+    return {
+        layout_hash: ConfigLoader.getCurrentHash(),
+        layout_cache: ConfigLoader.getCachedHashes()
+    };
+}
+
+// Binary stats frames (only after stats_binary was negotiated)
+usb.on('frame', (frame) => {
+    const { seq, data } = binaryDecoder.decode(frame);
+    if (data === null) {
+        usb.send({ type: 'schema_request', timestamp: Date.now() });
+        return;
+    }
+    
+    statsState = data;
+    statsSeq = seq;
+    
+    broadcastToClients({
+        type: 'stats',
+        data: data,
+        timestamp: Date.now()
+    });
 });
 
 // Handle errors
@@ -123,15 +260,19 @@ usb.on('connected', () => {
     console.log('Connected to Windows PC');
     
     // Request current configuration
-    usb.send({
+    usb.send(Object.assign({
         type: 'config_request',
         timestamp: Date.now()
-    });
+    }, layoutState()));
 });
 
 usb.on('disconnected', () => {
     console.log('Disconnected from Windows PC');
     
+    // Next frame from the PC will be a keyframe
+    statsState = null;
+    statsSeq = null;
+    
     // Notify frontend
     broadcastToClients({
         type: 'pc_disconnected'
@@ -153,12 +294,29 @@ function handleFrontendMessage(message) {
         
         console.log(`Action: ${message.tile_id}.${message.action_type}`);
     }
+    else if (msgType === 'page_changed') {
+        activePage = Number.isInteger(message.page) ? message.page : null;
+        sendPage();
+    }
     else if (msgType === 'status') {
         // Frontend status update (could use for heartbeat monitoring)
         console.log('Frontend status:', message);
     }
 }
 
+// Merge a stats_delta into the full stats state (lists are replaced whole)
+function applyDelta(state, changes) {
+    for (const [key, value] of Object.entries(changes)) {
+        if (value && typeof value === 'object' && !Array.isArray(value) &&
+            state[key] && typeof state[key] === 'object' && !Array.isArray(state[key])) {
+            applyDelta(state[key], value);
+        } else {
+            state[key] = value;
+        }
+    }
+    return state;
+}
+
 // Broadcast message to all connected frontend clients
 function broadcastToClients(message) {
     const data = JSON.stringify(message);
@@ -0,0 +1,179 @@
+/**
+ * Test frontend page switching
+ *
+ * Runs the frontend's app.js, tile-manager.js and page-nav-tile.js in a VM
+ * context with a minimal DOM and a fake USB client, then checks that a
+ * paged layout starts on page 0, that page_prev / page_next taps switch
+ * pages locally (wrapping around) instead of going to the PC, and that
+ * every switch is reported with page_changed.
+ *
+ * Run: node test-page-switching.js
+ */
+
+const assert = require('assert');
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+
+const FRONTEND = path.join(__dirname, '..', 'frontend');
+
+class FakeElement {
+    constructor(tag) {
+        this.tag = tag;
+        this.children = [];
+        this.parentNode = null;
+        this.dataset = {};
+        this.textContent = '';
+        this.style = { setProperty() {} };
+        const classes = new Set();
+        this.classList = {
+            add: (...names) => names.forEach(n => classes.add(n)),
+            remove: (...names) => names.forEach(n => classes.delete(n)),
+            toggle: (name, on) => (on ? classes.add(name) : classes.delete(name)),
+            contains: (name) => classes.has(name)
+        };
+    }
+
+    set className(value) {
+        value.split(' ').filter(Boolean).forEach(n => this.classList.add(n));
+    }
+
+    set innerHTML(value) {
+        this.children.forEach(child => { child.parentNode = null; });
+        this.children = [];
+    }
+
+    appendChild(child) {
+        child.parentNode = this;
+        this.children.push(child);
+        return child;
+    }
+
+    addEventListener() {}
+}
+
+function createContext() {
+    const listeners = {};
+    const grid = new FakeElement('div');
+    const overlay = new FakeElement('div');
+    const document = {
+        readyState: 'complete',
+        documentElement: new FakeElement('html'),
+        createElement: (tag) => new FakeElement(tag),
+        getElementById: (id) => (id === 'tile-grid' ? grid : overlay),
+        addEventListener: (type, fn) => (listeners[type] = listeners[type] || []).push(fn),
+        removeEventListener: (type, fn) => {
+            listeners[type] = (listeners[type] || []).filter(f => f !== fn);
+        },
+        dispatchEvent: (event) => (listeners[event.type] || []).slice().forEach(fn => fn(event))
+    };
+
+    class CustomEvent {
+        constructor(type, init) {
+            this.type = type;
+            this.detail = (init || {}).detail;
+        }
+    }
+
+    class USBClient {
+        constructor() {
+            this.handlers = {};
+            this.pages = [];
+            this.actions = [];
+        }
+        on(event, handler) { this.handlers[event] = handler; }
+        emit(event, arg) { this.handlers[event](arg); }
+        connect() {}
+        sendPageChanged(page) { this.pages.push(page); }
+        sendAction(tileId, action) { this.actions.push(tileId); }
+    }
+
+    class TouchHandler {
+        on() {}
+        registerTiles() {}
+    }
+
+    class LayoutEngine {
+        constructor(grid) { this.grid = grid; }
+        apply() {}
+    }
+
+    // Stats tiles aren't under test
+    const StubTile = class {
+        constructor(config) {
+            this.type = config.type;
+            this.element = new FakeElement('div');
+        }
+        updateData() {}
+    };
+
+    const context = vm.createContext({
+        console: { log() {}, warn() {} },
+        document, CustomEvent, USBClient, TouchHandler, LayoutEngine,
+        CPUGraphTile: StubTile, GaugeTile: StubTile, TextDisplayTile: StubTile,
+        ButtonTile: StubTile, NetworkGraphTile: StubTile,
+        window: {}
+    });
+    for (const file of ['tiles/base-tile.js', 'tiles/page-nav-tile.js', 'core/tile-manager.js', 'core/app.js']) {
+        // Top-level class declarations don't become context properties
+        const source = fs.readFileSync(path.join(FRONTEND, file), 'utf8');
+        const name = source.match(/^class (\w+)/m)[1];
+        vm.runInContext(`${source}\nthis.${name} = ${name};`, context, { filename: file });
+    }
+    return { context, grid };
+}
+
+function tile(id, type) {
+    return { id, type, size: { w: 1, h: 1 }, position: { x: 0, y: 0 } };
+}
+
+function main() {
+    console.log('Testing page switching...');
+    const { context, grid } = createContext();
+    const app = context.window.app;
+    const usb = app.usbClient;
+
+    const layout = {
+        pages: [
+            { name: 'Main', tiles: [tile('cpu', 'gauge'), tile('next', 'page_next'), tile('prev', 'page_prev')] },
+            { name: 'Net', tiles: [tile('net', 'network_graph'), tile('next', 'page_next'), tile('prev', 'page_prev')] },
+            { name: 'Apps', tiles: [tile('launch', 'button'), tile('next', 'page_next'), tile('prev', 'page_prev')] }
+        ]
+    };
+    usb.emit('config', layout);
+    assert.deepStrictEqual(usb.pages, [0], 'new layout not reported as page 0');
+    assert.strictEqual(app.pages.length, 3);
+
+    app.handleTileAction('next', 'tap');
+    app.handleTileAction('next', 'tap');
+    app.handleTileAction('next', 'tap');
+    app.handleTileAction('prev', 'tap');
+    assert.deepStrictEqual(usb.pages, [0, 1, 2, 0, 2], 'page switches not reported in order');
+    assert.deepStrictEqual(usb.actions, [], 'page nav taps went to the PC');
+    assert.ok(grid.children.some(el => el.classList.contains('page-nav-tile')), 'page nav tiles not rendered');
+
+    const indicator = grid.children.find(el => el.classList.contains('page-nav-tile'))
+        .children.find(el => el.classList.contains('page-nav-indicator'));
+    assert.strictEqual(indicator.textContent, '3/3');
+
+    // Other taps still go to the PC; long presses on nav tiles too
+    app.handleTileAction('launch', 'tap');
+    app.handleTileAction('next', 'long_press');
+    assert.deepStrictEqual(usb.actions, ['launch', 'next']);
+
+    // Flat (V3) layouts are one page
+    usb.emit('config', { grid: { cols: 2, rows: 2, gap: 5 }, tiles: [tile('cpu', 'gauge')] });
+    assert.deepStrictEqual(usb.pages.slice(-1), [0]);
+    assert.strictEqual(app.pages.length, 1);
+    app.nextPage();
+    assert.strictEqual(usb.pages.length, 6, 'single page layout switched pages');
+
+    // A reconnected backend learns the page again
+    usb.emit('connected');
+    assert.deepStrictEqual(usb.pages.slice(-1), [0]);
+
+    console.log(`  ${usb.pages.length} page_changed messages: ${usb.pages.join(', ')}`);
+    console.log('\nPage switching test passed');
+}
+
+main();
@@ -5,8 +5,8 @@
  */
 
 const { SerialPort } = require('serialport');
-const { ReadlineParser } = require('@serialport/parser-readline');
 const EventEmitter = require('events');
+const { FrameSplitter } = require('../binary-stats');
 
 class USBHandler extends EventEmitter {
     constructor(port = '/dev/ttyGS0', baudRate = 115200) {
@@ -30,16 +30,18 @@ class USBHandler extends EventEmitter {
                 autoOpen: false
             });
             
-            // Create line parser (messages are newline-delimited)
-            this.parser = this.port.pipe(new ReadlineParser({ delimiter: '\n' }));
+            // JSON messages are newline-delimited; binary stats frames are
+            // length-prefixed and may contain newline bytes
+            this.parser = new FrameSplitter();
             
             // Handle incoming data
-            this.parser.on('data', (line) => {
-                try {
-                    const message = JSON.parse(line);
-                    this.emit('message', message);
-                } catch (err) {
-                    console.error('Error parsing USB message:', err);
+            this.port.on('data', (chunk) => {
+                for (const item of this.parser.feed(chunk)) {
+                    if (item.kind === 'json') {
+                        this.emit('message', item.message);
+                    } else {
+                        this.emit('frame', item.frame);
+                    }
                 }
             });
             
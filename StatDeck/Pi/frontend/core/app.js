@@ -1,6 +1,11 @@
 /**
  * Main Application Controller
  * Initializes and manages the StatDeck display
+ *
+ * Layouts are either flat ({grid, tiles}) or paged
+ * ({pages: [{id, name, grid, tiles}, ...]}). page_prev / page_next tiles
+ * switch pages locally; every switch is reported to the PC, which then
+ * streams only the values the visible page shows.
  */
 
 class StatDeckApp {
@@ -9,6 +14,8 @@ class StatDeckApp {
         this.usbClient = new USBClient();
         this.tileManager = null;
         this.layoutEngine = null;
+        this.pages = [];
+        this.currentPageIndex = 0;
         this.touchHandler = new TouchHandler();
         
         this.init();
@@ -21,6 +28,10 @@ class StatDeckApp {
         this.usbClient.on('connected', () => {
             console.log('Connected to backend');
             this.hideDisconnectedOverlay();
+            // A restarted backend doesn't know which page is showing
+            if (this.pages.length) {
+                this.usbClient.sendPageChanged(this.currentPageIndex);
+            }
         });
         
         this.usbClient.on('disconnected', () => {
@@ -46,25 +57,80 @@ class StatDeckApp {
             this.handleTileAction(tileId, 'long_press');
         });
         
+        // Paged layouts: the PC only streams the values of the visible page
+        document.addEventListener('pageChanged', (event) => {
+            this.usbClient.sendPageChanged(event.detail.pageIndex);
+        });
+        
         // Connect to backend
         this.usbClient.connect();
     }
     
     loadConfig(layout) {
         this.config = layout;
+        this.pages = this.parsePagesFromLayout(layout);
+        this.currentPageIndex = 0;
+        
+        this.renderCurrentPage();
+        
+        console.log(`Configuration loaded (${this.pages.length} page(s))`);
+    }
+    
+    parsePagesFromLayout(layout) {
+        const defaultGrid = layout.grid || { cols: 4, rows: 3, gap: 10 };
+        if (Array.isArray(layout.pages) && layout.pages.length > 0) {
+            return layout.pages.map((page, i) => ({
+                id: page.id || `page_${i + 1}`,
+                name: page.name || `Page ${i + 1}`,
+                grid: page.grid || defaultGrid,
+                tiles: page.tiles || []
+            }));
+        }
+        return [{ id: 'page_1', name: 'Page 1', grid: defaultGrid, tiles: layout.tiles || [] }];
+    }
+    
+    renderCurrentPage() {
+        const page = this.pages[this.currentPageIndex];
+        if (!page) return;
         
         // Initialize layout engine
-        this.layoutEngine = new LayoutEngine(layout.grid);
+        this.layoutEngine = new LayoutEngine(page.grid);
         this.layoutEngine.apply();
         
         // Initialize tile manager
-        this.tileManager = new TileManager(layout.tiles);
+        this.tileManager = new TileManager(page.tiles);
         this.tileManager.createTiles();
         
         // Register tiles with touch handler
         this.touchHandler.registerTiles(this.tileManager.tiles);
         
-        console.log('Configuration loaded');
+        // Page nav tiles update their indicator; the listener in init()
+        // tells the PC
+        document.dispatchEvent(new CustomEvent('pageChanged', {
+            detail: {
+                pageIndex: this.currentPageIndex,
+                pageCount: this.pages.length,
+                pageName: page.name
+            }
+        }));
+    }
+    
+    showPage(index) {
+        if (index === this.currentPageIndex || !this.pages[index]) return;
+        this.currentPageIndex = index;
+        this.renderCurrentPage();
+    }
+    
+    nextPage() {
+        if (this.pages.length > 1) {
+            this.showPage((this.currentPageIndex + 1) % this.pages.length);
+        }
+    }
+    
+    prevPage() {
+        if (this.pages.length > 1) {
+            this.showPage((this.currentPageIndex - 1 + this.pages.length) % this.pages.length);
+        }
     }
     
     updateStats(data) {
@@ -76,6 +142,13 @@ class StatDeckApp {
     handleTileAction(tileId, actionType) {
         console.log(`Tile action: ${tileId}.${actionType}`);
         
+        // Page navigation is handled here, not on the PC
+        const tile = this.tileManager ? this.tileManager.getTile(tileId) : null;
+        if (tile && actionType === 'tap') {
+            if (tile.type === 'page_prev') { this.prevPage(); return; }
+            if (tile.type === 'page_next') { this.nextPage(); return; }
+        }
+        
         // Send action to backend (which forwards to PC)
         this.usbClient.sendAction(tileId, actionType);
     }
@@ -36,7 +36,9 @@ class TileManager {
             'gauge': GaugeTile,
             'text_display': TextDisplayTile,
             'button': ButtonTile,
-            'network_graph': NetworkGraphTile
+            'network_graph': NetworkGraphTile,
+            'page_prev': PageNavTile,
+            'page_next': PageNavTile
         };
         
         const TileClass = tileClasses[type];
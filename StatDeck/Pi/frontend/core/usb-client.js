@@ -89,6 +89,16 @@ class USBClient {
         }
     }
     
+    sendPageChanged(pageIndex) {
+        if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+            this.ws.send(JSON.stringify({
+                type: 'page_changed',
+                page: pageIndex,
+                timestamp: Date.now()
+            }));
+        }
+    }
+    
     on(event, handler) {
         if (!this.eventHandlers[event]) {
             this.eventHandlers[event] = [];
@@ -0,0 +1,53 @@
+/**
+ * Page Navigation Tiles
+ * page_prev / page_next buttons for multi-page layouts.
+ * Taps are handled by app.js (no round-trip to the PC); the tile only
+ * shows an arrow, its label and the current page ("2/4").
+ */
+
+class PageNavTile extends BaseTile {
+    constructor(config) {
+        super(config);
+        this.listenForPageChanges();
+    }
+
+    createElement() {
+        super.createElement();
+        this.element.classList.add('button-tile', 'page-nav-tile');
+
+        const arrow = document.createElement('div');
+        arrow.className = 'button-icon';
+        arrow.textContent = this.type === 'page_prev' ? '◀' : '▶';
+        this.element.appendChild(arrow);
+
+        if (this.tileConfig.label) {
+            const label = document.createElement('div');
+            label.className = 'button-label';
+            label.textContent = this.tileConfig.label;
+            this.element.appendChild(label);
+        }
+
+        // Hidden until the layout has more than one page
+        this.pageIndicator = document.createElement('div');
+        this.pageIndicator.className = 'page-nav-indicator hidden';
+        this.element.appendChild(this.pageIndicator);
+    }
+
+    listenForPageChanges() {
+        this.onPageChanged = (e) => {
+            // Tiles of a page that is no longer shown
+            if (!this.element.parentNode) {
+                document.removeEventListener('pageChanged', this.onPageChanged);
+                return;
+            }
+            const { pageIndex, pageCount } = e.detail;
+            this.pageIndicator.textContent = `${pageIndex + 1}/${pageCount}`;
+            this.pageIndicator.classList.toggle('hidden', pageCount <= 1);
+        };
+        document.addEventListener('pageChanged', this.onPageChanged);
+    }
+
+    updateData(statsData) {
+        // Navigation only, no stats
+    }
+}
@@ -10,6 +10,7 @@ from .hotkey_action import HotkeyAction
 from .run_script_action import RunScriptAction
 from .open_url_action import OpenURLAction
 from .open_folder_action import OpenFolderAction
+from layout_index import CompiledLayout
 
 logger = logging.getLogger(__name__)
 
@@ -22,9 +23,9 @@ class ActionExecutor:
         Initialize the action executor.
         
         Args:
-            layout_config: Layout configuration containing tile action definitions
+            layout_config: Layout configuration containing tile action
+                definitions (a dict or a CompiledLayout)
         """
-        self.layout_config = layout_config
         self.action_handlers = {
             'launch_app': LaunchAppAction(),
             'hotkey': HotkeyAction(),
@@ -32,6 +33,25 @@ class ActionExecutor:
             'open_url': OpenURLAction(),
             'open_folder': OpenFolderAction()
         }
+        self.layout = self.compile(layout_config)
+    
+    @property
+    def layout_config(self):
+        return self.layout.layout
+    
+    def compile(self, layout_config):
+        """
+        Compile a layout against this executor's action handlers.
+        
+        Args:
+            layout_config: Layout dict, or an already compiled layout
+        
+        Returns:
+            CompiledLayout: Layout with tile and action lookups
+        """
+        if isinstance(layout_config, CompiledLayout):
+            return layout_config
+        return CompiledLayout(layout_config, self.action_handlers)
     
     def execute(self, tile_id, action_type):
         """
@@ -41,24 +61,17 @@ class ActionExecutor:
             tile_id: ID of the tile that was interacted with
             action_type: Type of interaction ('tap', 'long_press', 'double_tap')
         """
-        # Find the tile in the layout
-        tile = self._find_tile(tile_id)
-        
-        if not tile:
+        if tile_id not in self.layout.tiles:
             logger.warning(f"Tile {tile_id} not found in layout")
             return
         
-        # Get the action configuration
-        actions = tile.get('actions', {})
-        action_config = actions.get(action_type)
-        
-        if not action_config:
+        # Handler was resolved when the layout was compiled
+        resolved = self.layout.find_action(tile_id, action_type)
+        if not resolved:
             logger.debug(f"No action configured for {tile_id}.{action_type}")
             return
-        
-        # Get the action handler
+        handler, action_config = resolved
         action_handler_type = action_config.get('type')
-        handler = self.action_handlers.get(action_handler_type)
         
         if not handler:
             logger.warning(f"Unknown action type: {action_handler_type}")
@@ -72,35 +85,23 @@ class ActionExecutor:
             logger.error(f"Error executing action: {e}", exc_info=True)
     
     def _find_tile(self, tile_id):
-            """
-            Find a tile in the layout by ID.
+        """
+        Find a tile in the layout by ID.
         
-            Args:
-                tile_id: Tile ID to search for
+        Args:
+            tile_id: Tile ID to search for
         
-            Returns:
-                dict: Tile configuration, or None if not found
-            """
-            # 1. Check V4 Multi-Page structure
-            if 'pages' in self.layout_config:
-                for page in self.layout_config['pages']:
-                    for tile in page.get('tiles', []):
-                        if tile.get('id') == tile_id:
-                            return tile
-                        
-            # 2. Check V3 Flat structure (Fallback)
-            for tile in self.layout_config.get('tiles', []):
-                if tile.get('id') == tile_id:
-                    return tile
-                
-            return None
+        Returns:
+            dict: Tile configuration, or None if not found
+        """
+        return self.layout.find_tile(tile_id)
     
     def update_layout(self, new_layout):
         """
         Update the layout configuration.
         
         Args:
-            new_layout: New layout configuration
+            new_layout: New layout configuration (dict or CompiledLayout)
         """
-        self.layout_config = new_layout
+        self.layout = self.compile(new_layout)
         logger.info("Layout configuration updated")
@@ -0,0 +1,292 @@
+"""
+Compact binary stats framing for the Pi link.
+
+When the Pi acknowledges the "stats_binary" feature, stats frames are no
+longer JSON. Instead:
+
+1. A JSON "stats_schema" message maps every data source to a numeric slot
+   and a value type. It is sent on connect and whenever the set of fields
+   (or a field's type) changes:
+
+       {"type": "stats_schema", "schema_id": 3,
+        "fields": [{"slot": 0, "source": "cpu.usage", "type": "f32"},
+                   {"slot": 1, "source": "cpu.cores[0]", "type": "f32"},
+                   {"slot": 2, "source": "system.active_app", "type": "str"}]}
+
+2. Each stats frame is a length-prefixed packed array (little-endian):
+
+       u8   MAGIC (0xB5, never the first byte of a JSON line)
+       u16  payload length (bytes following this 3-byte header)
+       u16  schema_id
+       u32  seq
+       ...  one value per slot, in slot order
+
+Value types:
+    f32   float32, NaN = null
+    u16   uint16, 0xFFFF = null
+    bool  uint16 0/1, 0xFFFF = null
+    str   uint16 byte length (0xFFFF = null) followed by UTF-8 bytes
+
+JSON messages and binary frames share the same byte stream; StreamSplitter
+separates them. BinaryStatsDecoder is the pure-Python reference decoder
+(the Pi backend has an equivalent in binary-stats.js).
+"""
+
+import json
+import math
+import struct
+
+# Feature name exchanged in hello / hello_ack
+FEATURE = 'stats_binary'
+
+MAGIC = 0xB5
+HEADER = struct.Struct('<BH')       # magic, payload length
+FRAME_HEADER = struct.Struct('<HI')  # schema_id, seq
+
+U16_NULL = 0xFFFF
+
+# Per-type packers; str is variable length and handled separately
+_F32 = struct.Struct('<f')
+_U16 = struct.Struct('<H')
+
+
+def flatten_stats(data, prefix=''):
+    """
+    Flatten a nested stats dict into (source, value) pairs.
+
+    Lists become indexed sources: cpu.cores -> cpu.cores[0], cpu.cores[1], ...
+    """
+    for key, value in data.items():
+        source = f'{prefix}{key}'
+        if isinstance(value, dict):
+            yield from flatten_stats(value, source + '.')
+        elif isinstance(value, (list, tuple)):
+            for index, item in enumerate(value):
+                yield f'{source}[{index}]', item
+        else:
+            yield source, value
+
+
+def value_type(value):
+    """Pick the narrowest wire type for a value."""
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int) and 0 <= value < U16_NULL:
+        return 'u16'
+    if isinstance(value, str):
+        return 'str'
+    return 'f32'
+
+
+def _fits(slot_type, value):
+    """Check whether a value can be sent in an existing slot."""
+    if value is None:
+        return True
+    if slot_type == 'f32':
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return value_type(value) == slot_type
+
+
+class BinaryStatsEncoder:
+    """Packs stats dicts into binary frames against a negotiated schema."""
+
+    def __init__(self):
+        self.enabled = False
+        self.schema_id = 0
+        self.fields = []  # list of (source, type)
+        self._sources = None
+
+    def reset(self):
+        """Forget the schema; the next frame re-sends it."""
+        self.fields = []
+        self._sources = None
+
+    def _needs_new_schema(self, pairs):
+        if self._sources != [source for source, _ in pairs]:
+            return True
+        return any(not _fits(slot_type, value)
+                   for (_, slot_type), (_, value) in zip(self.fields, pairs))
+
+    def _build_schema(self, pairs):
+        old_types = dict(self.fields)
+        fields = []
+        for source, value in pairs:
+            previous = old_types.get(source)
+            if value is None:
+                slot_type = previous or 'f32'
+            else:
+                slot_type = value_type(value)
+                # Never narrow a float slot back to u16 (avoids flapping)
+                if previous == 'f32' and slot_type == 'u16':
+                    slot_type = 'f32'
+            fields.append((source, slot_type))
+        self.schema_id = (self.schema_id + 1) & 0xFFFF
+        self.fields = fields
+        self._sources = [source for source, _ in pairs]
+
+    def schema_message(self):
+        """
+        Get the JSON schema message for the current schema.
+
+        Returns:
+            dict: stats_schema message
+        """
+        return {
+            'type': 'stats_schema',
+            'schema_id': self.schema_id,
+            'fields': [{'slot': slot, 'source': source, 'type': slot_type}
+                       for slot, (source, slot_type) in enumerate(self.fields)]
+        }
+
+    def encode(self, seq, data):
+        """
+        Encode one stats frame.
+
+        Args:
+            seq: Frame sequence number
+            data: Nested stats dict
+
+        Returns:
+            tuple: (schema message dict or None, frame bytes). The schema
+            message must be sent before the frame when it is not None.
+        """
+        pairs = list(flatten_stats(data))
+        schema = None
+        if self._needs_new_schema(pairs):
+            self._build_schema(pairs)
+            schema = self.schema_message()
+
+        parts = [FRAME_HEADER.pack(self.schema_id, seq & 0xFFFFFFFF)]
+        for (_, slot_type), (_, value) in zip(self.fields, pairs):
+            parts.append(_pack_value(slot_type, value))
+        payload = b''.join(parts)
+        if len(payload) > 0xFFFF:
+            raise ValueError(f"Binary stats frame too large ({len(payload)} bytes)")
+        return schema, HEADER.pack(MAGIC, len(payload)) + payload
+
+
+def _pack_value(slot_type, value):
+    if slot_type == 'f32':
+        return _F32.pack(float('nan') if value is None else float(value))
+    if slot_type in ('u16', 'bool'):
+        return _U16.pack(U16_NULL if value is None else int(value))
+    if value is None:
+        return _U16.pack(U16_NULL)
+    raw = value.encode('utf-8')[:U16_NULL - 1]
+    return _U16.pack(len(raw)) + raw
+
+
+def _set_path(data, source, value):
+    """Write a value at a dotted/indexed source path, creating containers."""
+    keys = source.split('.')
+    node = data
+    for key in keys[:-1]:
+        node = node.setdefault(key, {})
+    last = keys[-1]
+    if last.endswith(']') and '[' in last:
+        name, index = last[:-1].split('[', 1)
+        items = node.setdefault(name, [])
+        index = int(index)
+        while len(items) <= index:
+            items.append(None)
+        items[index] = value
+    else:
+        node[last] = value
+
+
+class BinaryStatsDecoder:
+    """Reference decoder: schema messages + binary frames -> stats dicts."""
+
+    def __init__(self):
+        self.schemas = {}
+
+    def apply_schema(self, message):
+        """Register a stats_schema message."""
+        fields = sorted(message.get('fields', []), key=lambda f: f['slot'])
+        self.schemas[message['schema_id']] = [(f['source'], f['type']) for f in fields]
+
+    def decode(self, frame):
+        """
+        Decode one complete binary frame.
+
+        Args:
+            frame: Bytes including the 3-byte header
+
+        Returns:
+            tuple: (seq, nested stats dict)
+
+        Raises:
+            ValueError: Malformed frame or unknown schema
+        """
+        magic, length = HEADER.unpack_from(frame, 0)
+        if magic != MAGIC or len(frame) != HEADER.size + length:
+            raise ValueError("Malformed binary stats frame")
+        schema_id, seq = FRAME_HEADER.unpack_from(frame, HEADER.size)
+        fields = self.schemas.get(schema_id)
+        if fields is None:
+            raise ValueError(f"Unknown stats schema {schema_id}")
+
+        offset = HEADER.size + FRAME_HEADER.size
+        data = {}
+        for source, slot_type in fields:
+            if slot_type == 'f32':
+                (value,) = _F32.unpack_from(frame, offset)
+                offset += _F32.size
+                # Undo float32 noise (45.2 -> 45.20000076) for display
+                value = None if math.isnan(value) else float(f'{value:.7g}')
+            elif slot_type in ('u16', 'bool'):
+                (value,) = _U16.unpack_from(frame, offset)
+                offset += _U16.size
+                if value == U16_NULL:
+                    value = None
+                elif slot_type == 'bool':
+                    value = bool(value)
+            else:
+                (length,) = _U16.unpack_from(frame, offset)
+                offset += _U16.size
+                if length == U16_NULL:
+                    value = None
+                else:
+                    value = frame[offset:offset + length].decode('utf-8')
+                    offset += length
+            _set_path(data, source, value)
+        return seq, data
+
+
+class StreamSplitter:
+    """
+    Splits a byte stream carrying both newline-delimited JSON and binary
+    frames into complete messages.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """
+        Add received bytes.
+
+        Returns:
+            list: ('json', dict) and ('binary', bytes) tuples, in order
+        """
+        self.buffer += data
+        messages = []
+        while self.buffer:
+            if self.buffer[0] == MAGIC:
+                if len(self.buffer) < HEADER.size:
+                    break
+                _, length = HEADER.unpack_from(self.buffer, 0)
+                end = HEADER.size + length
+                if len(self.buffer) < end:
+                    break
+                messages.append(('binary', bytes(self.buffer[:end])))
+                del self.buffer[:end]
+            else:
+                newline = self.buffer.find(b'\n')
+                if newline < 0:
+                    break
+                line = bytes(self.buffer[:newline]).strip()
+                del self.buffer[:newline + 1]
+                if line:
+                    messages.append(('json', json.loads(line.decode('utf-8'))))
+        return messages
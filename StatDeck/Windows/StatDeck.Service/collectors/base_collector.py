@@ -2,6 +2,7 @@
 Base collector class that all specific collectors inherit from.
 """
 
+import time
 from abc import ABC, abstractmethod
 
 
@@ -11,6 +12,11 @@ class BaseCollector(ABC):
     def __init__(self):
         """Initialize the collector."""
         self.last_value = None
+        # Refresh period in seconds per field; 0/missing = every collect()
+        self.field_periods = {}
+        self._field_cache = {}
+        # Top-level fields a consumer needs; None = all of them
+        self.wanted_fields = None
     
     @abstractmethod
     def collect(self):
@@ -22,6 +28,51 @@ class BaseCollector(ABC):
         """
         pass
     
+    def close(self):
+        """Release any background resources (threads, child processes)."""
+        pass
+    
+    def zero_stats(self):
+        """
+        Stats to report before the first successful collect().
+        
+        Returns:
+            dict: Placeholder stats (empty unless overridden)
+        """
+        return {}
+    
+    def wants(self, name):
+        """
+        Check whether any consumer needs a field.
+        
+        Args:
+            name: Top-level field name
+        
+        Returns:
+            bool: True if the field should be collected
+        """
+        return self.wanted_fields is None or name in self.wanted_fields
+    
+    def cached_field(self, name, fetch):
+        """
+        Return a field value, re-reading it only when its period has elapsed.
+        
+        Args:
+            name: Field name (key in field_periods)
+            fetch: Callable returning a fresh value
+        
+        Returns:
+            The cached or freshly fetched value
+        """
+        period = self.field_periods.get(name, 0)
+        now = time.monotonic()
+        cached = self._field_cache.get(name)
+        if cached is not None and period and now - cached[0] < period:
+            return cached[1]
+        value = fetch()
+        self._field_cache[name] = (now, value)
+        return value
+    
     def get_delta(self, current, previous):
         """
         Calculate delta between current and previous value.
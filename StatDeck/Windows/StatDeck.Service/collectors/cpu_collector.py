@@ -6,12 +6,32 @@ from .base_collector import BaseCollector
 import psutil
 
 
+# cpu_times fields that are not CPU time of their own (guest time is already
+# counted in user/nice on Linux) or that mean the core was not busy.
+_EXCLUDED_FIELDS = ('guest', 'guest_nice')
+_IDLE_FIELDS = ('idle', 'iowait')
+
+
 class CPUCollector(BaseCollector):
     """Collects CPU usage, temperature, and core information."""
     
-    def __init__(self):
+    def __init__(self, blocking=False):
+        """
+        Initialize the CPU collector.
+        
+        Args:
+            blocking: If True, sample usage with psutil's blocking 100 ms
+                interval (old behaviour). If False, usage is computed from
+                the cpu_times delta since the previous collect() and the
+                call returns immediately.
+        """
         super().__init__()
+        self.blocking = blocking
+        self.core_count = psutil.cpu_count(logical=True)
         self.temp_sensor = self._find_temp_sensor()
+        
+        # Baseline snapshot so the first collect() already has a delta
+        self._last_times = None if blocking else psutil.cpu_times(percpu=True)
     
     def _find_temp_sensor(self):
         """Try to find CPU temperature sensor."""
@@ -69,25 +89,74 @@ class CPUCollector(BaseCollector):
         Returns:
             dict: CPU stats including usage, temp, cores
         """
-        # Get CPU usage
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        
-        # Get per-core usage
-        per_core = psutil.cpu_percent(interval=0.1, percpu=True)
-        
-        # Get core count
-        core_count = psutil.cpu_count(logical=True)
+        if self.blocking:
+            cpu_percent = psutil.cpu_percent(interval=0.1)
+            per_core = psutil.cpu_percent(interval=0.1, percpu=True)
+        else:
+            cpu_percent, per_core = self._sample_usage()
         
         # Try to get temperature
-        temp = self._get_temperature()
+        if self.wants('temp'):
+            temp = self.cached_field('temp', self._get_temperature)
+        else:
+            temp = None
         
         return {
             'usage': round(cpu_percent, 1),
             'cores': [round(c, 1) for c in per_core],
             'temp': temp,
-            'core_count': core_count
+            'core_count': self.core_count
         }
     
+    def _sample_usage(self):
+        """
+        Compute total and per-core usage from the cpu_times delta.
+        
+        Uses a single cpu_times(percpu=True) call per tick; the overall
+        figure is derived from the summed per-core deltas.
+        
+        Returns:
+            tuple: (total percent, list of per-core percents)
+        """
+        current = psutil.cpu_times(percpu=True)
+        previous = self._last_times
+        self._last_times = current
+        
+        if not previous or len(previous) != len(current):
+            return 0.0, [0.0] * len(current)
+        
+        per_core = []
+        busy_sum = 0.0
+        total_sum = 0.0
+        for now, before in zip(current, previous):
+            busy, total = self._busy_and_total(now, before)
+            busy_sum += busy
+            total_sum += total
+            per_core.append(self._percent(busy, total))
+        
+        return self._percent(busy_sum, total_sum), per_core
+    
+    @staticmethod
+    def _busy_and_total(now, before):
+        """Return (busy, total) CPU seconds elapsed between two samples."""
+        total = 0.0
+        idle = 0.0
+        for field in now._fields:
+            if field in _EXCLUDED_FIELDS:
+                continue
+            delta = getattr(now, field) - getattr(before, field)
+            total += delta
+            if field in _IDLE_FIELDS:
+                idle += delta
+        return max(total - idle, 0.0), total
+    
+    @staticmethod
+    def _percent(busy, total):
+        """Clamp a busy/total ratio to a 0-100 percentage."""
+        if total <= 0:
+            return 0.0
+        return min(max(busy / total * 100.0, 0.0), 100.0)
+    
     def _get_temperature(self):
         """Get CPU temperature if available."""
         if not self.temp_sensor:
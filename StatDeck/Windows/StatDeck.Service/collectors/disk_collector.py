@@ -42,17 +42,20 @@ class DiskCollector(BaseCollector):
         self.last_io = io
         self.last_time = current_time
         
-        # Get disk usage for C: drive (or main partition)
-        try:
-            disk_usage = psutil.disk_usage('C:\\')
-            usage_percent = disk_usage.percent
-        except:
-            usage_percent = 0
-        
         stats = {
             'read_speed': round(read_speed, 2),
-            'write_speed': round(write_speed, 2),
-            'usage_percent': round(usage_percent, 1)
+            'write_speed': round(write_speed, 2)
         }
         
+        if self.wants('usage_percent'):
+            usage_percent = self.cached_field('usage_percent', self._get_usage_percent)
+            stats['usage_percent'] = round(usage_percent, 1)
+        
         return stats
+    
+    def _get_usage_percent(self):
+        """Get disk usage for C: drive (or main partition)."""
+        try:
+            return psutil.disk_usage('C:\\').percent
+        except:
+            return 0
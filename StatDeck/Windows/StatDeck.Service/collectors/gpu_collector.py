@@ -1,91 +1,321 @@
 """
 GPU statistics collector using nvidia-smi.
 Works on Windows with WDDM drivers where pynvml may fail.
+
+Instead of spawning nvidia-smi on every tick, a single long-lived
+`nvidia-smi --query-gpu=... -lms <interval>` child is kept running. A reader
+thread parses its CSV output into a latest-value slot and collect() only
+reads that slot.
 """
 
 from .base_collector import BaseCollector
 import subprocess
-import re
+import logging
+import sys
+import time
+from threading import Thread, Lock, Event
+
+logger = logging.getLogger(__name__)
 
 # Magic flag to tell Windows to NEVER open a cmd window
 CREATE_NO_WINDOW = 0x08000000
 
+# creationflags is only accepted by Popen on Windows
+POPEN_FLAGS = {'creationflags': CREATE_NO_WINDOW} if sys.platform == 'win32' else {}
+
+# Columns requested from nvidia-smi, in output order
+QUERY_FIELDS = [
+    'index',
+    'utilization.gpu',
+    'utilization.memory',
+    'temperature.gpu',
+    'memory.used',
+    'memory.total'
+]
+
+
+def _parse_number(text):
+    """Parse a nvidia-smi CSV cell, treating '[N/A]' and friends as 0."""
+    try:
+        return int(float(text.strip()))
+    except ValueError:
+        return 0
+
+
+def aggregate_gpu_stats(per_gpu):
+    """
+    Combine per-GPU stats into the gpu.* keys layouts already use.
+
+    Usage and temperature report the busiest/hottest GPU, VRAM and power
+    are summed. On a single-GPU machine this is exactly GPU 0's values.
+
+    Args:
+        per_gpu: Dict mapping GPU index (str) to that GPU's stats
+
+    Returns:
+        dict: Aggregate stats with each GPU nested under its index
+    """
+    gpus = list(per_gpu.values())
+    if not gpus:
+        return {'usage': 0, 'temp': 0, 'vram_used': 0, 'vram_total': 0, 'count': 0}
+
+    stats = {
+        'usage': max(g.get('usage', 0) for g in gpus),
+        'temp': max(g.get('temp', 0) for g in gpus),
+        'vram_used': sum(g.get('vram_used', 0) for g in gpus),
+        'vram_total': sum(g.get('vram_total', 0) for g in gpus),
+        'count': len(gpus)
+    }
+    if any('power' in g for g in gpus):
+        stats['power'] = round(sum(g.get('power', 0) for g in gpus), 1)
+
+    stats.update(per_gpu)
+    return stats
+
+
+class NvidiaSmiStream:
+    """
+    Keeps one nvidia-smi child running in loop mode and tracks its output.
+
+    Each output line is one GPU sample; the latest sample per GPU index is
+    kept in memory. If the child exits it is restarted with exponential
+    backoff.
+    """
+
+    def __init__(self, command='nvidia-smi', interval_ms=500,
+                 min_backoff=1.0, max_backoff=30.0):
+        """
+        Initialize the stream.
+
+        Args:
+            command: nvidia-smi executable, or a list used as command prefix
+                (e.g. [python, fake_nvidia_smi.py] for testing)
+            interval_ms: Sampling interval passed to -lms
+            min_backoff: First restart delay in seconds
+            max_backoff: Upper bound for the restart delay in seconds
+        """
+        self.command = [command] if isinstance(command, str) else list(command)
+        self.interval_ms = max(100, int(interval_ms))
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        self.lock = Lock()
+        self.samples = {}
+        self.sample_time = None
+        self.restarts = 0
+
+        self.process = None
+        self.thread = None
+        self._stop = Event()
+
+    def _build_args(self):
+        return self.command + [
+            f'--query-gpu={",".join(QUERY_FIELDS)}',
+            '--format=csv,noheader,nounits',
+            '-lms', str(self.interval_ms)
+        ]
+
+    def _spawn(self):
+        return subprocess.Popen(
+            self._build_args(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            **POPEN_FLAGS
+        )
+
+    def start(self):
+        """
+        Start the child process and reader thread.
+
+        Returns:
+            bool: False if the executable could not be started at all
+        """
+        try:
+            self.process = self._spawn()
+        except OSError as e:
+            logger.info(f"nvidia-smi not available: {e}")
+            return False
+
+        self._stop.clear()
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Stop the reader thread and terminate the child."""
+        self._stop.set()
+        self._kill()
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    def _kill(self):
+        process = self.process
+        if process and process.poll() is None:
+            try:
+                process.terminate()
+                process.wait(timeout=1)
+            except Exception:
+                try:
+                    process.kill()
+                except Exception:
+                    pass
+
+    def latest(self):
+        """
+        Get the most recent samples.
+
+        Returns:
+            tuple: ({gpu index: sample dict}, monotonic time of last sample)
+        """
+        with self.lock:
+            return dict(self.samples), self.sample_time
+
+    def _parse_line(self, line):
+        values = line.strip().split(',')
+        if len(values) < len(QUERY_FIELDS):
+            return None
+        index, gpu_util, _mem_util, temp, vram_used, vram_total = (
+            _parse_number(v) for v in values[:len(QUERY_FIELDS)])
+        return index, {
+            'usage': gpu_util,
+            'temp': temp,
+            'vram_used': vram_used,
+            'vram_total': vram_total
+        }
+
+    def _read_process(self, process):
+        """
+        Consume the child's stdout until it exits.
+
+        Returns:
+            bool: True if any sample was parsed
+        """
+        got_sample = False
+        for line in process.stdout:
+            if self._stop.is_set():
+                break
+            parsed = self._parse_line(line)
+            if not parsed:
+                continue
+            index, sample = parsed
+            with self.lock:
+                self.samples[index] = sample
+                self.sample_time = time.monotonic()
+            got_sample = True
+        return got_sample
+
+    def _run(self):
+        backoff = self.min_backoff
+        while not self._stop.is_set():
+            process = self.process
+            if process is None:
+                try:
+                    process = self.process = self._spawn()
+                except OSError as e:
+                    logger.warning(f"Failed to restart nvidia-smi: {e}")
+
+            if process is not None:
+                try:
+                    if self._read_process(process):
+                        backoff = self.min_backoff
+                except Exception as e:
+                    logger.warning(f"nvidia-smi reader error: {e}")
+                self._kill()
+                try:
+                    process.stdout.close()
+                except Exception:
+                    pass
+                self.process = None
+
+            if self._stop.is_set():
+                break
+
+            self.restarts += 1
+            logger.warning(f"nvidia-smi exited, restarting in {backoff:.1f}s")
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+
 class GPUCollector(BaseCollector):
     """
     Collects GPU usage and temperature statistics using nvidia-smi.
     This approach works on Windows with WDDM drivers.
     """
-    
-    def __init__(self):
+
+    def __init__(self, command='nvidia-smi', interval_ms=500):
+        """
+        Initialize the GPU collector and start the nvidia-smi stream.
+
+        Args:
+            command: nvidia-smi executable or command prefix list
+            interval_ms: How often nvidia-smi should emit a sample
+        """
         super().__init__()
-        self.gpu_available = self._check_nvidia_smi()
-    
-    def _check_nvidia_smi(self):
-        """Check if nvidia-smi is available."""
-        try:
-            result = subprocess.run(['nvidia-smi'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=2,
-                                  creationflags=CREATE_NO_WINDOW) # <-- Flag added here
-            return result.returncode == 0
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            return False
-    
+        self.stream = NvidiaSmiStream(command=command, interval_ms=interval_ms)
+        # Samples older than this are treated as a hung/dead driver
+        self.stale_after = max(5.0, 4 * self.stream.interval_ms / 1000.0)
+        self.gpu_available = self.stream.start()
+
     def collect(self):
         """
-        Collect GPU statistics using nvidia-smi.
-        
+        Return the latest GPU statistics read by the stream.
+
         Returns:
-            dict: GPU stats including usage, temp, and VRAM
+            dict: Aggregate GPU stats plus one nested dict per GPU index
         """
         if not self.gpu_available:
-            return {
-                'usage': 0,
-                'temp': 0,
-                'vram_used': 0,
-                'vram_total': 0
-            }
-        
-        try:
-            # Query nvidia-smi for specific metrics
-            # Format: gpu_util, memory_util, temperature, memory.used, memory.total
-            result = subprocess.run([
-                'nvidia-smi',
-                '--query-gpu=utilization.gpu,utilization.memory,temperature.gpu,memory.used,memory.total',
-                '--format=csv,noheader,nounits'
-            ], capture_output=True, text=True, timeout=2, creationflags=CREATE_NO_WINDOW) # <-- Flag added here
-            
-            if result.returncode != 0:
-                return self._get_zero_stats()
-            
-            # Parse output: "9, 8, 27, 2070, 24564"
-            values = result.stdout.strip().split(',')
-            
-            if len(values) < 5:
-                return self._get_zero_stats()
-            
-            gpu_util = int(values[0].strip())
-            temp = int(values[2].strip())
-            vram_used = int(values[3].strip())
-            vram_total = int(values[4].strip())
-            
-            return {
-                'usage': gpu_util,
-                'temp': temp,
-                'vram_used': vram_used,
-                'vram_total': vram_total
-            }
-            
-        except Exception as e:
-            print(f"GPU collection error: {e}")
             return self._get_zero_stats()
-    
+
+        samples, sample_time = self.stream.latest()
+        if not samples or time.monotonic() - sample_time > self.stale_after:
+            return self._get_zero_stats()
+
+        return aggregate_gpu_stats(
+            {str(index): dict(sample) for index, sample in sorted(samples.items())})
+
+    def close(self):
+        """Stop the nvidia-smi child."""
+        self.stream.stop()
+
+    def zero_stats(self):
+        return self._get_zero_stats()
+
     def _get_zero_stats(self):
-        """Return zero stats when GPU is unavailable."""
+        """Return zero stats when GPU is unavailable (same keys as aggregate_gpu_stats)."""
         return {
             'usage': 0,
             'temp': 0,
             'vram_used': 0,
-            'vram_total': 0
-        }
\ No newline at end of file
+            'vram_total': 0,
+            'count': 0
+        }
+
+
+def create_gpu_collector(backend='auto', interval_ms=500):
+    """
+    Create the GPU collector for the configured backend.
+
+    Args:
+        backend: 'nvml' for in-process NVML reads, 'nvidia-smi' for the
+            streaming subprocess reader, or 'auto' to prefer NVML and fall
+            back to nvidia-smi (e.g. WDDM setups where NVML fails)
+        interval_ms: Sampling interval for the nvidia-smi stream
+
+    Returns:
+        BaseCollector: The GPU collector
+    """
+    if backend in ('auto', 'nvml'):
+        from .gpu_collector_pynvml import GPUCollector as NVMLGPUCollector
+        collector = NVMLGPUCollector()
+        if collector.gpu_available or backend == 'nvml':
+            logger.info(f"GPU backend: NVML ({len(collector.devices)} device(s))")
+            return collector
+        # NVML may have initialised without finding a usable device
+        collector.close()
+
+    logger.info("GPU backend: nvidia-smi stream")
+    return GPUCollector(interval_ms=interval_ms)
@@ -1,88 +1,154 @@
 """
-GPU statistics collector.
-Note: GPU monitoring requires additional libraries based on GPU vendor.
-This is a placeholder implementation.
+GPU statistics collector using NVML (pynvml / nvidia-ml-py3).
+
+NVML is initialised once and device handles are cached, so every tick is a
+handful of in-process calls per GPU instead of a subprocess. All NVIDIA
+GPUs are reported: the aggregate keys (gpu.usage, gpu.temp, ...) keep
+working for existing layouts, and each device is also available as
+gpu.<index>.* (e.g. gpu.1.temp).
 """
 
+import logging
 from .base_collector import BaseCollector
+from .gpu_collector import aggregate_gpu_stats
+
+logger = logging.getLogger(__name__)
+
+# Queries that are optional per device (not every board/driver supports them)
+OPTIONAL_QUERIES = ('power', 'clock_core', 'clock_mem')
+
+
+def load_nvml():
+    """
+    Import and initialise pynvml.
+
+    Returns:
+        module: The pynvml module, or None if NVML is unavailable
+    """
+    try:
+        import pynvml
+        pynvml.nvmlInit()
+        return pynvml
+    except Exception as e:
+        logger.info(f"NVML not available: {e}")
+        return None
 
 
 class GPUCollector(BaseCollector):
     """
-    Collects GPU usage and temperature statistics.
-    
-    Note: This is a placeholder. Real implementation would use:
-    - pynvml (nvidia-ml-py3) for NVIDIA GPUs
-    - pyadl for AMD GPUs
-    - Or parse output from tools like GPU-Z, MSI Afterburner
+    Collects per-GPU usage, temperature, VRAM, power and clocks via NVML.
+
+    The `nvml` argument is a shim exposing the pynvml API (nvmlInit,
+    nvmlDeviceGetCount, nvmlDeviceGetHandleByIndex, ...). It defaults to the
+    real pynvml module; tests can pass a fake object with the same functions.
     """
-    
-    def __init__(self):
+
+    def __init__(self, nvml=None):
         super().__init__()
-        self.gpu_available = self._check_gpu()
-    
-    def _check_gpu(self):
-        """Check if GPU monitoring is available."""
+        self.nvml = nvml if nvml is not None else load_nvml()
+        self.devices = []
+        self.gpu_available = False
+
+        if self.nvml is not None:
+            self._init_devices()
+
+    def _init_devices(self):
+        """Cache device handles and the values that never change."""
+        nvml = self.nvml
         try:
-            # Try to import NVIDIA library
-            import pynvml
-            pynvml.nvmlInit()
-            self.gpu_type = 'nvidia'
-            return True
-        except (ImportError, Exception):
-            pass
-        
-        # Add AMD support here if needed
-        
-        return False
-    
+            count = nvml.nvmlDeviceGetCount()
+            for index in range(count):
+                handle = nvml.nvmlDeviceGetHandleByIndex(index)
+                mem = nvml.nvmlDeviceGetMemoryInfo(handle)
+                self.devices.append({
+                    'index': str(index),
+                    'handle': handle,
+                    'vram_total': round(mem.total / (1024**2), 0),  # MB
+                    'unsupported': set()
+                })
+            self.gpu_available = bool(self.devices)
+        except Exception as e:
+            logger.warning(f"NVML device enumeration failed: {e}")
+            self.devices = []
+            self.gpu_available = False
+
     def collect(self):
         """
-        Collect GPU statistics.
-        
+        Collect GPU statistics for every device.
+
         Returns:
-            dict: GPU stats including usage, temp, and VRAM
+            dict: Aggregate GPU stats plus one nested dict per GPU index
         """
         if not self.gpu_available:
-            return {
-                'usage': 0,
-                'temp': 0,
-                'vram_used': 0,
-                'vram_total': 0
-            }
-        
-        if self.gpu_type == 'nvidia':
-            return self._collect_nvidia()
-        
-        return {}
-    
-    def _collect_nvidia(self):
-        """Collect stats from NVIDIA GPU."""
-        try:
-            import pynvml
-            
-            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-            
-            # Get utilization
-            util = pynvml.nvmlDeviceGetUtilizationRates(handle)
-            
-            # Get temperature
-            temp = pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
-            
-            # Get memory info
-            mem = pynvml.nvmlDeviceGetMemoryInfo(handle)
-            
-            return {
-                'usage': round(util.gpu, 1),
-                'temp': round(temp, 1),
-                'vram_used': round(mem.used / (1024**2), 0),  # MB
-                'vram_total': round(mem.total / (1024**2), 0)  # MB
-            }
-        
-        except Exception as e:
-            return {
-                'usage': 0,
-                'temp': 0,
-                'vram_used': 0,
-                'vram_total': 0
-            }
+            return aggregate_gpu_stats({})
+
+        per_gpu = {}
+        for device in self.devices:
+            try:
+                per_gpu[device['index']] = self._collect_device(device)
+            except Exception as e:
+                logger.debug(f"NVML read failed for GPU {device['index']}: {e}")
+                per_gpu[device['index']] = self._get_zero_stats()
+
+        return aggregate_gpu_stats(per_gpu)
+
+    def _collect_device(self, device):
+        """Read all metrics for one cached device handle."""
+        nvml = self.nvml
+        handle = device['handle']
+
+        util = nvml.nvmlDeviceGetUtilizationRates(handle)
+        temp = nvml.nvmlDeviceGetTemperature(handle, nvml.NVML_TEMPERATURE_GPU)
+        mem = nvml.nvmlDeviceGetMemoryInfo(handle)
+
+        stats = {
+            'usage': round(util.gpu, 1),
+            'temp': round(temp, 1),
+            'vram_used': round(mem.used / (1024**2), 0),  # MB
+            'vram_total': device['vram_total']
+        }
+
+        # Only "not supported" is permanent; pynvml raises a subclass of
+        # NVMLError per error code
+        not_supported = getattr(nvml, 'NVMLError_NotSupported', ())
+        optional = {
+            'power': lambda: round(nvml.nvmlDeviceGetPowerUsage(handle) / 1000.0, 1),  # W
+            'clock_core': lambda: nvml.nvmlDeviceGetClockInfo(handle, nvml.NVML_CLOCK_GRAPHICS),  # MHz
+            'clock_mem': lambda: nvml.nvmlDeviceGetClockInfo(handle, nvml.NVML_CLOCK_MEM)  # MHz
+        }
+        for key in OPTIONAL_QUERIES:
+            if key in device['unsupported']:
+                continue
+            try:
+                stats[key] = optional[key]()
+            except not_supported:
+                # Not supported on this device - stop asking every tick
+                device['unsupported'].add(key)
+            except Exception as e:
+                # Transient (GPU busy, driver hiccup): skip it this sample
+                logger.debug(f"NVML {key} read failed for GPU {device['index']}: {e}")
+
+        return stats
+
+    def close(self):
+        """Shut NVML down."""
+        if self.nvml is not None:
+            try:
+                self.nvml.nvmlShutdown()
+            except Exception:
+                pass
+            self.nvml = None
+            self.gpu_available = False
+
+    def zero_stats(self):
+        return aggregate_gpu_stats({})
+
+    def _get_zero_stats(self):
+        """Return zero stats for one GPU that failed to read."""
+        return {
+            'usage': 0,
+            'temp': 0,
+            'vram_used': 0,
+            'vram_total': 0
+        }
+
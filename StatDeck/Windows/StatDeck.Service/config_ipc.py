@@ -0,0 +1,244 @@
+"""
+Config IPC server (localhost:5555).
+
+Serves the Config App and automation scripts on the service's event loop:
+one non-blocking listening socket, any number of clients, no thread per
+connection. Requests are newline-delimited JSON; every complete request in
+a read is handled in order, so clients may pipeline. Replies are buffered
+per client and written as the socket accepts them.
+
+Clients can also subscribe to pushed updates instead of polling:
+
+    {"type": "subscribe", "rate_ms": 1000, "fields": ["cpu.usage", "gpu"],
+     "events": true}
+
+streams {"type": "stats", "seq", "timestamp", "data"} messages cut down to
+the requested fields (all fields if omitted), at most once per rate_ms,
+taken from the snapshot the service already collected. Snapshots are only
+taken once per tick, so rate_ms is raised to the tick interval if needed;
+the subscribe_ack reports the rate in effect. With events on,
+{"type": "event", "event": "pi_connection" | "profile", ...} messages
+arrive as things happen. {"type": "unsubscribe"} stops both.
+"""
+
+import json
+import time
+import socket
+import logging
+
+from usb.line_framer import LineFramer
+from stats_engine import select_sources
+
+logger = logging.getLogger(__name__)
+
+# Drop clients that stop reading once this much output is waiting (bytes)
+MAX_PENDING_OUTPUT = 16 * 1024 * 1024
+
+# Fastest stats stream a subscriber may ask for (ms)
+MIN_SUBSCRIBE_RATE_MS = 100
+
+
+class Subscription:
+    """What a client asked to have pushed to it."""
+
+    def __init__(self, rate_ms, fields=None, events=True, tick_ms=0):
+        # Nothing is published faster than the service collects
+        self.rate = max(MIN_SUBSCRIBE_RATE_MS, int(tick_ms), int(rate_ms)) / 1000.0
+        self.fields = sorted(set(fields)) if fields else None
+        self.events = bool(events)
+        self.last_sent = None
+        self.last_seq = None
+
+    def due(self, snapshot, now):
+        if snapshot is None or snapshot.seq == self.last_seq:
+            return False
+        # Small tolerance so a rate equal to the tick interval isn't
+        # halved by timer jitter
+        return self.last_sent is None or now - self.last_sent >= self.rate * 0.9
+
+
+class IPCClient:
+    """One connected Config App / script."""
+
+    def __init__(self, server, sock, addr):
+        self.server = server
+        self.sock = sock
+        self.addr = addr
+        self.framer = LineFramer()
+        self.out = bytearray()
+        self.closed = False
+        self.subscription = None
+
+    def send(self, message):
+        """
+        Queue a message for the client (loop thread only).
+
+        Returns:
+            bool: False if the client is gone
+        """
+        if self.closed:
+            return False
+        self.out += (json.dumps(message) + '\n').encode('utf-8')
+        if len(self.out) > MAX_PENDING_OUTPUT:
+            logger.warning(f"Config client {self.addr} is not reading, disconnecting")
+            self.close()
+            return False
+        self._flush()
+        return not self.closed
+
+    def _flush(self):
+        try:
+            sent = self.sock.send(self.out)
+            del self.out[:sent]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            self.close()
+            return
+        if self.out:
+            self.server.loop.add_writer(self.sock, self._flush)
+        else:
+            self.server.loop.remove_writer(self.sock)
+
+    def _on_readable(self):
+        try:
+            data = self.sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self.close()
+            return
+        for message in self.framer.feed_json(data):
+            if self.closed:
+                break
+            try:
+                self.server.handler(self, message)
+            except Exception as e:
+                logger.error(f"Error handling config message {message.get('type')}: {e}")
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.server.loop.remove(self.sock)
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        self.server.clients.discard(self)
+        if self.server.on_disconnect:
+            self.server.on_disconnect(self)
+
+
+class ConfigIPCServer:
+    """Line-delimited JSON server running on an EventLoop."""
+
+    def __init__(self, loop, handler, host='127.0.0.1', port=5555):
+        """
+        Initialize the server.
+
+        Args:
+            loop: EventLoop to run on
+            handler: Called as handler(client, message) for every request
+            host: Interface to bind (localhost only by default)
+            port: TCP port
+        """
+        self.loop = loop
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.sock = None
+        self.clients = set()
+        # Called with the client when a connection closes
+        self.on_disconnect = None
+
+    def start(self):
+        """
+        Start listening.
+
+        Returns:
+            bool: True if the port could be bound
+        """
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, self.port))
+            sock.listen(16)
+            sock.setblocking(False)
+        except OSError as e:
+            logger.error(f"Failed to start config server: {e}")
+            return False
+        self.sock = sock
+        self.loop.add_reader(sock, self._accept)
+        logger.info(f"Config IPC listening on {self.host}:{self.port}")
+        return True
+
+    def _accept(self):
+        while True:
+            try:
+                sock, addr = self.sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            sock.setblocking(False)
+            client = IPCClient(self, sock, addr)
+            self.clients.add(client)
+            self.loop.add_reader(sock, client._on_readable)
+
+    def broadcast(self, message, clients=None):
+        """Send a message to every (or the given) connected client."""
+        for client in list(self.clients if clients is None else clients):
+            client.send(message)
+
+    def subscribers(self):
+        return [c for c in self.clients if c.subscription is not None]
+
+    def publish_snapshot(self, snapshot):
+        """Push a stats snapshot to subscribers whose rate allows it."""
+        now = time.monotonic()
+        for client in self.subscribers():
+            if client.subscription.due(snapshot, now):
+                self.send_snapshot(client, snapshot, now)
+
+    def send_snapshot(self, client, snapshot, now=None):
+        """
+        Send a stats snapshot to one subscriber.
+
+        Args:
+            client: Subscribed IPCClient
+            snapshot: Snapshot to send
+            now: time.monotonic() to count it against the subscription's
+                rate, or None (the initial snapshot after subscribing, which
+                must not hold back the first tick's)
+        """
+        sub = client.subscription
+        if now is not None:
+            sub.last_sent = now
+        sub.last_seq = snapshot.seq
+        client.send({
+            'type': 'stats',
+            'seq': snapshot.seq,
+            'timestamp': snapshot.timestamp,
+            'data': select_sources(snapshot.data, sub.fields)
+        })
+
+    def publish_event(self, event, **fields):
+        """Push an event to subscribers that asked for events."""
+        message = {'type': 'event', 'event': event, 'timestamp': int(time.time() * 1000)}
+        message.update(fields)
+        self.broadcast(message, [c for c in self.subscribers() if c.subscription.events])
+
+    def stop(self):
+        """Close the listening socket and all clients."""
+        for client in list(self.clients):
+            client.close()
+        if self.sock:
+            self.loop.remove(self.sock)
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
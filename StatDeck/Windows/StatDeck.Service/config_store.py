@@ -0,0 +1,198 @@
+"""
+Write-behind persistence for config.json.
+
+Changes (tuning, layouts pushed from the Config App or read back from the
+Pi) are applied to the in-memory config right away and written to disk
+from a background thread once they stop arriving for a short quiet period,
+so a burst of slider moves costs one write instead of one per message.
+
+Writes go to a temp file in the same directory which is then renamed over
+config.json, so a crash mid-write leaves the previous file intact. A failed
+write (e.g. another program holding config.json open on Windows) leaves the
+change pending and is retried every RETRY_DELAY seconds, and once more on
+stop(). Every change bumps a generation counter; snapshot() returns a
+consistent (generation, config) pair and saved_generation tells what is on
+disk.
+"""
+
+import os
+import json
+import time
+import logging
+from threading import Thread, Condition
+
+logger = logging.getLogger(__name__)
+
+# Write once changes have been quiet this long (seconds)...
+DEFAULT_DELAY = 1.0
+# ...but never hold a change back longer than this
+DEFAULT_MAX_DELAY = 5.0
+# Wait this long before retrying a failed write (seconds)
+RETRY_DELAY = 5.0
+
+
+class ConfigStore:
+    """In-memory config with coalesced, atomic writes."""
+
+    def __init__(self, path, defaults=None, delay=DEFAULT_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        """
+        Initialize the store.
+
+        Args:
+            path: config.json path
+            defaults: Config used when the file doesn't exist
+            delay: Quiet period before writing (seconds)
+            max_delay: Longest a change may stay unwritten (seconds)
+        """
+        self.path = path
+        self.defaults = defaults or {}
+        self.delay = delay
+        self.max_delay = max_delay
+        self.data = {}
+        self.generation = 0
+        self.saved_generation = 0
+        self.writes = 0
+        self.last_error = None
+
+        self._cond = Condition()
+        self._first_change = None
+        self._last_change = None
+        self._retry_at = None
+        self._thread = None
+        self._stopping = False
+
+    def load(self):
+        """
+        Read config.json.
+
+        Returns:
+            dict: The live config dict (update it through update())
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except FileNotFoundError:
+            logger.warning(f"Config file {self.path} not found, using defaults")
+            self.data = dict(self.defaults)
+        except ValueError as e:
+            logger.error(f"Config file {self.path} is not valid JSON ({e}), using defaults")
+            self.data = dict(self.defaults)
+        return self.data
+
+    def update(self, changes):
+        """
+        Apply top-level changes and schedule a write.
+
+        Args:
+            changes: Dict of keys to set. Values are stored by reference and
+                must not be mutated afterwards (replace them instead).
+
+        Returns:
+            int: The new generation
+        """
+        with self._cond:
+            self.data.update(changes)
+            self.generation += 1
+            now = time.monotonic()
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._cond.notify()
+            return self.generation
+
+    def snapshot(self):
+        """
+        Get a consistent copy of the config.
+
+        Returns:
+            tuple: (generation, shallow copy of the config dict)
+        """
+        with self._cond:
+            return self.generation, dict(self.data)
+
+    def is_dirty(self):
+        return self.saved_generation != self.generation
+
+    def start(self):
+        """Start the background writer."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = Thread(target=self._writer_loop, name='config-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the writer and write any pending change."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        self.flush()
+
+    def _writer_loop(self):
+        with self._cond:
+            while not self._stopping:
+                if self._first_change is None:
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                due = min(self._last_change + self.delay, self._first_change + self.max_delay)
+                if self._retry_at is not None:
+                    due = max(due, self._retry_at)
+                if now < due:
+                    self._cond.wait(due - now)
+                    continue
+                self._first_change = None
+                self._cond.release()
+                try:
+                    saved = self.flush()
+                finally:
+                    self._cond.acquire()
+                if saved:
+                    self._retry_at = None
+                else:
+                    # Still dirty: try again later even if nothing changes
+                    now = time.monotonic()
+                    self._retry_at = now + RETRY_DELAY
+                    if self._first_change is None:
+                        self._first_change = self._last_change = now
+
+    def flush(self):
+        """
+        Write the config now if it changed since the last write.
+
+        Returns:
+            bool: True if the file is up to date
+        """
+        generation, data = self.snapshot()
+        if generation == self.saved_generation:
+            return True
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            self.last_error = str(e)
+            logger.error(f"Failed to save {self.path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        self.saved_generation = generation
+        self.writes += 1
+        self.last_error = None
+        return True
+
+    def get_status(self):
+        return {
+            'generation': self.generation,
+            'saved_generation': self.saved_generation,
+            'writes': self.writes,
+            'last_error': self.last_error
+        }
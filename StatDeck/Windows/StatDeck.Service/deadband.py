@@ -0,0 +1,172 @@
+"""
+Deadband and quantization of stats values before they go to the Pi.
+
+Collectors round their values, but jittery metrics (per-core usage, disk
+and network speeds) still change a little on every tick, so every frame
+carries them and the Pi redraws their tiles. A rule per data source
+quantizes the value and holds it until it leaves a band around the value
+last sent:
+
+    "deadband": {
+        "cpu.cores": {"abs": 2.0, "step": 0.5},
+        "disk": {"rel": 0.05, "step": 0.1, "max_silence": 30}
+    }
+
+    abs          hold changes smaller than this
+    rel          ...or smaller than this fraction of the last sent value
+                 (the larger of the two bands applies)
+    step         round to a multiple of this first
+    max_silence  send the current value anyway after this many seconds
+                 (default DEFAULT_MAX_SILENCE)
+
+Rules come from config.json and from the layout (a "deadband" block at the
+top level, or one on a tile for the sources it displays; layout rules win).
+A rule for "disk" covers every disk field, one for "cpu.cores" every core.
+Held values are replaced by the last sent value, so the delta encoder sees
+no change and leaves them out.
+"""
+
+import math
+import time
+
+# Seconds a held value may go without being refreshed
+DEFAULT_MAX_SILENCE = 10.0
+
+RULE_KEYS = ('abs', 'rel', 'step', 'max_silence')
+
+
+def parse_rule(rule):
+    """
+    Validate one rule.
+
+    Returns:
+        dict: Rule with float values, or None if it has no usable keys
+    """
+    if not isinstance(rule, dict):
+        return None
+    parsed = {}
+    for key in RULE_KEYS:
+        try:
+            value = float(rule[key])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if value > 0 and math.isfinite(value):
+            parsed[key] = value
+    if not parsed.keys() - {'max_silence'}:
+        return None
+    parsed.setdefault('max_silence', DEFAULT_MAX_SILENCE)
+    return parsed
+
+
+def parse_rules(rules):
+    """Validate a source -> rule map, dropping unusable entries."""
+    parsed = {}
+    for source, rule in (rules or {}).items():
+        rule = parse_rule(rule)
+        if rule is not None and isinstance(source, str) and source.strip():
+            parsed[source.strip()] = rule
+    return parsed
+
+
+def quantize(value, step):
+    quantized = round(value / step) * step
+    # Keep the step's precision (0.1 steps give 0.3, not 0.30000000000000004)
+    decimals = max(0, -math.floor(math.log10(step))) + 2
+    return round(quantized, decimals)
+
+
+class DeadbandFilter:
+    """Holds back changes that stay inside each source's deadband."""
+
+    def __init__(self, rules=None):
+        """
+        Initialize the filter.
+
+        Args:
+            rules: Optional source -> rule map (see module docstring)
+        """
+        self.rules = {}
+        self.last_sent = {}     # flattened source -> (value, time sent)
+        self.held = 0
+        self.passed = 0
+        self._lookup = {}
+        self.configure(rules or {})
+
+    def configure(self, rules):
+        """Replace the rules (already sent values are kept)."""
+        self.rules = parse_rules(rules)
+        self._lookup = {}
+
+    def reset(self):
+        """Forget what was sent; the next frame carries real values."""
+        self.last_sent = {}
+
+    def rule_for(self, source):
+        """
+        Find the rule covering a flattened source such as 'cpu.cores[3]'.
+
+        The most specific rule wins: 'cpu.cores[3]', then 'cpu.cores',
+        then 'cpu'.
+        """
+        try:
+            return self._lookup[source]
+        except KeyError:
+            pass
+        rule = None
+        path = source
+        while path:
+            rule = self.rules.get(path)
+            if rule is not None:
+                break
+            cut = max(path.rfind('.'), path.rfind('['))
+            path = path[:cut] if cut > 0 else ''
+        self._lookup[source] = rule
+        return rule
+
+    def apply(self, data, now=None):
+        """
+        Filter one stats frame.
+
+        Args:
+            data: Nested stats dict (not modified)
+            now: time.monotonic() override
+
+        Returns:
+            dict: The frame to send, with held values replaced by the value
+            last sent
+        """
+        if not self.rules:
+            return data
+        now = time.monotonic() if now is None else now
+        return self._filter(data, '', now)
+
+    def _filter(self, node, prefix, now):
+        if isinstance(node, dict):
+            return {key: self._filter(value, f'{prefix}.{key}' if prefix else key, now)
+                    for key, value in node.items()}
+        if isinstance(node, (list, tuple)):
+            return [self._filter(value, f'{prefix}[{index}]', now)
+                    for index, value in enumerate(node)]
+        if isinstance(node, bool) or not isinstance(node, (int, float)):
+            return node
+        rule = self.rule_for(prefix)
+        if rule is None:
+            return node
+        return self._value(prefix, node, rule, now)
+
+    def _value(self, source, value, rule, now):
+        if 'step' in rule and math.isfinite(value):
+            value = quantize(value, rule['step'])
+        last = self.last_sent.get(source)
+        if last is not None:
+            last_value, sent_at = last
+            band = max(rule.get('abs', 0.0), rule.get('rel', 0.0) * abs(last_value))
+            if abs(value - last_value) <= band and now - sent_at < rule['max_silence']:
+                self.held += 1
+                return last_value
+        self.last_sent[source] = (value, now)
+        self.passed += 1
+        return value
+
+    def get_stats(self):
+        return {'rules': len(self.rules), 'held': self.held, 'passed': self.passed}
@@ -0,0 +1,202 @@
+"""
+Minimal selector-based event loop for the service.
+
+The main loop used to poll every 10 ms. This one sleeps in select() until a
+registered socket is readable, the next timer is due, or another thread
+wakes it through a socketpair, so an idle service doesn't wake up at all
+and Pi messages are handled as soon as they arrive.
+"""
+
+import heapq
+import logging
+import selectors
+import socket
+import time
+from collections import deque
+from itertools import count
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+
+class Timer:
+    """Handle for a scheduled callback."""
+    __slots__ = ('when', 'callback', 'cancelled')
+
+    def __init__(self, when, callback):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class EventLoop:
+    """Runs socket callbacks and timers on a single thread."""
+
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self._timers = []
+        self._timer_seq = count()
+        self._pending = deque()
+        self._pending_lock = Lock()
+        self.running = False
+        self.wakeups = 0
+
+        # Other threads poke the loop by writing to this pair
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self.add_reader(self._wake_r, self._drain_wakeup)
+
+    def _set_handler(self, fileobj, index, callback):
+        # key.data is [reader, writer]; the event mask follows from it
+        try:
+            key = self.selector.get_key(fileobj)
+            handlers = list(key.data)
+        except (KeyError, ValueError):
+            key = None
+            handlers = [None, None]
+        handlers[index] = callback
+        mask = (selectors.EVENT_READ if handlers[0] else 0) | \
+               (selectors.EVENT_WRITE if handlers[1] else 0)
+        try:
+            if key is None:
+                if mask:
+                    self.selector.register(fileobj, mask, handlers)
+            elif mask:
+                self.selector.modify(fileobj, mask, handlers)
+            else:
+                self.selector.unregister(fileobj)
+        except (KeyError, ValueError):
+            # Already closed/unregistered
+            pass
+
+    def add_reader(self, fileobj, callback):
+        """Call callback() whenever fileobj is readable."""
+        self._set_handler(fileobj, 0, callback)
+
+    def remove_reader(self, fileobj):
+        """Stop watching fileobj for reads (it may already be closed)."""
+        self._set_handler(fileobj, 0, None)
+
+    def add_writer(self, fileobj, callback):
+        """Call callback() whenever fileobj is writable."""
+        self._set_handler(fileobj, 1, callback)
+
+    def remove_writer(self, fileobj):
+        self._set_handler(fileobj, 1, None)
+
+    def remove(self, fileobj):
+        """Stop watching fileobj entirely (it may already be closed)."""
+        try:
+            self.selector.unregister(fileobj)
+        except (KeyError, ValueError):
+            pass
+
+    def call_at(self, when, callback):
+        """
+        Schedule callback() at a time.monotonic() deadline (loop thread only).
+
+        Returns:
+            Timer: Handle that can be cancelled
+        """
+        timer = Timer(when, callback)
+        heapq.heappush(self._timers, (when, next(self._timer_seq), timer))
+        return timer
+
+    def call_later(self, delay, callback):
+        return self.call_at(time.monotonic() + delay, callback)
+
+    def call_soon_threadsafe(self, callback):
+        """Run callback() on the loop thread as soon as possible."""
+        with self._pending_lock:
+            self._pending.append(callback)
+        self.wake()
+
+    def wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            # Buffer full (a wakeup is already pending) or loop closed
+            pass
+
+    def _drain_wakeup(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _next_timeout(self):
+        while self._timers and self._timers[0][2].cancelled:
+            heapq.heappop(self._timers)
+        if self._pending:
+            return 0
+        if not self._timers:
+            return None
+        return max(0.0, self._timers[0][0] - time.monotonic())
+
+    def _prune_closed(self):
+        # A socket closed by another thread makes select() fail on Windows
+        for key in list(self.selector.get_map().values()):
+            if getattr(key.fileobj, 'fileno', lambda: -1)() < 0:
+                self.remove(key.fileobj)
+
+    def run_once(self):
+        """Wait for and dispatch one batch of events."""
+        timeout = self._next_timeout()
+        try:
+            events = self.selector.select(timeout)
+        except OSError:
+            self._prune_closed()
+            events = []
+        self.wakeups += 1
+
+        for key, mask in events:
+            reader, writer = key.data
+            try:
+                if mask & selectors.EVENT_READ and reader:
+                    reader()
+                if mask & selectors.EVENT_WRITE and writer and key.fileobj in self.selector.get_map():
+                    writer()
+            except Exception as e:
+                logger.error(f"Error in socket callback: {e}")
+
+        with self._pending_lock:
+            pending, self._pending = self._pending, deque()
+        for callback in pending:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in scheduled callback: {e}")
+
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            _, _, timer = heapq.heappop(self._timers)
+            if timer.cancelled:
+                continue
+            try:
+                timer.callback()
+            except Exception as e:
+                logger.error(f"Error in timer callback: {e}")
+
+    def run(self):
+        """Run until stop() is called."""
+        self.running = True
+        while self.running:
+            self.run_once()
+
+    def stop(self):
+        """Stop the loop (safe from any thread)."""
+        self.running = False
+        self.wake()
+
+    def close(self):
+        self.selector.close()
+        for sock in (self._wake_r, self._wake_w):
+            try:
+                sock.close()
+            except OSError:
+                pass
@@ -2,27 +2,29 @@
 StatDeck HTTP Server
 Provides HTTP endpoint for the Config App to fetch real stats
 Runs alongside the main USB service
+
+/stats serves the latest snapshot published by the service's StatsEngine;
+it does not run the collectors itself.
 """
 
-import json
 import logging
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from threading import Thread
-from collectors.cpu_collector import CPUCollector
-from collectors.gpu_collector import GPUCollector
-from collectors.ram_collector import RAMCollector
-from collectors.disk_collector import DiskCollector
-from collectors.network_collector import NetworkCollector
-from collectors.system_collector import SystemCollector
 
 logger = logging.getLogger(__name__)
 
+# Snapshots older than this are refreshed on request (e.g. service paused)
+MAX_SNAPSHOT_AGE = 2.0
+
+# While the Config App keeps polling, collect every data source
+HTTP_DEMAND_TTL = 10.0
+
 
 class StatsHTTPHandler(BaseHTTPRequestHandler):
     """HTTP request handler for stats endpoint."""
     
-    # Class variable to hold collectors (set by server)
-    collectors = None
+    # Class variable to hold the stats engine (set by server)
+    engine = None
     
     def do_GET(self):
         """Handle GET requests."""
@@ -32,25 +34,30 @@ class StatsHTTPHandler(BaseHTTPRequestHandler):
             self.send_error(404, "Not Found")
     
     def send_stats(self):
-        """Collect and send current stats as JSON."""
+        """Send the latest stats snapshot as JSON."""
         try:
-            stats = {}
+            engine = self.engine
+            
+            # The Config App previews any data source, not just the Pi layout's
+            demand_changed = engine.set_demand('http', None, ttl=HTTP_DEMAND_TTL)
+            if demand_changed:
+                snapshot = engine.refresh()
+            else:
+                snapshot = engine.refresh(max_age=MAX_SNAPSHOT_AGE)
             
-            for name, collector in self.collectors.items():
-                try:
-                    stats[name] = collector.collect()
-                except Exception as e:
-                    logger.error(f"Error collecting {name}: {e}")
-                    stats[name] = {}
+            body = snapshot.to_json()
             
             # Send response
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
             self.send_header('Access-Control-Allow-Origin', '*')  # Allow CORS
+            self.send_header('Access-Control-Expose-Headers', 'X-StatDeck-Seq, X-StatDeck-Timestamp')
+            self.send_header('X-StatDeck-Seq', str(snapshot.seq))
+            self.send_header('X-StatDeck-Timestamp', str(snapshot.timestamp))
             self.end_headers()
             
-            response = json.dumps(stats)
-            self.wfile.write(response.encode())
+            self.wfile.write(body)
             
         except Exception as e:
             logger.error(f"Error sending stats: {e}")
@@ -64,27 +71,27 @@ class StatsHTTPHandler(BaseHTTPRequestHandler):
 class StatsHTTPServer:
     """HTTP server that provides real-time stats."""
     
-    def __init__(self, port=8080):
+    def __init__(self, engine, port=8080):
+        """
+        Initialize the HTTP server.
+        
+        Args:
+            engine: StatsEngine whose snapshots are served
+            port: Port to listen on (localhost only)
+        """
         self.port = port
         self.server = None
         self.thread = None
+        self.engine = engine
         
-        # Initialize collectors
-        self.collectors = {
-            'cpu': CPUCollector(),
-            'gpu': GPUCollector(),
-            'ram': RAMCollector(),
-            'disk': DiskCollector(),
-            'network': NetworkCollector()
-        }
-        
-        # Set collectors for handler
-        StatsHTTPHandler.collectors = self.collectors
+        # Set engine for handler
+        StatsHTTPHandler.engine = self.engine
     
     def start(self):
         """Start the HTTP server in a background thread."""
         try:
-            self.server = HTTPServer(('localhost', self.port), StatsHTTPHandler)
+            self.server = ThreadingHTTPServer(('localhost', self.port), StatsHTTPHandler)
+            self.server.daemon_threads = True
             self.thread = Thread(target=self.server.serve_forever, daemon=True)
             self.thread.start()
             logger.info(f"HTTP server started on http://localhost:{self.port}")
@@ -107,7 +114,23 @@ if __name__ == '__main__':
     import logging
     logging.basicConfig(level=logging.INFO)
     
-    server = StatsHTTPServer(port=8080)
+    from collectors.cpu_collector import CPUCollector
+    from collectors.gpu_collector import create_gpu_collector
+    from collectors.ram_collector import RAMCollector
+    from collectors.disk_collector import DiskCollector
+    from collectors.network_collector import NetworkCollector
+    from collectors.system_collector import SystemCollector
+    from stats_engine import StatsEngine
+    
+    engine = StatsEngine({
+        'cpu': CPUCollector(),
+        'gpu': create_gpu_collector(),
+        'ram': RAMCollector(),
+        'disk': DiskCollector(),
+        'network': NetworkCollector(),
+        'system': SystemCollector()
+    })
+    server = StatsHTTPServer(engine, port=8080)
     
     if server.start():
         print("\n" + "="*60)
@@ -125,3 +148,4 @@ if __name__ == '__main__':
         except KeyboardInterrupt:
             print("\nStopping server...")
             server.stop()
+            engine.close()
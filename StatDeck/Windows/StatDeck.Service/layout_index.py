@@ -0,0 +1,187 @@
+"""
+Layout helpers shared by the service.
+
+Works out which data sources a layout actually displays so the stats
+engine can skip collectors and fields no tile uses, and compiles layouts
+into lookup tables (CompiledLayout) shared by the service and the action
+executor.
+"""
+
+import hashlib
+import json
+
+# Tile types that read data regardless of (or in addition to) data_source
+TILE_TYPE_SOURCES = {
+    'cpu_graph': ('cpu.usage',),
+    'network_graph': ('network.upload_speed', 'network.download_speed'),
+}
+
+
+def layout_hash(layout):
+    """
+    Content address of a layout: sha256 of its canonical JSON.
+
+    Key order and whitespace don't matter, so the same layout always gets
+    the same hash no matter how it was loaded.
+    """
+    canonical = json.dumps(layout or {}, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def iter_tiles(layout):
+    """
+    Yield every tile in a layout.
+
+    Handles both the V4 multi-page structure ("pages") and the V3 flat
+    "tiles" list.
+    """
+    if not layout:
+        return
+    for page in layout.get('pages', []) or []:
+        for tile in page.get('tiles', []) or []:
+            yield tile
+    for tile in layout.get('tiles', []) or []:
+        yield tile
+
+
+def normalize_source(source):
+    """
+    Reduce a data_source path to the collector/field it depends on.
+
+    'cpu.cores[0]' -> 'cpu.cores', 'gpu.1.temp' -> 'gpu.1.temp',
+    'network' -> 'network' (whole collector).
+    """
+    source = (source or '').strip()
+    if '[' in source:
+        source = source.split('[', 1)[0]
+    return source
+
+
+def tile_data_sources(tile):
+    """
+    Get the data sources one tile reads.
+
+    Returns:
+        set: Normalized data source paths
+    """
+    sources = set(TILE_TYPE_SOURCES.get(tile.get('type'), ()))
+    source = normalize_source(tile.get('data_source'))
+    if source:
+        sources.add(source)
+    return sources
+
+
+def collect_data_sources(layout):
+    """
+    Get every data source referenced by a layout.
+
+    Args:
+        layout: Layout dict (V3 or V4)
+
+    Returns:
+        set: Normalized data source paths, e.g. {'cpu.usage', 'network'}
+    """
+    sources = set()
+    for tile in iter_tiles(layout):
+        sources |= tile_data_sources(tile)
+    return sources
+
+
+def collect_deadbands(layout):
+    """
+    Get the deadband rules a layout declares (see deadband.py).
+
+    A top-level "deadband" block maps data sources to rules; a "deadband"
+    rule on a tile applies to the sources that tile displays and wins over
+    the top-level block.
+
+    Returns:
+        dict: data source -> rule dict (unvalidated)
+    """
+    if not layout:
+        return {}
+    rules = dict(layout.get('deadband') or {})
+    for tile in iter_tiles(layout):
+        rule = tile.get('deadband')
+        if not isinstance(rule, dict):
+            continue
+        sources = set(TILE_TYPE_SOURCES.get(tile.get('type'), ()))
+        # Keep an index ('cpu.cores[2]') so the rule covers just that value
+        source = (tile.get('data_source') or '').strip()
+        if source:
+            sources.add(source)
+        for source in sources:
+            rules[source] = rule
+    return rules
+
+
+class CompiledLayout:
+    """
+    A layout indexed once per change for constant-time lookups.
+
+    Attributes:
+        layout: The original layout dict
+        tiles: tile id -> tile dict (V4 pages first, then V3 tiles, first
+            occurrence wins)
+        pages: One tile list per page (a V3 layout is a single page)
+        actions: (tile id, interaction) -> (handler, action config), with
+            handler resolved from the handlers given at compile time (None
+            if the action type is unknown)
+        data_sources: Every data source the layout reads
+        page_sources: Data sources per page, parallel to pages
+        deadbands: Deadband rules declared by the layout
+        hash: layout_hash() of the layout
+    """
+
+    def __init__(self, layout, handlers=None):
+        """
+        Compile a layout.
+
+        Args:
+            layout: Layout dict (V3 or V4), may be empty
+            handlers: Optional action type -> handler object map
+        """
+        self.layout = layout or {}
+        self.pages = [list(page.get('tiles', []) or [])
+                      for page in self.layout.get('pages', []) or []]
+        if self.layout.get('tiles'):
+            self.pages.append(list(self.layout['tiles']))
+
+        self.tiles = {}
+        self.actions = {}
+        handlers = handlers or {}
+        for tile in iter_tiles(self.layout):
+            tile_id = tile.get('id')
+            if tile_id is None or tile_id in self.tiles:
+                continue
+            self.tiles[tile_id] = tile
+            for interaction, config in (tile.get('actions') or {}).items():
+                if config:
+                    self.actions[(tile_id, interaction)] = (handlers.get(config.get('type')), config)
+
+        self.page_sources = []
+        for tiles in self.pages:
+            sources = set()
+            for tile in tiles:
+                sources |= tile_data_sources(tile)
+            self.page_sources.append(sources)
+        self.data_sources = set().union(*self.page_sources)
+        self.deadbands = collect_deadbands(self.layout)
+        self.hash = layout_hash(self.layout)
+
+    @property
+    def tile_count(self):
+        return len(self.tiles)
+
+    def find_tile(self, tile_id):
+        return self.tiles.get(tile_id)
+
+    def find_action(self, tile_id, interaction):
+        """
+        Get the resolved action for a tile interaction.
+
+        Returns:
+            tuple: (handler or None, action config), or None if the tile
+            has no action for this interaction
+        """
+        return self.actions.get((tile_id, interaction))
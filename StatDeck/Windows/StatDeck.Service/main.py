@@ -6,7 +6,6 @@ and communicates with the Raspberry Pi display over USB Gadget Mode (Network).
 
 import time
 import json
-import socket
 import logging
 import threading
 import sys
@@ -14,17 +13,31 @@ import os
 import subprocess
 import winreg
 from datetime import datetime
-from threading import Thread, Lock
+from threading import Lock
 
 from collectors.cpu_collector import CPUCollector
 from collectors.system_collector import SystemCollector
 from profile_manager import ProfileManager
-from collectors.gpu_collector import GPUCollector
+from collectors.gpu_collector import create_gpu_collector
 from collectors.ram_collector import RAMCollector
 from collectors.disk_collector import DiskCollector
 from collectors.network_collector import NetworkCollector
 from actions.action_executor import ActionExecutor
 from http_server import StatsHTTPServer
+from usb.network_manager import PiNetworkManager
+from usb import chunked_transfer
+from event_loop import EventLoop
+from config_ipc import ConfigIPCServer, Subscription
+from config_store import ConfigStore
+from tick_scheduler import TickScheduler, Histogram
+from rate_controller import AdaptiveRateController
+from deadband import DeadbandFilter
+from stats_engine import StatsEngine, select_sources
+from layout_index import normalize_source
+from stats_delta import DeltaEncoder
+from binary_protocol import BinaryStatsEncoder
+import stats_delta
+import binary_protocol
 
 import pystray
 from PIL import Image, ImageDraw
@@ -54,71 +67,14 @@ logger = logging.getLogger(__name__)
 # TCP config server port for Config App IPC
 CONFIG_SERVER_PORT = 5555
 
-# ==================================================================
-# High-Speed TCP Network Manager
-# ==================================================================
-class PiNetworkManager:
-    """Handles direct TCP communication with the Pi over USB Gadget Mode."""
-    def __init__(self, host='missioncontrol.local', port=5556):
-        self.host = host
-        self.port = port
-        self.sock = None
-        self.buffer = ""
-
-    def is_connected(self):
-        return self.sock is not None
-
-    def connect(self):
-        try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.settimeout(2.0)
-            self.sock.connect((self.host, self.port))
-            self.sock.settimeout(0.01)
-            logger.info(f"Connected to Pi Network at {self.host}:{self.port}")
-            return True
-        except Exception as e:
-            self.sock = None
-            return False
+# Pi can report/cache layouts by hash (see sync_layout)
+LAYOUT_HASH_FEATURE = 'layout_hash'
 
-    def disconnect(self):
-        if self.sock:
-            try:
-                self.sock.close()
-            except:
-                pass
-            self.sock = None
-
-    def send_message(self, message):
-        if not self.is_connected():
-            if not self.connect():
-                return False
-        try:
-            data = json.dumps(message) + '\n'
-            self.sock.sendall(data.encode('utf-8'))
-            return True
-        except Exception:
-            self.disconnect()
-            return False
+# How long to wait for hello_ack before syncing the layout the old way (s)
+HELLO_TIMEOUT = 1.0
 
-    def receive_message(self):
-        if not self.is_connected():
-            return None
-        try:
-            data = self.sock.recv(4096).decode('utf-8')
-            if not data:
-                self.disconnect()
-                return None
-            self.buffer += data
-            if '\n' in self.buffer:
-                line, self.buffer = self.buffer.split('\n', 1)
-                if line.strip():
-                    return json.loads(line.strip())
-        except socket.timeout:
-            return None
-        except Exception:
-            self.disconnect()
-            return None
-        return None
+# Values on pages the Pi isn't showing are refreshed this often (s)
+DEFAULT_BACKGROUND_REFRESH = 5.0
 
 # ==================================================================
 # MAIN STATDECK SERVICE
@@ -139,71 +95,315 @@ class StatDeckService:
         # Universal Documents Routing
         self.app_dir = get_documents_dir()
         self.config_path = os.path.join(self.app_dir, 'config.json')
+        self.store = ConfigStore(self.config_path, defaults={
+            'pi_host': 'missioncontrol.local', 'update_interval': 0.5, 'layout': {}})
         self.config = self.load_config()
+        self.update_interval = self.config.get('update_interval', 0.5)
         
         self.collectors = {
             'cpu': CPUCollector(),
-            'gpu': GPUCollector(),
+            'gpu': create_gpu_collector(
+                backend=self.config.get('gpu_backend', 'auto'),
+                interval_ms=int(self.update_interval * 1000)),
             'ram': RAMCollector(),
             'disk': DiskCollector(),
             'network': NetworkCollector(),
             'system': SystemCollector()
         }
+        self.engine = StatsEngine(self.collectors, self.config.get('sampling'))
+        # Profile switching always needs the foreground process
+        self.engine.set_demand('profiles', {'system.active_process'})
         
         self.usb = PiNetworkManager(
             host=self.config.get('pi_host', 'missioncontrol.local'),
             port=5556
         )
+        self.usb.on_state_change = self.on_pi_state_change
+        self.pi_synced_once = False
+        # What the Pi reported holding: active layout hash and cached hashes
+        self.pi_layout_sync = False
+        self.pi_layout_hash = None
+        self.pi_layout_cache = set()
+        self._hello_timer = None
+        self._layout_synced = False
+        # Page the Pi is showing; None (unknown) streams every page
+        self.pi_page = None
+        self.page_switches = 0
+        self.background_refresh = self.config.get('background_refresh', DEFAULT_BACKGROUND_REFRESH)
+        self._next_background = 0.0
+        self.encoder = DeltaEncoder(self.config.get('stats_keyframe_interval', stats_delta.DEFAULT_KEYFRAME_INTERVAL))
+        self.binary_encoder = BinaryStatsEncoder()
+        # Holds back values that only jitter (rules from config.json + layout)
+        self.deadband = DeadbandFilter(self.config.get('deadband'))
+        # Optional: pick the interval from signal activity and link budget
+        self.rate = AdaptiveRateController(self.config.get('adaptive_rate'))
+        # Stats are encoded on the link's sender thread
+        self.encoder_lock = Lock()
+        self.usb.stats_encoder = self.encode_stats
         
-        self.profile_mgr = ProfileManager(on_switch=self.broadcast_layout)
         self.action_executor = ActionExecutor(self.config.get('layout', {}))
-        self.http_server = StatsHTTPServer(port=8080)
+        # Profile switch latency, focus change / switch decision -> bytes sent
+        self.switch_lock = Lock()
+        self.switch_latency = Histogram()
+        self.focus_to_wire = Histogram()
+        self.last_switch = None
+        self.profile_mgr = ProfileManager(on_switch=self.broadcast_layout, prepare=self.prepare_layout)
+        self.http_server = StatsHTTPServer(self.engine, port=8080)
         
         self.layout_cache = self.config.get('layout', {})
         self.layout_lock = Lock()
-        self.config_server = None
-        self.config_server_thread = None
+        # The layout on the Pi right now (the saved one or a profile's),
+        # compiled once and shared with the action executor
+        self.active_layout = self.action_executor.layout
+        self.update_demand(self.active_layout)
+        self.update_deadbands()
+        
+        self.loop = EventLoop()
+        self.config_server = ConfigIPCServer(self.loop, self._process_config_message, port=CONFIG_SERVER_PORT)
+        self.config_server.on_disconnect = self._drop_subscription
+        self._pi_sock = None
+        # Last link state _on_link_change handled
+        self._pi_link_up = False
+        self.ticker = TickScheduler(self.tick_interval())
+        self._tick_timer = None
         
         self.running = False
         self.is_paused = False
-        self.update_interval = self.config.get('update_interval', 0.5)
         
     def load_config(self):
-        try:
-            with open(self.config_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            logger.warning(f"Config file {self.config_path} not found, using defaults")
-            return {'pi_host': 'missioncontrol.local', 'update_interval': 0.5, 'layout': {}}
+        return self.store.load()
         
+    def prepare_layout(self, layout):
+        """Compile and pre-encode a profile layout (profile watcher thread)."""
+        compiled = self.action_executor.compile(layout)
+        return compiled, self.encode_config(compiled)
+    
+    def encode_config(self, compiled):
+        message = {"type": "config", "layout": compiled.layout, "hash": compiled.hash}
+        return (json.dumps(message) + '\n').encode('utf-8')
+    
     def broadcast_layout(self, layout_data, profile_name):
             logger.info(f"Switching to profile: {profile_name}")
-            try:
-                layout_path = os.path.join(self.app_dir, 'layouts', f"{profile_name}.json")
-                if os.path.exists(layout_path):
-                    with open(layout_path, 'r', encoding='utf-8') as f:
-                        layout_data = json.load(f) 
-            except Exception as e:
-                logger.error(f"Error reading layout file: {e}")
-
-            if hasattr(self, 'usb') and self.usb:
-                self.usb.send_message({"type": "config", "layout": layout_data})
-            if hasattr(self, 'action_executor'):
-                self.action_executor.update_layout(layout_data)
+            started = time.monotonic()
+            focus_at = self.profile_mgr.focus_changed_at
+            # Prepared when the file last changed; a switch is one buffer write
+            prepared = self.profile_mgr.get_prepared(profile_name) or self.prepare_layout(layout_data)
+            compiled, wire = prepared
+
+            self.sync_layout(compiled, wire,
+                             on_sent=lambda sent_at: self._record_switch(profile_name, focus_at, started, sent_at))
+            self.set_active_layout(compiled)
+            self.config_server.publish_event('profile', profile=profile_name)
+    
+    def _record_switch(self, profile_name, focus_at, started, sent_at):
+        with self.switch_lock:
+            self.switch_latency.add((sent_at - started) * 1000)
+            if focus_at is not None:
+                self.focus_to_wire.add((sent_at - focus_at) * 1000)
+            self.last_switch = {
+                'profile': profile_name,
+                'switch_ms': round((sent_at - started) * 1000, 2),
+                'focus_to_wire_ms': round((sent_at - focus_at) * 1000, 2) if focus_at is not None else None
+            }
+    
+    def get_switch_stats(self):
+        with self.switch_lock:
+            return {
+                'last': self.last_switch,
+                'switch_ms': self.switch_latency.summary(),
+                'focus_to_wire_ms': self.focus_to_wire.summary()
+            }
+    
+    def set_active_layout(self, layout):
+        """Compile the layout now on the Pi and point everything at it."""
+        compiled = self.action_executor.compile(layout)
+        self.active_layout = compiled
+        self.action_executor.update_layout(compiled)
+        self.update_demand(compiled)
+        self.update_deadbands()
+    
+    def update_deadbands(self):
+        rules = dict(self.config.get('deadband') or {})
+        rules.update(self.active_layout.deadbands)
+        with self.encoder_lock:
+            self.deadband.configure(rules)
+        # Jitter held back from the Pi isn't activity either
+        self.rate.deadband.configure(rules)
+    
+    def update_demand(self, layout):
+        """Only collect the data sources the displayed page uses."""
+        sources = self.visible_sources(layout)
+        if sources is None:
+            sources = layout.data_sources
+        if not layout.layout:
+            # Unknown layout - collect everything rather than show blanks
+            sources = None
+        self.engine.set_demand('layout', sources)
+        logger.info(f"Collecting: {self.engine.get_demand()}")
+    
+    def visible_sources(self, layout=None):
+        """
+        Get the data sources of the page the Pi is showing.
+        
+        Returns:
+            set: Sources of that page, or None to stream the whole layout
+            (single page, or the page is unknown)
+        """
+        pages = (layout or self.active_layout).page_sources
+        if self.pi_page is None or len(pages) < 2 or not 0 <= self.pi_page < len(pages):
+            return None
+        return pages[self.pi_page]
+    
+    def set_pi_page(self, page):
+        """The Pi switched pages: refocus collection and refresh that page now."""
+        if not isinstance(page, int) or isinstance(page, bool):
+            page = None
+        if page == self.pi_page:
+            return
+        self.pi_page = page
+        self.page_switches += 1
+        self.update_demand(self.active_layout)
+        if self.running and not self.is_paused and self.usb.is_connected():
+            self.collect_stats()
+            self.send_stats(None, self.visible_sources())
+    
+    def _begin_background_refresh(self):
+        """Add the other pages' sources to this tick's demand when due."""
+        if self.visible_sources() is None:
+            return False
+        now = time.monotonic()
+        if now < self._next_background:
+            return False
+        self._next_background = now + self.background_refresh
+        self.engine.set_demand('layout_background', self.active_layout.data_sources)
+        return True
     
     def collect_stats(self):
-        stats = {}
-        for name, collector in self.collectors.items():
-            try: stats[name] = collector.collect()
-            except Exception: stats[name] = {}
-        return stats
+        return self.engine.collect()
+    
+    def send_stats(self, stats, sources=None):
+        # Latest-wins: a frame the Pi hasn't taken yet is simply replaced
+        self.usb.send_stats((self.engine.latest(), sources))
+    
+    def encode_stats(self, item):
+        """Encode a snapshot for the wire (called by the sender thread)."""
+        snapshot, sources = item
+        data = select_sources(snapshot.data, sources)
+        with self.encoder_lock:
+            data = self.deadband.apply(data)
+            if self.binary_encoder.enabled:
+                schema, frame = self.binary_encoder.encode(snapshot.seq, data)
+                if schema:
+                    return [(json.dumps(schema) + '\n').encode('utf-8'), frame]
+                return [frame]
+            message = self.encoder.encode(snapshot.seq, snapshot.timestamp, data)
+        return [(json.dumps(message) + '\n').encode('utf-8')]
+    
+    def on_pi_state_change(self, connected):
+        # The Pi may be a different (or older) backend next time: start over
+        # with full frames until it acknowledges the features we offer
+        with self.encoder_lock:
+            self.encoder.reset()
+            self.encoder.enabled = False
+            self.binary_encoder.reset()
+            self.binary_encoder.enabled = False
+            self.deadband.reset()
+        self.pi_layout_sync = False
+        self.pi_layout_hash = None
+        self.pi_layout_cache = set()
+        self.usb.chunk_size = None
+        # Socket registration and the resync happen on the loop thread
+        self.loop.call_soon_threadsafe(lambda: self._on_link_change(connected))
+    
+    def _on_link_change(self, connected):
+        # Handle each transition as queued: a quick reconnect queues a drop
+        # and a connect that both run after the link is back up
+        self._sync_pi_reader()
+        if connected == self._pi_link_up:
+            return
+        self._pi_link_up = connected
+        self.config_server.publish_event('pi_connection', connected=connected)
+        if connected:
+            self.on_pi_connected()
+        else:
+            # The Pi reports its page again after reconnecting
+            self.set_pi_page(None)
+    
+    def _sync_pi_reader(self):
+        """Watch the Pi socket currently in use (if any)."""
+        sock = self.usb.sock
+        if sock is self._pi_sock:
+            return
+        if self._pi_sock is not None:
+            self.loop.remove_reader(self._pi_sock)
+        if sock is not None:
+            self.loop.add_reader(sock, self._on_pi_readable)
+        self._pi_sock = sock
     
-    def send_stats(self, stats):
+    def _on_pi_readable(self):
+        for message in self.usb.receive_messages():
+            self.handle_pi_message(message)
+        if self.usb.sock is not self._pi_sock:
+            self._sync_pi_reader()
+    
+    def on_pi_connected(self):
         self.usb.send_message({
-            'type': 'stats',
-            'timestamp': int(datetime.now().timestamp() * 1000),
-            'data': stats
+            'type': 'hello',
+            'features': [stats_delta.FEATURE, binary_protocol.FEATURE, LAYOUT_HASH_FEATURE,
+                         chunked_transfer.FEATURE]
         })
+        # The layout sync waits for hello_ack (which says what the Pi
+        # already holds); older backends never answer
+        self._layout_synced = False
+        if self._hello_timer:
+            self._hello_timer.cancel()
+        self._hello_timer = self.loop.call_later(HELLO_TIMEOUT, self._sync_layout_on_connect)
+    
+    def _sync_layout_on_connect(self):
+        if self._hello_timer:
+            self._hello_timer.cancel()
+            self._hello_timer = None
+        if self._layout_synced or not self.usb.is_connected():
+            return
+        self._layout_synced = True
+        if not self.pi_synced_once:
+            self.pi_synced_once = True
+            if self.pi_layout_hash != self.active_layout.hash:
+                # First contact: adopt whatever layout the Pi is showing
+                self.usb.send_message({'type': 'get_layout', 'timestamp': int(datetime.now().timestamp() * 1000)})
+        else:
+            # Reconnect: the Pi may have rebooted or missed a profile switch
+            self.send_config()
+    
+    def _note_pi_layouts(self, message):
+        """Record the layout hashes a Pi message reports."""
+        if 'layout_hash' not in message:
+            return
+        self.pi_layout_sync = True
+        self.pi_layout_hash = message.get('layout_hash')
+        self.pi_layout_cache = set(message.get('layout_cache') or [])
+        missing = message.get('missing_hash')
+        self.pi_layout_cache.discard(missing)
+    
+    def sync_layout(self, compiled, wire=None, on_sent=None):
+        """
+        Make the Pi show a layout, sending as little as possible.
+        
+        Nothing is sent if the Pi already shows it, a short "activate" if
+        the Pi has it cached, and the full config otherwise.
+        """
+        if self.pi_layout_sync:
+            if compiled.hash == self.pi_layout_hash:
+                return True
+            if compiled.hash in self.pi_layout_cache:
+                self.pi_layout_hash = compiled.hash
+                return self.usb.send_message({'type': 'activate', 'hash': compiled.hash},
+                                             lane='config', on_sent=on_sent)
+        sent = self.usb.send_raw(wire or self.encode_config(compiled), lane='config', on_sent=on_sent)
+        if sent and self.pi_layout_sync:
+            self.pi_layout_hash = compiled.hash
+            self.pi_layout_cache.add(compiled.hash)
+        return sent
     
     def handle_pi_message(self, message):
         msg_type = message.get('type')
@@ -211,74 +411,60 @@ class StatDeckService:
             try: self.action_executor.execute(message.get('tile_id'), message.get('action_type'))
             except Exception as e: logger.error(f"Error executing action: {e}")
         elif msg_type == 'config_request':
+            self._note_pi_layouts(message)
             self.send_config()
+        elif msg_type == 'hello_ack':
+            features = message.get('features', [])
+            with self.encoder_lock:
+                self.encoder.enabled = stats_delta.FEATURE in features
+                self.encoder.force_keyframe()
+                self.binary_encoder.enabled = binary_protocol.FEATURE in features
+                self.binary_encoder.reset()
+            logger.info(f"Pi link features: {features}")
+            if chunked_transfer.FEATURE in features:
+                self.usb.chunk_size = chunked_transfer.DEFAULT_CHUNK_SIZE
+            if LAYOUT_HASH_FEATURE in features:
+                self._note_pi_layouts(message)
+            self._sync_layout_on_connect()
+        elif msg_type == 'page_changed':
+            self.set_pi_page(message.get('page'))
+        elif msg_type == 'chunk_ack':
+            self.usb.chunk_ack(message)
+        elif msg_type == 'keyframe_request':
+            with self.encoder_lock:
+                self.encoder.force_keyframe()
+        elif msg_type == 'schema_request':
+            with self.encoder_lock:
+                self.binary_encoder.reset()
         elif msg_type == 'layout_response':
             layout = message.get('layout', {})
             if layout:
                 with self.layout_lock:
                     self.layout_cache = layout
-                    self.config['layout'] = layout
-                self.action_executor.update_layout(layout)
+                if layout != self.config.get('layout'):
+                    self.store.update({'layout': layout})
+                self.set_active_layout(layout)
+                if self.pi_layout_sync:
+                    # The Pi is showing exactly this layout
+                    self.pi_layout_hash = self.active_layout.hash
     
     def send_config(self):
-        with self.layout_lock:
-            layout = self.layout_cache
-        self.usb.send_message({'type': 'config', 'layout': layout})
+        return self.sync_layout(self.active_layout)
 
-    def start_config_server(self):
-        try:
-            self.config_server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.config_server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.config_server.settimeout(1.0)
-            self.config_server.bind(('127.0.0.1', CONFIG_SERVER_PORT))
-            self.config_server.listen(2)
-            self.config_server_thread = Thread(target=self._config_server_loop, daemon=True)
-            self.config_server_thread.start()
-        except Exception as e:
-            logger.error(f"Failed to start config server: {e}")
-    
-    def _config_server_loop(self):
-        while self.running:
-            try:
-                client, addr = self.config_server.accept()
-                Thread(target=self._handle_config_client, args=(client,), daemon=True).start()
-            except socket.timeout: continue
-            except OSError: break
-    
-    def _handle_config_client(self, client):
-        client.settimeout(0.5)
-        buffer = ''
-        try:
-            while self.running:
-                try:
-                    data = client.recv(4096)
-                    if not data: break
-                    buffer += data.decode('utf-8')
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        if line.strip(): self._process_config_message(client, line.strip())
-                except socket.timeout: continue
-                except ConnectionResetError: break
-        finally:
-            client.close()
-    
-    def _process_config_message(self, client, line):
-            try: message = json.loads(line)
-            except Exception: return
-        
+    def _process_config_message(self, client, message):
             msg_type = message.get('type')
             if msg_type == 'get_layout':
                 with self.layout_lock: layout = self.layout_cache
-                self._send_to_config_client(client, {'type': 'layout_data', 'layout': layout})
+                client.send({'type': 'layout_data', 'layout': layout})
             elif msg_type == 'config':
                 layout = message.get('layout', {})
                 if layout:
                     with self.layout_lock:
                         self.layout_cache = layout
-                        self.config['layout'] = layout
-                    self.action_executor.update_layout(layout)
-                    success = self.usb.send_message({'type': 'config', 'layout': layout})
-                    self._send_to_config_client(client, {'type': 'config_ack', 'success': bool(success)})
+                    self.store.update({'layout': layout})
+                    self.set_active_layout(layout)
+                    success = self.send_config()
+                    client.send({'type': 'config_ack', 'success': bool(success)})
             elif msg_type == 'update_tuning':
                 rate_ms = message.get('stats_rate_ms', 500)
                 debounce_ms = message.get('debounce_ms', 1500)
@@ -287,62 +473,158 @@ class StatDeckService:
                 self.update_interval = safe_rate_ms / 1000.0
                 if hasattr(self, 'profile_mgr'):
                     self.profile_mgr.debounce_time = safe_debounce_ms / 1000.0
-                self.config['update_interval'] = self.update_interval
-                self.config['profile_debounce'] = safe_debounce_ms / 1000.0
-                try:
-                    with open(self.config_path, 'w') as f: json.dump(self.config, f, indent=4)
-                except Exception: pass
-                self._send_to_config_client(client, {'type': 'tuning_ack', 'success': True})        
+                changes = {
+                    'update_interval': self.update_interval,
+                    'profile_debounce': safe_debounce_ms / 1000.0
+                }
+                if isinstance(message.get('adaptive_rate'), dict):
+                    self.rate.configure(message['adaptive_rate'])
+                    self.rate.reset()
+                    changes['adaptive_rate'] = self.rate.get_settings()
+                self._apply_interval()
+                if isinstance(message.get('sampling'), dict):
+                    self.engine.configure(message['sampling'])
+                    changes['sampling'] = self.engine.get_sampling()
+                if isinstance(message.get('deadband'), dict):
+                    changes['deadband'] = message['deadband']
+                # Written to disk in the background once the sliders settle
+                self.store.update(changes)
+                if 'deadband' in changes:
+                    self.update_deadbands()
+                client.send({'type': 'tuning_ack', 'success': True})        
+            elif msg_type == 'subscribe':
+                fields = message.get('fields')
+                if isinstance(fields, list):
+                    fields = [normalize_source(f) for f in fields if isinstance(f, str)]
+                # The adaptive rate may speed ticks up to its minimum interval
+                fastest = self.rate.min_interval if self.rate.enabled else self.update_interval
+                sub = Subscription(message.get('rate_ms', int(self.update_interval * 1000)),
+                                   fields if isinstance(fields, list) else None,
+                                   message.get('events', True),
+                                   tick_ms=int(fastest * 1000))
+                client.subscription = sub
+                # Make sure the requested fields are actually collected
+                self.engine.set_demand(f'ipc:{id(client)}', sub.fields)
+                client.send({'type': 'subscribe_ack', 'rate_ms': int(sub.rate * 1000),
+                             'fields': sub.fields, 'events': sub.events})
+                snapshot = self.engine.latest()
+                if snapshot is not None:
+                    self.config_server.send_snapshot(client, snapshot)
+            elif msg_type == 'unsubscribe':
+                self._drop_subscription(client)
+                client.send({'type': 'unsubscribe_ack'})
             elif msg_type == 'get_status':
-                with self.layout_lock: tiles = len(self.layout_cache.get('tiles', []))
-                self._send_to_config_client(client, {'type': 'status', 'usb_connected': self.usb.is_connected(), 'pi_layout_tiles': tiles})
+                tiles = self.active_layout.tile_count
+                client.send({
+                    'type': 'status',
+                    'usb_connected': self.usb.is_connected(),
+                    'pi_layout_tiles': tiles,
+                    'collector_timings': self.engine.get_timings(),
+                    'pi_link': self.usb.get_queue_stats(),
+                    'tick': self.ticker.get_stats(),
+                    'config_store': self.store.get_status(),
+                    'profile_switch': self.get_switch_stats(),
+                    'adaptive_rate': self.rate.get_stats(),
+                    'deadband': self.deadband.get_stats(),
+                    'pi_page': {'page': self.pi_page, 'switches': self.page_switches,
+                                'pages': len(self.active_layout.page_sources)}
+                })
     
-    def _send_to_config_client(self, client, message):
-        try: client.sendall((json.dumps(message) + '\n').encode('utf-8'))
-        except: pass
+    def _drop_subscription(self, client):
+        if client.subscription is not None:
+            client.subscription = None
+            self.engine.set_demand(f'ipc:{id(client)}', ())
     
     def run(self):
         logger.info("StatDeck Service starting...")
         self.http_server.start()
         
-        if not self.usb.connect():
-            logger.error("Failed to connect to Pi Network.")
-        else:
-            self.usb.send_message({'type': 'get_layout', 'timestamp': int(datetime.now().timestamp() * 1000)})
-            time.sleep(0.5)
+        # Connects (and reconnects) in the background; see on_pi_connected
+        self.usb.start()
         
         self.running = True
-        self.start_config_server()
-        last_update = 0
+        self.store.start()
+        self.profile_mgr.start()
+        self.config_server.start()
+        self.ticker.restart()
+        self._schedule_tick()
         
         try:
-            while self.running:
-                # FIXED: Only collect stats if not paused, but ALWAYS keep reading Pi messages
-                if not self.is_paused:
-                    current_time = time.time()
-                    if current_time - last_update >= self.update_interval:
-                        stats = self.collect_stats()
-                        if hasattr(self, 'profile_mgr'):
-                            self.profile_mgr.update(stats.get('system', {}))
-                        self.send_stats(stats)
-                        last_update = current_time
-                
-                message = self.usb.receive_message()
-                if message:
-                    self.handle_pi_message(message)
-                time.sleep(0.01)
+            # Sleeps until the Pi sends something, a tick is due or another
+            # thread calls in (reconnect, tuning, pause, stop)
+            self.loop.run()
         except KeyboardInterrupt:
             pass
         finally:
             self.stop()
+            self.loop.close()
+    
+    def _schedule_tick(self):
+        """(Re)arm the collection timer; no timer at all while paused."""
+        if self._tick_timer:
+            self._tick_timer.cancel()
+            self._tick_timer = None
+        if self.is_paused or not self.running:
+            return
+        self._tick_timer = self.loop.call_at(self.ticker.next_deadline, self._tick)
+    
+    def tick_interval(self):
+        return self.rate.interval if self.rate.enabled else self.update_interval
+    
+    def _apply_interval(self):
+        self.ticker.set_interval(self.tick_interval())
+        self._schedule_tick()
+    
+    def _adapt_interval(self, stats, sources):
+        """Let the adaptive controller pick the next interval (None if off)."""
+        if not self.rate.enabled:
+            return None
+        track = self.rate.track or sources or self.active_layout.data_sources or None
+        counters = self.usb.get_link_counters() if self.usb.is_connected() else None
+        return self.rate.update(select_sources(stats, track), counters)
+    
+    def _tick(self):
+        self._tick_timer = None
+        self.ticker.begin()
+        interval = None
+        try:
+            # Pages the Pi isn't showing get a slow background refresh
+            background = self._begin_background_refresh()
+            stats = self.collect_stats()
+            if background:
+                self.engine.set_demand('layout_background', ())
+            if hasattr(self, 'profile_mgr'):
+                self.profile_mgr.update(stats.get('system', {}))
+            sources = self.active_layout.data_sources if background else self.visible_sources()
+            self.send_stats(stats, sources)
+            self.config_server.publish_snapshot(self.engine.latest())
+            interval = self._adapt_interval(stats, sources)
+        finally:
+            self.ticker.end()
+            if interval is not None:
+                self.ticker.set_interval(interval)
+            self._schedule_tick()
+    
+    def set_paused(self, paused):
+        """Pause/resume stats collection (Pi messages are still handled)."""
+        self.is_paused = paused
+        self.loop.call_soon_threadsafe(self._on_pause_change)
+    
+    def _on_pause_change(self):
+        if not self.is_paused:
+            # Resume on a fresh phase rather than counting the pause as skips
+            self.ticker.restart()
+        self._schedule_tick()
     
     def stop(self):
         self.running = False
-        if self.config_server:
-            try: self.config_server.close()
-            except: pass
+        self.loop.stop()
+        self.config_server.stop()
         self.http_server.stop()
-        self.usb.disconnect()
+        self.usb.stop()
+        self.profile_mgr.stop()
+        self.engine.close()
+        self.store.stop()
 
 # ==================================================================
 # SYSTEM TRAY & REGISTRY INTEGRATION
@@ -404,11 +686,11 @@ def run_service_in_background():
 
 def on_start(icon, item):
     global statdeck_service
-    if statdeck_service: statdeck_service.is_paused = False
+    if statdeck_service: statdeck_service.set_paused(False)
 
 def on_stop(icon, item):
     global statdeck_service
-    if statdeck_service: statdeck_service.is_paused = True
+    if statdeck_service: statdeck_service.set_paused(True)
 
 def on_exit(icon, item):
     global statdeck_service
@@ -3,18 +3,42 @@ Profile Manager v2 — File-based auto-switch.
 
 layouts/ folder contains {process}.json files.
 Filenames ARE the mapping. No config file needed.
+
+The folder is indexed in memory (name -> mtime/size) so the per-tick
+profile check never touches the disk. A watcher thread keeps the index
+current - Windows change notifications when pywin32 is available, mtime
+polling otherwise - and re-parses only the files that changed. If the
+active profile's file is edited, the next update() re-sends it.
+
+Layouts are validated and run through the optional prepare() hook (the
+service pre-encodes the wire message there) when their file changes, on
+the watcher thread, so a switch itself does no parsing or encoding.
 """
 
 import os
 import json
 import time
 import logging
-from threading import Lock
+from threading import Lock, Thread, Event
+
+try:
+    import win32file
+    import win32event
+    import win32con
+    HAS_WIN32 = True
+except ImportError:
+    HAS_WIN32 = False
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_DEBOUNCE = 1.0
 
+# Seconds between directory scans without change notifications
+POLL_INTERVAL = 2.0
+
+# Let an editor finish writing before rescanning after a notification
+SETTLE_DELAY = 0.2
+
 def get_documents_layouts_dir():
     r"""Finds the C:\Users\YourName\Documents\StatDeck\layouts folder"""
     documents_dir = os.path.join(os.path.expanduser('~'), 'Documents')
@@ -24,17 +48,32 @@ def get_documents_layouts_dir():
 class ProfileManager:
     r"""Monitors active app and triggers layout switches with debounce."""
 
-    def __init__(self, layouts_dir=None, debounce=DEFAULT_DEBOUNCE, on_switch=None):
+    def __init__(self, layouts_dir=None, debounce=DEFAULT_DEBOUNCE, on_switch=None, prepare=None):
         # Now defaults to the Documents folder!
         self.layouts_dir = layouts_dir or get_documents_layouts_dir()
         self.debounce = debounce
         self.on_switch = on_switch
+        # prepare(layout) -> anything; result available via get_prepared()
+        self.prepare = prepare
         self.lock = Lock()
 
         self._current_profile = None
         self._pending_profile = None
         self._pending_since = 0
         self._layout_cache = {}
+        self._prepared = {}
+
+        # When the focus change behind the latest switch was first seen
+        # (time.monotonic())
+        self.focus_changed_at = None
+
+        # profile name -> (mtime_ns, size) of its file
+        self._index = {}
+        self._reload_current = False
+        self._stopping = Event()
+        self._watcher = None
+        self.rescans = 0
+        self.refresh_index()
 
         if os.path.isdir(self.layouts_dir):
             profiles = self._scan_profiles()
@@ -55,51 +94,161 @@ class ProfileManager:
         self.debounce = value
 
     def _scan_profiles(self):
-        profiles = []
+        with self.lock:
+            return sorted(self._index)
+
+    def _stat_directory(self):
+        index = {}
         try:
-            for f in os.listdir(self.layouts_dir):
-                if f.endswith('.json'):
-                    profiles.append(f[:-5])
+            with os.scandir(self.layouts_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.json') and entry.is_file():
+                        st = entry.stat()
+                        index[entry.name[:-5].lower()] = (st.st_mtime_ns, st.st_size)
         except OSError:
             pass
-        return sorted(profiles)
+        return index
+
+    def refresh_index(self):
+        """
+        Rescan layouts/ and drop cached layouts whose files changed.
+
+        Returns:
+            set: Profile names added, removed or modified
+        """
+        index = self._stat_directory()
+        with self.lock:
+            old = self._index
+            changed = {name for name in set(old) | set(index) if old.get(name) != index.get(name)}
+            self._index = index
+            for name in changed:
+                self._layout_cache.pop(name, None)
+                self._prepared.pop(name, None)
+            reload_current = self._current_profile in changed and self._current_profile in index
+        self.rescans += 1
+        if changed and old:
+            logger.info(f'Layouts changed: {", ".join(sorted(changed))}')
+        # Parse and prepare changed files now rather than at switch time
+        for name in sorted(changed & set(index)):
+            self.load_layout(name)
+        if reload_current:
+            self._reload_current = True
+        return changed
+
+    def start(self):
+        """Start watching layouts/ for changes."""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._stopping.clear()
+        target = self._watch_notifications if HAS_WIN32 else self._watch_polling
+        self._watcher = Thread(target=target, name='profile-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._watcher:
+            self._watcher.join(timeout=3.0)
+            self._watcher = None
+
+    def _watch_polling(self):
+        while not self._stopping.wait(POLL_INTERVAL):
+            self.refresh_index()
+
+    def _watch_notifications(self):
+        flags = (win32con.FILE_NOTIFY_CHANGE_FILE_NAME |
+                 win32con.FILE_NOTIFY_CHANGE_LAST_WRITE |
+                 win32con.FILE_NOTIFY_CHANGE_SIZE)
+        while not self._stopping.is_set():
+            if not os.path.isdir(self.layouts_dir):
+                # Nothing to watch yet; check again later
+                self._stopping.wait(POLL_INTERVAL)
+                self.refresh_index()
+                continue
+            try:
+                handle = win32file.FindFirstChangeNotification(self.layouts_dir, False, flags)
+            except Exception as e:
+                logger.warning(f'Change notifications unavailable ({e}), polling layouts/')
+                self._watch_polling()
+                return
+            try:
+                while not self._stopping.is_set():
+                    result = win32event.WaitForSingleObject(handle, 1000)
+                    if result == win32event.WAIT_OBJECT_0:
+                        self._stopping.wait(SETTLE_DELAY)
+                        self.refresh_index()
+                        win32file.FindNextChangeNotification(handle)
+                    elif not os.path.isdir(self.layouts_dir):
+                        break
+            finally:
+                win32file.FindCloseChangeNotification(handle)
 
     @property
     def enabled(self):
-        return os.path.isfile(os.path.join(self.layouts_dir, 'default.json'))
+        return 'default' in self._index
 
     def has_profile(self, process_name):
-        return os.path.isfile(os.path.join(self.layouts_dir, f'{process_name.lower()}.json'))
+        return process_name.lower() in self._index
 
     def load_layout(self, profile_name):
-        if profile_name in self._layout_cache:
-            return self._layout_cache[profile_name]
+        with self.lock:
+            if profile_name in self._layout_cache:
+                return self._layout_cache[profile_name]
 
         filepath = os.path.join(self.layouts_dir, f'{profile_name}.json')
-        if not os.path.isfile(filepath):
+        if profile_name not in self._index and not os.path.isfile(filepath):
             return None
 
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 layout = json.load(f)
-            self._layout_cache[profile_name] = layout
-            return layout
         except Exception as e:
             logger.error(f'Failed to load layout {filepath}: {e}')
             return None
+        if not isinstance(layout, dict) or not (
+                isinstance(layout.get('pages'), list) or isinstance(layout.get('tiles'), list)):
+            logger.error(f'Layout {filepath} has no pages or tiles, ignoring it')
+            return None
+
+        prepared = None
+        if self.prepare:
+            try:
+                prepared = self.prepare(layout)
+            except Exception as e:
+                logger.error(f'Failed to prepare layout {filepath}: {e}')
+                return None
+        with self.lock:
+            self._layout_cache[profile_name] = layout
+            if prepared is not None:
+                self._prepared[profile_name] = prepared
+        return layout
+
+    def get_prepared(self, profile_name):
+        """Get what prepare() returned for a profile's current file."""
+        with self.lock:
+            return self._prepared.get(profile_name)
 
     def invalidate_cache(self, profile_name=None):
-        if profile_name:
-            self._layout_cache.pop(profile_name, None)
-        else:
-            self._layout_cache.clear()
+        with self.lock:
+            if profile_name:
+                self._layout_cache.pop(profile_name, None)
+            else:
+                self._layout_cache.clear()
 
     def update(self, system_stats):
+        if self._reload_current:
+            # The active profile's file was edited: send the new version
+            with self.lock:
+                self._reload_current = False
+                profile = self._current_profile
+            if profile:
+                self.focus_changed_at = time.monotonic()
+                self._do_switch(profile)
+
         if not self.enabled:
             return
 
         process = system_stats.get('active_process', 'desktop').lower()
-        now = time.time()
+        now = time.monotonic()
 
         target = process if self.has_profile(process) else 'default'
 
@@ -118,6 +267,7 @@ class ProfileManager:
                 return
 
             new_profile = self._pending_profile
+            self.focus_changed_at = self._pending_since
             self._pending_profile = None
             self._pending_since = 0
 
@@ -132,9 +282,12 @@ class ProfileManager:
             old = self._current_profile
             self._current_profile = profile_name
 
-        old_display = old or 'None'
-        logger.info(f'Profile switch: {old_display} -> {profile_name}')
-        print(f'  Profile: {old_display} -> {profile_name}')
+        if old == profile_name:
+            logger.info(f'Profile reloaded: {profile_name}')
+        else:
+            old_display = old or 'None'
+            logger.info(f'Profile switch: {old_display} -> {profile_name}')
+            print(f'  Profile: {old_display} -> {profile_name}')
 
         if self.on_switch:
             try:
@@ -146,6 +299,7 @@ class ProfileManager:
         with self.lock:
             self._pending_profile = None
             self._pending_since = 0
+        self.focus_changed_at = time.monotonic()
         self._do_switch(profile_name)
 
     def get_current_profile(self):
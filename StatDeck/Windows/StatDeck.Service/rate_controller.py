@@ -0,0 +1,254 @@
+"""
+Adaptive stats rate.
+
+With "adaptive_rate" enabled in config.json the tick interval is no longer
+fixed: after every tick the controller looks at how much the tracked values
+moved and picks the next interval between min_ms and max_ms.
+
+    "adaptive_rate": {"enabled": true, "min_ms": 100, "max_ms": 2000,
+                      "track": ["cpu.usage", "network"]}
+
+Movement is measured against each value's full scale: 100 for percentages
+and temperatures, the largest value seen so far for speeds and other
+unbounded values (but at least their FULL_SCALE entry, so an idle link
+jumping from 1 to 3 KB/s stays quiet). A spike (any tracked value moving by
+more than FAST_CHANGE of its full scale) drops straight to the fastest
+rate; quiet ticks stretch the interval gradually towards max_ms. Tracked
+values first go through the same deadband rules as the frames sent to the
+Pi, so jitter those rules hold back doesn't count as movement. "track"
+defaults to every value sent to the Pi.
+
+The interval is also capped by the link: the Pi link reports the bytes it
+wrote and how long the writes blocked, which gives its real throughput
+(the TCP gadget link barely blocks, a 115200 baud serial line does), and
+stats may use at most LINK_SHARE of it. "link_bytes_per_s" sets a fixed
+throughput instead for links that can't be measured. Frames the sender
+had to drop because the link was busy also back the rate off.
+"""
+
+from binary_protocol import flatten_stats
+from deadband import DeadbandFilter
+
+DEFAULT_MIN_MS = 100
+DEFAULT_MAX_MS = 2000
+
+# Change (as a fraction of the value's full scale) that counts as a spike /
+# as quiet
+FAST_CHANGE = 0.2
+QUIET_CHANGE = 0.1
+
+# Full scale by field name (the last part of the source, 'cores' for
+# 'cpu.cores[3]'). Unbounded values scale with the largest value seen, these
+# are only the floors: KB/s for network, MB/s for disk speeds.
+FULL_SCALE = {
+    'usage': 100.0,
+    'percent': 100.0,
+    'cores': 100.0,
+    'temp': 100.0,
+    'download_speed': 1024.0,
+    'upload_speed': 1024.0,
+    'read_speed': 50.0,
+    'write_speed': 50.0,
+}
+# Floor for fields without an entry
+SCALE_FLOOR = 1.0
+
+# Interval growth per quiet tick
+BACKOFF = 1.25
+
+# Fraction of the measured link throughput stats may use
+LINK_SHARE = 0.5
+
+# Ignore throughput samples with less blocking time than this (s)
+MIN_BUSY = 0.005
+
+# Smoothing for the throughput and frame size estimates
+ALPHA = 0.3
+
+
+def field_name(source):
+    """'cpu.cores[3]' -> 'cores'"""
+    return source.rsplit('.', 1)[-1].split('[', 1)[0]
+
+
+class AdaptiveRateController:
+    """Picks the next tick interval from signal activity and link budget."""
+
+    def __init__(self, settings=None):
+        """
+        Initialize the controller.
+
+        Args:
+            settings: Optional "adaptive_rate" config block
+        """
+        self.enabled = False
+        self.min_interval = DEFAULT_MIN_MS / 1000.0
+        self.max_interval = DEFAULT_MAX_MS / 1000.0
+        self.track = None
+        self.link_bytes_per_s = None
+
+        self.interval = self.min_interval
+        self.activity = 0.0
+        self.throughput = None
+        self.frame_bytes = None
+        self.link_limited = 0
+        # Same rules as the frames sent to the Pi, with their own state
+        self.deadband = DeadbandFilter()
+        self._last_values = {}
+        self._peaks = {}
+        self._last_link = None
+
+        self.configure(settings or {})
+
+    def configure(self, settings):
+        """
+        Apply an "adaptive_rate" config block. Missing keys keep their value.
+        """
+        if 'enabled' in settings:
+            self.enabled = bool(settings['enabled'])
+        try:
+            if 'min_ms' in settings:
+                self.min_interval = max(100, int(settings['min_ms'])) / 1000.0
+            if 'max_ms' in settings:
+                self.max_interval = int(settings['max_ms']) / 1000.0
+            if settings.get('link_bytes_per_s') is not None:
+                self.link_bytes_per_s = max(1.0, float(settings['link_bytes_per_s']))
+        except (TypeError, ValueError):
+            pass
+        self.max_interval = max(self.max_interval, self.min_interval)
+        if 'track' in settings:
+            track = settings['track']
+            self.track = [s for s in track if isinstance(s, str)] if isinstance(track, list) else None
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+
+    def get_settings(self):
+        """
+        Get the current settings.
+
+        Returns:
+            dict: "adaptive_rate" config block suitable for config.json
+        """
+        return {
+            'enabled': self.enabled,
+            'min_ms': int(self.min_interval * 1000),
+            'max_ms': int(self.max_interval * 1000),
+            'track': self.track,
+            'link_bytes_per_s': self.link_bytes_per_s
+        }
+
+    def reset(self):
+        """Start over at the fastest rate (enabled, resumed, new layout)."""
+        self.interval = self.min_interval
+        self._last_values = {}
+        self.deadband.reset()
+
+    def scale(self, source, value):
+        """Full scale of a tracked value (see FULL_SCALE)."""
+        peak = max(self._peaks.get(source, 0.0), abs(value))
+        self._peaks[source] = peak
+        return max(FULL_SCALE.get(field_name(source), SCALE_FLOOR), peak)
+
+    def observe(self, data):
+        """
+        Measure how much the tracked values moved since the last call.
+
+        Args:
+            data: Stats dict, already cut down to the tracked sources
+
+        Returns:
+            float: Largest change of any numeric value, as a fraction of
+            its full scale
+        """
+        activity = 0.0
+        values = {}
+        for source, value in flatten_stats(self.deadband.apply(data)):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            values[source] = value
+            scale = self.scale(source, value)
+            previous = self._last_values.get(source)
+            if previous is not None:
+                activity = max(activity, abs(value - previous) / scale)
+        self._last_values = values
+        self.activity = activity
+        return activity
+
+    def observe_link(self, counters):
+        """
+        Update the link estimates from the sender's running counters.
+
+        Args:
+            counters: Dict with 'bytes', 'busy', 'stats_bytes', 'stats_frames'
+                and 'stats_dropped' totals
+
+        Returns:
+            bool: True if stats frames were dropped since the last call
+        """
+        last, self._last_link = self._last_link, dict(counters)
+        if last is None:
+            return False
+        written = counters['bytes'] - last['bytes']
+        busy = counters['busy'] - last['busy']
+        if busy >= MIN_BUSY and written > 0:
+            self.throughput = self._smooth(self.throughput, written / busy)
+        frames = counters['stats_frames'] - last['stats_frames']
+        if frames > 0:
+            self.frame_bytes = self._smooth(self.frame_bytes,
+                                            (counters['stats_bytes'] - last['stats_bytes']) / frames)
+        return counters['stats_dropped'] > last['stats_dropped']
+
+    @staticmethod
+    def _smooth(current, sample):
+        return sample if current is None else current + ALPHA * (sample - current)
+
+    def link_interval(self):
+        """Shortest interval the link budget allows (0 if unknown)."""
+        throughput = self.throughput
+        if self.link_bytes_per_s is not None:
+            throughput = min(throughput or self.link_bytes_per_s, self.link_bytes_per_s)
+        if not throughput or not self.frame_bytes:
+            return 0.0
+        return self.frame_bytes / (throughput * LINK_SHARE)
+
+    def update(self, data, counters=None):
+        """
+        Pick the next tick interval.
+
+        Args:
+            data: This tick's stats, cut down to the tracked sources
+            counters: Pi link counters (see observe_link), or None
+
+        Returns:
+            float: Next interval in seconds
+        """
+        activity = self.observe(data)
+        dropped = self.observe_link(counters) if counters else False
+
+        if dropped:
+            interval = self.interval * BACKOFF
+        elif activity >= FAST_CHANGE:
+            interval = self.min_interval
+        elif activity <= QUIET_CHANGE:
+            interval = self.interval * BACKOFF
+        else:
+            # Moderate movement: head halfway back towards the fastest rate
+            interval = (self.interval + self.min_interval) / 2
+        interval = min(max(interval, self.min_interval), self.max_interval)
+
+        floor = self.link_interval()
+        if floor > interval:
+            interval = min(floor, self.max_interval)
+            self.link_limited += 1
+        self.interval = interval
+        return interval
+
+    def get_stats(self):
+        return {
+            'enabled': self.enabled,
+            'interval_ms': round(self.interval * 1000, 1),
+            'activity': round(self.activity, 3),
+            'throughput_bytes_per_s': round(self.throughput) if self.throughput else None,
+            'frame_bytes': round(self.frame_bytes) if self.frame_bytes else None,
+            'link_interval_ms': round(self.link_interval() * 1000, 1),
+            'link_limited': self.link_limited
+        }
@@ -0,0 +1,132 @@
+"""
+Delta encoding for stats frames on the Pi link.
+
+Instead of the full nested stats dict every tick, only values that changed
+since the previous frame are sent ("stats_delta"). A full "stats" keyframe
+goes out every N frames, after a reconnect, and whenever the Pi asks for
+one. Lists (e.g. cpu.cores) are sent whole when any element changes.
+
+The mode is negotiated: the service announces it in a "hello" message and
+only switches to deltas once the Pi lists "stats_delta" in its
+"hello_ack". Older Pi backends never answer and keep getting full frames.
+"""
+
+# Feature name exchanged in hello / hello_ack
+FEATURE = 'stats_delta'
+
+DEFAULT_KEYFRAME_INTERVAL = 20
+
+
+def diff_stats(old, new):
+    """
+    Compute the changes from one stats dict to the next.
+
+    Args:
+        old: Previously sent stats
+        new: Current stats
+
+    Returns:
+        tuple: (dict of changed values, bool True if a key was removed)
+    """
+    changes = {}
+    removed = False
+    for key, value in new.items():
+        if key not in old:
+            changes[key] = value
+            continue
+        previous = old[key]
+        if isinstance(value, dict) and isinstance(previous, dict):
+            sub_changes, sub_removed = diff_stats(previous, value)
+            removed = removed or sub_removed
+            if sub_changes:
+                changes[key] = sub_changes
+        elif value != previous:
+            changes[key] = value
+    if not removed:
+        removed = any(key not in new for key in old)
+    return changes, removed
+
+
+def apply_delta(state, changes):
+    """
+    Merge a delta into a stats dict in place (reference decoder).
+
+    Args:
+        state: Current full stats
+        changes: The "data" of a stats_delta message
+
+    Returns:
+        dict: The updated state
+    """
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(state.get(key), dict):
+            apply_delta(state[key], value)
+        else:
+            state[key] = value
+    return state
+
+
+class DeltaEncoder:
+    """Turns stats snapshots into keyframe or delta messages."""
+
+    def __init__(self, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        """
+        Initialize the encoder.
+
+        Args:
+            keyframe_interval: Send a full frame at least every N frames
+        """
+        self.keyframe_interval = max(1, int(keyframe_interval))
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        """Forget the Pi's state; the next frame will be a keyframe."""
+        self.last_data = None
+        self.last_seq = None
+        self.frames_since_keyframe = 0
+
+    def force_keyframe(self):
+        """Send a keyframe next (e.g. the Pi lost sync)."""
+        self.last_data = None
+
+    def encode(self, seq, timestamp, data):
+        """
+        Build the wire message for one stats frame.
+
+        Args:
+            seq: Frame sequence number
+            timestamp: Frame timestamp (ms since epoch)
+            data: Full stats dict (not modified)
+
+        Returns:
+            dict: A 'stats' keyframe or a 'stats_delta' message
+        """
+        if self.enabled and self.last_data is not None \
+                and self.frames_since_keyframe < self.keyframe_interval:
+            changes, removed = diff_stats(self.last_data, data)
+            if not removed:
+                message = {
+                    'type': 'stats_delta',
+                    'seq': seq,
+                    'base': self.last_seq,
+                    'timestamp': timestamp,
+                    'data': changes
+                }
+                self.last_data = data
+                self.last_seq = seq
+                self.frames_since_keyframe += 1
+                return message
+
+        self.last_data = data
+        self.last_seq = seq
+        self.frames_since_keyframe = 1
+        message = {
+            'type': 'stats',
+            'seq': seq,
+            'timestamp': timestamp,
+            'data': data
+        }
+        if self.enabled:
+            message['keyframe'] = True
+        return message
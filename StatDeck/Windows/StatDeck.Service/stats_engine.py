@@ -0,0 +1,489 @@
+"""
+StatDeck Stats Engine
+Runs the hardware collectors on tiered refresh periods.
+
+Each collector (and optionally each field) belongs to a sampling tier:
+    fast    - every tick
+    medium  - every few seconds (RAM, CPU temperature)
+    slow    - every half minute or so (disk usage)
+
+Between refreshes the engine serves the collector's cached result, so the
+per-tick syscall count only covers what actually changes quickly.
+
+Tiers are configured through the "sampling" block in config.json and the
+update_tuning IPC message:
+
+    "sampling": {
+        "tiers": {"fast": 0, "medium": 1.0, "slow": 30.0},
+        "collectors": {"ram": "medium"},
+        "fields": {"cpu.temp": "medium", "disk.usage_percent": "slow"}
+    }
+
+Collector and field entries take a tier name or a period in seconds.
+
+Due collectors run in parallel on a small thread pool. Each one has a
+deadline ("deadlines" in the sampling block, seconds, with a "default"
+entry); a collector that misses it (or fails) contributes its last good
+result so the frame still goes out on time, and is listed in the
+snapshot's stale set. The frame itself keeps its shape: the Pi's schema
+doesn't change because a collector was late.
+
+Collection is demand-driven: consumers (the Pi layout, profile switching,
+...) register the data sources they need with set_demand(), and
+collectors or fields nobody asked for are skipped.
+
+Every collection publishes an immutable Snapshot (sequence number,
+timestamp, data). The Pi link and the HTTP server both read the latest
+snapshot, so there is a single set of collector state in the service.
+"""
+
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+# Refresh period in seconds per tier (0 = every tick)
+DEFAULT_TIERS = {
+    'fast': 0.0,
+    'medium': 1.0,
+    'slow': 30.0
+}
+
+DEFAULT_COLLECTOR_TIERS = {
+    'cpu': 'fast',
+    'gpu': 'fast',
+    'ram': 'medium',
+    'disk': 'fast',
+    'network': 'fast',
+    'system': 'fast'
+}
+
+# Fields that change much slower than the rest of their collector
+DEFAULT_FIELD_TIERS = {
+    'cpu.temp': 'medium',
+    'disk.usage_percent': 'slow'
+}
+
+# Seconds a collector may take before its last good value is used instead
+DEFAULT_DEADLINES = {
+    'default': 0.25,
+    'gpu': 0.4
+}
+
+# Smoothing factor for the per-collector average duration
+TIMING_ALPHA = 0.2
+
+
+def select_sources(data, sources):
+    """
+    Cut a stats dict down to some data sources.
+
+    Args:
+        data: Full nested stats dict
+        sources: Paths such as 'cpu.usage', 'gpu.0.temp' or 'network'
+            (a whole collector); None for everything
+
+    Returns:
+        dict: Nested dict with only the requested values (missing paths
+        are left out)
+    """
+    if sources is None:
+        return data
+    result = {}
+    taken = set()
+    # Shortest first, so 'cpu' makes 'cpu.usage' redundant
+    for source in sorted(sources, key=len):
+        keys = source.split('.')
+        if any('.'.join(keys[:i]) in taken for i in range(1, len(keys))):
+            continue
+        taken.add(source)
+        node = data
+        for key in keys:
+            if not isinstance(node, dict) or key not in node:
+                break
+            node = node[key]
+        else:
+            target = result
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+            target[keys[-1]] = node
+    return result
+
+
+class Snapshot:
+    """
+    One published stats frame.
+
+    Snapshots are shared between threads and must be treated as read-only.
+    The JSON encoding of the data is computed once on first use. `stale`
+    names the collectors whose data is a previous (or zero) result.
+    """
+
+    __slots__ = ('seq', 'timestamp', 'monotonic', 'data', 'stale', '_json')
+
+    def __init__(self, seq, data, stale=()):
+        self.seq = seq
+        self.timestamp = int(time.time() * 1000)  # ms since epoch, for the wire
+        self.monotonic = time.monotonic()
+        self.data = data
+        self.stale = frozenset(stale)
+        self._json = None
+
+    def age(self):
+        """Seconds since this snapshot was taken."""
+        return time.monotonic() - self.monotonic
+
+    def to_json(self):
+        """
+        Get the data encoded as JSON.
+
+        Returns:
+            bytes: UTF-8 JSON of the data dict
+        """
+        if self._json is None:
+            self._json = json.dumps(self.data).encode('utf-8')
+        return self._json
+
+
+class StatsEngine:
+    """Collects stats from all collectors, honouring per-collector periods."""
+
+    def __init__(self, collectors, sampling=None):
+        """
+        Initialize the engine.
+
+        Args:
+            collectors: Dict mapping collector name to collector instance
+            sampling: Optional "sampling" config block (see module docstring)
+        """
+        self.collectors = collectors
+        self.tiers = dict(DEFAULT_TIERS)
+        self.collector_tiers = dict(DEFAULT_COLLECTOR_TIERS)
+        self.field_tiers = dict(DEFAULT_FIELD_TIERS)
+        self.deadlines = dict(DEFAULT_DEADLINES)
+
+        # name -> (monotonic time of last refresh, stats dict)
+        self.cache = {}
+        self.lock = Lock()
+
+        # name -> future of a collect() still in flight
+        self.running = {}
+        # Updated from pool threads and the collecting thread: guarded by lock
+        self.timings = {
+            name: {'last_ms': 0.0, 'avg_ms': 0.0, 'max_ms': 0.0,
+                   'runs': 0, 'timeouts': 0, 'errors': 0}
+            for name in collectors
+        }
+
+        # consumer -> set of data sources, or None for "everything"
+        self.demand = {}
+        # consumer -> monotonic time its demand lapses
+        self.demand_expiry = {}
+        # collector name -> set of wanted top-level fields, or None for all
+        self.wanted = {name: None for name in collectors}
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, len(collectors)),
+            thread_name_prefix='collector'
+        )
+
+        # Serializes collect() between the service loop and on-demand refreshes
+        self.collect_lock = Lock()
+        self.seq = 0
+        self.snapshot = None
+
+        self.configure(sampling or {})
+
+    def configure(self, sampling):
+        """
+        Apply a "sampling" config block. Missing keys keep their current value.
+
+        Args:
+            sampling: Dict with optional 'tiers', 'collectors', 'fields'
+                and 'deadlines'
+        """
+        for name, period in (sampling.get('tiers') or {}).items():
+            try:
+                self.tiers[name] = max(0.0, float(period))
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring invalid period for tier {name}: {period}")
+
+        self.collector_tiers.update(sampling.get('collectors') or {})
+        self.field_tiers.update(sampling.get('fields') or {})
+
+        for name, deadline in (sampling.get('deadlines') or {}).items():
+            try:
+                self.deadlines[name] = max(0.01, float(deadline))
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring invalid deadline for {name}: {deadline}")
+
+        # Push field periods down to the collectors
+        for name, collector in self.collectors.items():
+            prefix = name + '.'
+            collector.field_periods = {
+                path[len(prefix):]: self._period(tier)
+                for path, tier in self.field_tiers.items()
+                if path.startswith(prefix)
+            }
+
+    def get_sampling(self):
+        """
+        Get the current sampling configuration.
+
+        Returns:
+            dict: "sampling" config block suitable for config.json
+        """
+        return {
+            'tiers': dict(self.tiers),
+            'collectors': dict(self.collector_tiers),
+            'fields': dict(self.field_tiers),
+            'deadlines': dict(self.deadlines)
+        }
+
+    def _period(self, tier):
+        """Resolve a tier name or a number of seconds to a period."""
+        if isinstance(tier, (int, float)):
+            return max(0.0, float(tier))
+        return self.tiers.get(tier, 0.0)
+
+    def set_demand(self, consumer, sources, ttl=None):
+        """
+        Declare which data sources a consumer needs.
+
+        Args:
+            consumer: Name of the consumer (e.g. 'layout', 'profiles')
+            sources: Iterable of data source paths ('cpu.usage', 'network',
+                'gpu.1.temp'), None for everything, or an empty set to drop
+                the consumer's demand
+            ttl: Optional seconds after which the demand lapses unless renewed
+
+        Returns:
+            bool: True if the effective demand changed
+        """
+        with self.lock:
+            before = self.demand.get(consumer, False)
+            if sources is None:
+                self.demand[consumer] = None
+            elif sources:
+                self.demand[consumer] = set(sources)
+            else:
+                self.demand.pop(consumer, None)
+
+            if ttl and consumer in self.demand:
+                self.demand_expiry[consumer] = time.monotonic() + ttl
+            else:
+                self.demand_expiry.pop(consumer, None)
+
+            changed = self.demand.get(consumer, False) != before
+            if changed:
+                self._resolve_demand()
+            return changed
+
+    def _expire_demand(self):
+        """Drop consumers whose demand TTL has lapsed."""
+        now = time.monotonic()
+        with self.lock:
+            expired = [c for c, t in self.demand_expiry.items() if now >= t]
+            for consumer in expired:
+                self.demand.pop(consumer, None)
+                self.demand_expiry.pop(consumer, None)
+            if expired:
+                self._resolve_demand()
+
+    def _resolve_demand(self):
+        """Turn the consumers' data sources into per-collector field sets."""
+        if not self.demand or any(s is None for s in self.demand.values()):
+            wanted = {name: None for name in self.collectors}
+        else:
+            wanted = {}
+            for sources in self.demand.values():
+                for source in sources:
+                    parts = source.split('.')
+                    name = parts[0]
+                    if name not in self.collectors:
+                        continue
+                    if len(parts) == 1:
+                        wanted[name] = None
+                    elif name not in wanted or wanted[name] is not None:
+                        wanted.setdefault(name, set()).add(parts[1])
+
+        for name, fields in wanted.items():
+            # A cached result only covers the fields wanted when it was taken
+            old = self.wanted.get(name, set())
+            if old is not None and (fields is None or not fields <= old):
+                self.cache.pop(name, None)
+        self.wanted = wanted
+        for name, collector in self.collectors.items():
+            collector.wanted_fields = wanted.get(name)
+
+    def get_demand(self):
+        """
+        Get the collectors and fields currently being collected.
+
+        Returns:
+            dict: collector name -> sorted field list, or None for all fields
+        """
+        with self.lock:
+            return {name: (sorted(fields) if fields is not None else None)
+                    for name, fields in self.wanted.items()}
+
+    def _deadline(self, name):
+        return self.deadlines.get(name, self.deadlines.get('default', 0.25))
+
+    def latest(self):
+        """
+        Get the most recently published snapshot.
+
+        Returns:
+            Snapshot: Latest snapshot, or None before the first collection
+        """
+        return self.snapshot
+
+    def refresh(self, max_age=0.0):
+        """
+        Get a snapshot no older than max_age, collecting one if needed.
+
+        Returns:
+            Snapshot: A fresh enough snapshot
+        """
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.age() > max_age:
+            self.collect()
+            snapshot = self.snapshot
+        return snapshot
+
+    def collect(self):
+        """
+        Collect one stats frame and publish it as the latest snapshot.
+
+        Collectors no consumer needs are skipped. Collectors whose period
+        has not elapsed contribute their cached result instead of being
+        run. The rest run in parallel; any that miss their deadline (or are
+        still stuck from an earlier tick) contribute their last good result
+        and are listed in the snapshot's stale set.
+
+        Returns:
+            dict: Stats keyed by collector name
+        """
+        with self.collect_lock:
+            self._expire_demand()
+            data, stale = self._collect()
+            self.seq += 1
+            self.snapshot = Snapshot(self.seq, data, stale)
+            return data
+
+    def _collect(self):
+        now = time.monotonic()
+        stats = {}
+        stale = set()
+        pending = {}
+        with self.lock:
+            wanted = self.wanted
+
+        for name, collector in self.collectors.items():
+            if name not in wanted:
+                continue
+            period = self._period(self.collector_tiers.get(name, 'fast'))
+            with self.lock:
+                cached = self.cache.get(name)
+            if cached is not None and period and now - cached[0] < period:
+                stats[name] = cached[1]
+                continue
+
+            in_flight = self.running.get(name)
+            if in_flight is not None and not in_flight.done():
+                stats[name] = self._last_good(name)
+                stale.add(name)
+                continue
+
+            future = self.executor.submit(self._run_collector, name, collector)
+            self.running[name] = future
+            pending[name] = (future, now + self._deadline(name))
+
+        for name, (future, deadline) in pending.items():
+            try:
+                result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FuturesTimeout:
+                with self.lock:
+                    self.timings[name]['timeouts'] += 1
+                logger.debug(f"Collector {name} missed its {self._deadline(name)}s deadline")
+                result = None
+            if result is None:
+                result = self._last_good(name)
+                stale.add(name)
+            stats[name] = result
+
+        # Keep the collectors' declared order in the frame
+        return {name: stats[name] for name in self.collectors if name in stats}, stale
+
+    def _run_collector(self, name, collector):
+        """
+        Run one collector on a pool thread, recording timing and caching the result.
+
+        Returns:
+            dict: The collector's stats, or None if it failed
+        """
+        start = time.monotonic()
+        try:
+            result = collector.collect()
+        except Exception as e:
+            logger.debug(f"Collector {name} failed: {e}")
+            result = None
+        duration_ms = (time.monotonic() - start) * 1000.0
+
+        with self.lock:
+            timing = self.timings[name]
+            timing['last_ms'] = round(duration_ms, 3)
+            timing['max_ms'] = round(max(timing['max_ms'], duration_ms), 3)
+            if timing['runs']:
+                timing['avg_ms'] = round(timing['avg_ms'] + TIMING_ALPHA * (duration_ms - timing['avg_ms']), 3)
+            else:
+                timing['avg_ms'] = round(duration_ms, 3)
+            timing['runs'] += 1
+            if result is None:
+                # Leave the last good value cached (and retry next tick
+                # rather than serving nothing for the collector's period)
+                timing['errors'] += 1
+                return None
+            # Late results still land here and become the next "last good" value
+            self.cache[name] = (start, result)
+        return result
+
+    def _last_good(self, name):
+        """Last good result for a collector, or its zero stats if it never had one."""
+        with self.lock:
+            cached = self.cache.get(name)
+        return cached[1] if cached else self.collectors[name].zero_stats()
+
+    def get_timings(self):
+        """
+        Get per-collector timing statistics.
+
+        Returns:
+            dict: name -> last/avg/max duration in ms, run, timeout and
+            error counts, and whether the latest snapshot has stale data
+        """
+        snapshot = self.snapshot
+        stale = snapshot.stale if snapshot else ()
+        with self.lock:
+            return {name: dict(timing, stale=name in stale) for name, timing in self.timings.items()}
+
+    def invalidate(self, name=None):
+        """Force a collector (or all collectors) to refresh on the next tick."""
+        with self.lock:
+            if name:
+                self.cache.pop(name, None)
+            else:
+                self.cache.clear()
+
+    def close(self):
+        """Stop the worker pool and release collector resources."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        for collector in self.collectors.values():
+            try:
+                collector.close()
+            except Exception:
+                pass
@@ -0,0 +1,89 @@
+"""
+Test the binary stats framing end to end.
+
+Sends a schema and binary frames through PiNetworkManager to a local
+listening socket, splits the received byte stream and decodes it again.
+"""
+
+import os
+import sys
+import json
+import socket
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from binary_protocol import BinaryStatsEncoder, BinaryStatsDecoder, StreamSplitter
+from usb.network_manager import PiNetworkManager
+
+
+def sample_stats(usage, app='chrome.exe'):
+    return {
+        'cpu': {'usage': usage, 'cores': [10.5, 20.25, 3.0], 'temp': None},
+        'ram': {'used_gb': 11.2, 'percent': 70},
+        'network': {'upload_speed': 0.0, 'download_speed': 1536.4},
+        'system': {'active_app': app, 'is_gaming': False},
+    }
+
+
+def main():
+    print("Testing binary stats protocol...")
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+
+    link = PiNetworkManager(host='127.0.0.1', port=listener.getsockname()[1])
+    link.start()
+    peer, _ = listener.accept()
+    while not link.is_connected():
+        time.sleep(0.01)
+    peer.settimeout(2.0)
+
+    encoder = BinaryStatsEncoder()
+    encoder.enabled = True
+    frames = [sample_stats(12.5), sample_stats(13.75), sample_stats(99, app='game.exe\n')]
+
+    json_bytes = 0
+    binary_bytes = 0
+    for seq, data in enumerate(frames, start=1):
+        schema, frame = encoder.encode(seq, data)
+        if schema:
+            link.send_message(schema)
+        link.send_raw(frame)
+        json_bytes += len(json.dumps({'type': 'stats', 'data': data})) + 1
+        binary_bytes += len(frame)
+
+    splitter = StreamSplitter()
+    decoder = BinaryStatsDecoder()
+    decoded = []
+    schemas = 0
+    while len(decoded) < len(frames):
+        for kind, item in splitter.feed(peer.recv(4096)):
+            if kind == 'json':
+                assert item['type'] == 'stats_schema'
+                decoder.apply_schema(item)
+                schemas += 1
+            else:
+                decoded.append(decoder.decode(item))
+
+    link.stop()
+    peer.close()
+    listener.close()
+
+    for (seq, data), (expected_seq, expected) in zip(decoded, enumerate(frames, start=1)):
+        assert seq == expected_seq, f"seq {seq} != {expected_seq}"
+        assert data == expected, f"frame {seq} mismatch:\n{data}\n{expected}"
+
+    # The int 99 still fits the existing f32 cpu.usage slot, so only the
+    # first frame needs a schema
+    assert schemas == 1, f"expected 1 schema message, got {schemas}"
+
+    print(f"  {len(frames)} frames round-tripped, {schemas} schema message(s)")
+    print(f"  JSON: {json_bytes} bytes, binary: {binary_bytes} bytes")
+    print("\nBinary protocol test passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
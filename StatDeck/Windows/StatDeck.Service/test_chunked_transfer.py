@@ -0,0 +1,145 @@
+"""
+Test chunked layout transfers.
+
+Sends a large config message through PiNetworkManager with chunking on,
+while stats frames keep arriving, then checks that stats were interleaved
+with the chunks, that the message reassembles intact, and that chunk_ack
+rewinds (resend), also after the last chunk went out, and skips ahead
+(resume) as the Pi asks.
+"""
+
+import os
+import sys
+import json
+import zlib
+import base64
+import socket
+import time
+from threading import Event
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from usb.network_manager import PiNetworkManager
+from usb.line_framer import LineFramer
+from usb.chunked_transfer import transfer_id
+
+
+def big_layout(tiles=2000):
+    return {'type': 'config', 'layout': {
+        'pages': [{'tiles': [{'id': f'tile_{i}', 'type': 'text', 'data_source': f'cpu.cores[{i % 16}]',
+                              'style': {'label': 'x' * 40}} for i in range(tiles)]}]
+    }}
+
+
+def read_until(peer, framer, predicate, timeout=5.0):
+    """Collect messages until predicate(messages) holds."""
+    messages = []
+    deadline = time.time() + timeout
+    while not predicate(messages):
+        assert time.time() < deadline, "timed out waiting for the Pi side"
+        try:
+            messages.extend(framer.feed_json(peer.recv(65536)))
+        except socket.timeout:
+            pass
+    return messages
+
+
+def main():
+    print("Testing chunked transfers...")
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+
+    link = PiNetworkManager(host='127.0.0.1', port=listener.getsockname()[1])
+    link.chunk_size = 4096
+    link.start()
+    peer, _ = listener.accept()
+    while not link.is_connected():
+        time.sleep(0.01)
+    peer.settimeout(0.5)
+    framer = LineFramer()
+
+    message = big_layout()
+    payload = (json.dumps(message) + '\n').encode('utf-8')
+    tid = transfer_id(payload.rstrip(b'\n'))
+
+    # Keep a stats frame waiting for the whole upload: encoding one offers
+    # the next, so the sender always has both kinds of work
+    done = Event()
+
+    def encode_stats(n):
+        if n == 3:
+            # Chunks 0-2 are out; pretend chunk 1 arrived corrupted
+            link.chunk_ack({'type': 'chunk_ack', 'id': tid, 'next': 1})
+        if not done.is_set():
+            link.send_stats(n + 1)
+        return [json.dumps({'type': 'stats', 'seq': n}).encode('utf-8') + b'\n']
+    link.stats_encoder = encode_stats
+    link.send_stats(1)
+
+    sent_at = []
+    link.send_raw(payload, lane='config', on_sent=sent_at.append)
+
+    received = {}
+    order = []
+    stream = []
+
+    def complete(messages):
+        for msg in messages[len(stream):]:
+            stream.append(msg)
+            if msg['type'] == 'chunk':
+                order.append(msg['seq'])
+                piece = base64.b64decode(msg['data'])
+                assert zlib.crc32(piece) == msg['crc'], f"bad crc on chunk {msg['seq']}"
+                received[msg['seq']] = piece
+        chunks = [m for m in stream if m['type'] == 'chunk']
+        return chunks and len(received) == chunks[0]['total'] and order[-1] == chunks[0]['total'] - 1
+
+    read_until(peer, framer, complete)
+    done.set()
+
+    chunks = [m for m in stream if m['type'] == 'chunk']
+    total = chunks[0]['total']
+    assert all(m['id'] == tid for m in chunks)
+    rebuilt = json.loads(b''.join(received[i] for i in range(total)))
+    assert rebuilt == message, "reassembled message differs"
+    first = stream.index(chunks[0])
+    last = stream.index(chunks[-1])
+    interleaved = sum(1 for m in stream[first:last] if m['type'] == 'stats')
+    assert interleaved >= last - first - interleaved, "stats frames not interleaved with chunks"
+    assert order[:6] == [0, 1, 2, 1, 2, 3], f"chunks 1-2 should have been resent: {order[:10]}"
+    time.sleep(0.05)
+    assert sent_at, "on_sent not called"
+
+    # A chunk_ack that arrives after every chunk was written still gets
+    # its chunks resent
+    link.chunk_ack({'type': 'chunk_ack', 'id': tid, 'next': total - 3})
+    late = read_until(peer, framer, lambda ms: any(m['type'] == 'chunk' and m['seq'] == total - 1
+                                                   for m in ms))
+    late_order = [m['seq'] for m in late if m['type'] == 'chunk']
+    assert late_order == [total - 3, total - 2, total - 1], f"late resend sent {late_order}"
+    time.sleep(0.05)
+    assert len(sent_at) == 1, "on_sent called again for the resend"
+
+    # Resume: the Pi reports its progress before a layout is re-sent
+    other = (json.dumps(big_layout(2100)) + '\n').encode('utf-8')
+    link.chunk_ack({'type': 'chunk_ack', 'id': transfer_id(other.rstrip(b'\n')), 'next': 7})
+    link.send_raw(other, lane='config')
+    resumed = read_until(peer, framer, lambda ms: any(m['type'] == 'chunk' for m in ms))
+    first_resumed = next(m for m in resumed if m['type'] == 'chunk')
+    assert first_resumed['seq'] == 7, f"resumed at {first_resumed['seq']}"
+
+    stats = link.get_queue_stats()
+    link.stop()
+    peer.close()
+    listener.close()
+
+    print(f"  {len(payload)} bytes in {total} chunks, {interleaved} stats frames interleaved")
+    print(f"  chunks sent: {stats['chunks']['sent']}, resent: {stats['chunks']['resent']}")
+    print("\nChunked transfer test passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Test the config IPC server without the rest of the service.
+
+Connects several clients to a ConfigIPCServer on an ephemeral port, sends
+pipelined and split requests, and checks every reply arrives in order on
+the right connection and that the server shuts down cleanly. Also checks
+that subscriptions are held to the tick rate.
+"""
+
+import os
+import sys
+import json
+import socket
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from event_loop import EventLoop
+from config_ipc import ConfigIPCServer, Subscription
+from stats_engine import Snapshot
+
+
+def echo_handler(client, message):
+    client.send({'type': 'echo', 'n': message.get('n'), 'port': client.addr[1]})
+
+
+class FakeClient:
+    def __init__(self, subscription):
+        self.subscription = subscription
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+        return True
+
+
+def read_replies(sock, count):
+    buffer = b''
+    while buffer.count(b'\n') < count:
+        data = sock.recv(65536)
+        if not data:
+            break
+        buffer += data
+    return [json.loads(line) for line in buffer.split(b'\n') if line]
+
+
+def main():
+    print("Testing config IPC server...")
+
+    threads_before = threading.active_count()
+    loop = EventLoop()
+    server = ConfigIPCServer(loop, echo_handler, port=0)
+    assert server.start(), "could not bind"
+    port = server.sock.getsockname()[1]
+    thread = threading.Thread(target=loop.run, daemon=True)
+    thread.start()
+
+    clients = [socket.create_connection(('127.0.0.1', port)) for _ in range(5)]
+    for sock in clients:
+        sock.settimeout(2.0)
+
+    # Pipelined: 50 requests in one write, plus one split across two writes
+    for sock in clients:
+        sock.sendall(b''.join(json.dumps({'n': n}).encode() + b'\n' for n in range(50)))
+        sock.sendall(b'{"n": ')
+        sock.sendall(b'50}\n')
+
+    for sock in clients:
+        replies = read_replies(sock, 51)
+        assert [r['n'] for r in replies] == list(range(51)), "replies out of order"
+        assert all(r['port'] == sock.getsockname()[1] for r in replies), "reply on wrong client"
+    print(f"  {len(clients)} clients x 51 pipelined requests answered in order")
+
+    # The loop thread started above is the only one: no thread per client
+    threads = threading.active_count()
+    assert threads == threads_before + 1, f"IPC server started {threads - threads_before - 1} thread(s)"
+    print(f"  threads alive: {threads} (1 loop thread for {len(clients)} clients)")
+
+    # A rate faster than the ticks is raised to the tick interval
+    assert Subscription(50, tick_ms=500).rate == 0.5
+    assert Subscription(1000, tick_ms=500).rate == 1.0
+
+    # The snapshot sent on subscribe doesn't hold back the first tick's
+    subscriber = FakeClient(Subscription(500, tick_ms=500))
+    server.send_snapshot(subscriber, Snapshot(1, {}))
+    now = time.monotonic()
+    assert not subscriber.subscription.due(Snapshot(1, {}), now), "same snapshot sent twice"
+    assert subscriber.subscription.due(Snapshot(2, {}), now), "first tick skipped after subscribing"
+    server.send_snapshot(subscriber, Snapshot(2, {}), now)
+    assert not subscriber.subscription.due(Snapshot(3, {}), now + 0.1), "rate not applied"
+    assert [m['seq'] for m in subscriber.sent] == [1, 2]
+
+    clients[0].close()
+    loop.call_soon_threadsafe(server.stop)
+    for sock in clients[1:]:
+        assert sock.recv(1) == b'', "client not closed on stop"
+        sock.close()
+    loop.stop()
+    thread.join(timeout=2.0)
+    assert not thread.is_alive(), "loop did not stop"
+    loop.close()
+
+    print("\nConfig IPC test passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Test write-behind persistence of config.json.
+
+Runs ConfigStore against a temp directory and checks that defaults are used
+when there is no file, that a burst of updates is coalesced into one write,
+that writes go through a temp file and leave none behind, that a failed
+write keeps the change pending and is retried without a further update,
+and that stop() writes whatever is still pending.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config_store
+from config_store import ConfigStore
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    print("Testing config store...")
+    logging.disable(logging.ERROR)
+    tmp_dir = tempfile.mkdtemp(prefix='statdeck-config-')
+    path = os.path.join(tmp_dir, 'config.json')
+    real_replace = os.replace
+    store = None
+
+    try:
+        store = ConfigStore(path, defaults={'port': 5000}, delay=0.05, max_delay=0.5)
+        assert store.load() == {'port': 5000}
+        assert not os.path.exists(path), "load() wrote the defaults"
+        store.start()
+
+        # A burst of slider moves: one write with the final values
+        for i in range(50):
+            store.update({'tuning': {'rate': i}})
+        assert store.is_dirty()
+        assert wait_for(lambda: not store.is_dirty()), "burst never written"
+        assert store.writes == 1, f"{store.writes} writes for one burst"
+        assert read(path) == {'port': 5000, 'tuning': {'rate': 49}}
+        assert os.listdir(tmp_dir) == ['config.json'], os.listdir(tmp_dir)
+
+        # config.json locked by another program: stays dirty and is retried
+        config_store.RETRY_DELAY = 0.1
+        failures = []
+
+        def failing_replace(src, dst):
+            if len(failures) < 2:
+                failures.append(dst)
+                raise PermissionError(13, 'The process cannot access the file')
+            real_replace(src, dst)
+
+        os.replace = failing_replace
+        store.update({'layout': {'tiles': []}})
+        assert wait_for(lambda: len(failures) == 1)
+        assert store.is_dirty() and store.last_error
+        assert read(path)['tuning'] == {'rate': 49}, "failed write touched config.json"
+        # No further update(): the retry timer alone gets it written
+        assert wait_for(lambda: not store.is_dirty()), "failed write never retried"
+        assert len(failures) == 2 and store.last_error is None
+        assert read(path)['layout'] == {'tiles': []}
+        assert os.listdir(tmp_dir) == ['config.json'], os.listdir(tmp_dir)
+        os.replace = real_replace
+
+        # stop() writes a change still inside its quiet period
+        store.delay = store.max_delay = 60.0
+        store.update({'port': 5001})
+        store.stop()
+        assert not store.is_dirty()
+        assert read(path)['port'] == 5001
+
+        # The written file loads back as-is
+        reloaded = ConfigStore(path)
+        assert reloaded.load() == store.snapshot()[1]
+    finally:
+        os.replace = real_replace
+        config_store.RETRY_DELAY = 5.0
+        if store:
+            store.stop()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        logging.disable(logging.NOTSET)
+
+    print(f"  {store.writes} writes, {len(failures)} failed and retried")
+    print("\nConfig store test passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Test CPU usage sampling from cpu_times deltas.
+
+Feeds scripted cpu_times snapshots to CPUCollector and checks the total
+and per-core percentages, that guest time isn't counted twice, that odd
+deltas (counter wrap, a core going offline) are handled, and that
+collect() on the real psutil returns without blocking.
+"""
+
+import os
+import sys
+import time
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import collectors.cpu_collector as cpu_collector
+from collectors.cpu_collector import CPUCollector
+
+CPUTimes = namedtuple('CPUTimes', 'user nice system idle iowait guest guest_nice')
+
+
+def core(user=0.0, system=0.0, idle=0.0, iowait=0.0, guest=0.0):
+    return CPUTimes(user, 0.0, system, idle, iowait, guest, 0.0)
+
+
+class ScriptedTimes:
+    """Stands in for psutil.cpu_times, returning one snapshot per call."""
+
+    def __init__(self, snapshots):
+        self.snapshots = list(snapshots)
+
+    def __call__(self, percpu=False):
+        return self.snapshots.pop(0)
+
+
+def main():
+    print("Testing CPU sampling...")
+
+    # Real psutil: no 100 ms sleeps per tick any more
+    cpu = CPUCollector()
+    start = time.perf_counter()
+    for _ in range(20):
+        stats = cpu.collect()
+    elapsed_ms = (time.perf_counter() - start) * 1000 / 20
+    assert 0.0 <= stats['usage'] <= 100.0
+    assert len(stats['cores']) == stats['core_count']
+    assert elapsed_ms < 50, f"collect() took {elapsed_ms:.1f} ms"
+
+    real_cpu_times = cpu_collector.psutil.cpu_times
+    try:
+        cpu_collector.psutil.cpu_times = ScriptedTimes([
+            # Baseline taken in __init__
+            [core(user=10, idle=90), core(user=0, idle=100)],
+            # Core 0: 3 of 4 s busy; core 1: 1 of 4 s busy (iowait is idle)
+            [core(user=12, system=1, idle=91), core(user=1, idle=102, iowait=1)],
+            # Guest time is already part of user: 2 s busy, not 4
+            [core(user=14, system=1, idle=93, guest=2), core(user=1, idle=106)],
+            # Counters went backwards (wrap/reset): clamp, don't go negative
+            [core(user=1, idle=1), core(user=1, idle=107)],
+            # A core went offline: start over from this snapshot
+            [core(user=2, idle=2)],
+        ])
+        cpu = CPUCollector()
+        cpu.wanted_fields = {'usage', 'cores'}
+
+        stats = cpu.collect()
+        assert stats['cores'] == [75.0, 25.0], stats['cores']
+        assert stats['usage'] == 50.0, stats['usage']
+
+        stats = cpu.collect()
+        assert stats['cores'] == [50.0, 0.0], stats['cores']
+
+        stats = cpu.collect()
+        assert all(0.0 <= c <= 100.0 for c in stats['cores']), stats['cores']
+        assert 0.0 <= stats['usage'] <= 100.0
+
+        stats = cpu.collect()
+        assert stats['cores'] == [0.0] and stats['usage'] == 0.0, stats
+    finally:
+        cpu_collector.psutil.cpu_times = real_cpu_times
+
+    print(f"  collect() took {elapsed_ms:.3f} ms on this machine")
+    print("\nCPU sampling test passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Test the deadband filter.
+
+Feeds jittery per-core usage and disk speeds through DeadbandFilter and the
+delta encoder, and compares the bytes on the wire with and without rules.
+"""
+
+import os
+import sys
+import json
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from deadband import DeadbandFilter, quantize
+from layout_index import CompiledLayout
+from stats_delta import DeltaEncoder
+
+
+def jittery_frames(count, seed=7):
+    rng = random.Random(seed)
+    for i in range(count):
+        # A real jump half way through
+        base = 20.0 if i < count // 2 else 75.0
+        yield {
+            'cpu': {'usage': round(base + rng.uniform(-0.5, 0.5), 1),
+                    'cores': [round(base + rng.uniform(-1.5, 1.5), 1) for _ in range(8)]},
+            'disk': {'read_speed': round(12.0 + rng.uniform(-0.3, 0.3), 2)},
+            'system': {'active_app': 'game.exe'}
+        }
+
+
+def wire_bytes(frames, deadband=None):
+    encoder = DeltaEncoder(keyframe_interval=1000)
+    encoder.enabled = True
+    total = 0
+    sent = []
+    for seq, (now, data) in enumerate(frames, start=1):
+        if deadband:
+            data = deadband.apply(data, now=now)
+        sent.append(data)
+        total += len(json.dumps(encoder.encode(seq, 0, data))) + 1
+    return total, sent
+
+
+def main():
+    print("Testing deadband filter...")
+
+    assert quantize(0.31, 0.1) == 0.3
+    assert quantize(12.26, 0.5) == 12.5
+
+    rules = {
+        'cpu.cores': {'abs': 2.0, 'step': 0.5},
+        'disk': {'rel': 0.05, 'max_silence': 3},
+        'bogus': {'max_silence': 5}
+    }
+    frames = [(i * 0.5, data) for i, data in enumerate(jittery_frames(40))]
+
+    raw, _ = wire_bytes(frames)
+    deadband = DeadbandFilter(rules)
+    filtered, sent = wire_bytes(frames, deadband)
+
+    assert deadband.rule_for('bogus') is None, "rule without a threshold should be dropped"
+    assert deadband.rule_for('cpu.usage') is None
+    assert deadband.rule_for('cpu.cores[3]')['abs'] == 2.0
+
+    cores = [frame['cpu']['cores'][0] for frame in sent]
+    assert all(c * 2 == int(c * 2) for c in cores), "cores not quantized to 0.5"
+    assert len(set(cores[:20])) <= 3, f"core jitter not held: {cores[:20]}"
+    assert cores[-1] > 70, "real change held back"
+
+    # max_silence: the disk speed is refreshed at least every 3 s (6 frames)
+    disk_changes = [i for i in range(1, len(sent))
+                    if sent[i]['disk']['read_speed'] != sent[i - 1]['disk']['read_speed']]
+    assert sent[0]['disk']['read_speed'] == frames[0][1]['disk']['read_speed']
+    assert len(disk_changes) >= 3, f"disk speed not refreshed: {disk_changes}"
+    assert deadband.held > 0
+
+    # Unfiltered sources pass through untouched
+    assert [f['cpu']['usage'] for f in sent] == [d['cpu']['usage'] for _, d in frames]
+
+    # Layout rules: tile rule for one core, top-level block for the rest
+    layout = CompiledLayout({
+        'deadband': {'disk': {'abs': 1}},
+        'pages': [{'tiles': [{'id': 'c2', 'type': 'gauge', 'data_source': 'cpu.cores[2]',
+                              'deadband': {'abs': 5}}]}]
+    })
+    assert layout.deadbands == {'disk': {'abs': 1}, 'cpu.cores[2]': {'abs': 5}}
+
+    print(f"  {len(frames)} frames: {raw} bytes raw, {filtered} bytes with deadbands")
+    print(f"  {deadband.held} values held, {deadband.passed} passed, disk refreshed {len(disk_changes)}x")
+    assert filtered < raw
+    print("\nDeadband test passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
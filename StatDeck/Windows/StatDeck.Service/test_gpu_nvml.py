@@ -0,0 +1,107 @@
+"""
+Test the NVML GPU collector without a GPU.
+
+Drives the collector with a fake NVML shim that mimics the pynvml API for
+two devices, one of which does not support power readings and one of which
+fails a clock reading once.
+"""
+
+import os
+import sys
+import json
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from collectors.gpu_collector_pynvml import GPUCollector
+
+
+class FakeNVML:
+    """Minimal stand-in for the pynvml module."""
+    NVML_TEMPERATURE_GPU = 0
+    NVML_CLOCK_GRAPHICS = 0
+    NVML_CLOCK_MEM = 2
+
+    class NVMLError_NotSupported(Exception):
+        pass
+
+    def __init__(self):
+        self.calls = {}
+        self.gpus = [
+            {'util': 87, 'temp': 71, 'used': 20 * 1024**3, 'total': 24 * 1024**3, 'power': 310500,
+             'clock_errors': 1},
+            {'util': 12, 'temp': 45, 'used': 1 * 1024**3, 'total': 12 * 1024**3, 'power': None},
+        ]
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def nvmlDeviceGetCount(self):
+        return len(self.gpus)
+
+    def nvmlDeviceGetHandleByIndex(self, index):
+        self._count('nvmlDeviceGetHandleByIndex')
+        return index
+
+    def nvmlDeviceGetUtilizationRates(self, handle):
+        return SimpleNamespace(gpu=self.gpus[handle]['util'], memory=0)
+
+    def nvmlDeviceGetTemperature(self, handle, sensor):
+        return self.gpus[handle]['temp']
+
+    def nvmlDeviceGetMemoryInfo(self, handle):
+        gpu = self.gpus[handle]
+        return SimpleNamespace(used=gpu['used'], total=gpu['total'])
+
+    def nvmlDeviceGetPowerUsage(self, handle):
+        self._count('nvmlDeviceGetPowerUsage')
+        if self.gpus[handle]['power'] is None:
+            raise self.NVMLError_NotSupported('Not Supported')
+        return self.gpus[handle]['power']
+
+    def nvmlDeviceGetClockInfo(self, handle, clock):
+        if self.gpus[handle].get('clock_errors'):
+            self.gpus[handle]['clock_errors'] -= 1
+            raise RuntimeError('GPU is lost')
+        return 1950 if clock == self.NVML_CLOCK_GRAPHICS else 10501
+
+    def nvmlShutdown(self):
+        self._count('nvmlShutdown')
+
+
+print("Testing NVML GPU Collector (fake NVML)")
+print("=" * 60)
+
+nvml = FakeNVML()
+collector = GPUCollector(nvml=nvml)
+print(f"\nGPU Available: {collector.gpu_available} ({len(collector.devices)} devices)")
+
+# A transient error skips the metric for one sample only
+first = collector.collect()
+assert 'clock_core' not in first['0'] and first['0']['clock_mem'] == 10501
+assert not collector.devices[0]['unsupported']
+
+start = time.perf_counter()
+for _ in range(100):
+    data = collector.collect()
+elapsed_ms = (time.perf_counter() - start) * 1000 / 100
+print(json.dumps(data, indent=4))
+print(f"collect() took {elapsed_ms:.3f} ms")
+
+assert data['usage'] == 87 and data['temp'] == 71
+assert data['vram_total'] == 36864 and data['count'] == 2
+assert data['1']['temp'] == 45 and 'power' not in data['1']
+assert data['0']['power'] == 310.5 and data['0']['clock_core'] == 1950
+# Handles cached at init; unsupported power only queried once on GPU 1
+assert nvml.calls['nvmlDeviceGetHandleByIndex'] == 2
+assert nvml.calls['nvmlDeviceGetPowerUsage'] == 102
+assert collector.devices[1]['unsupported'] == {'power'}
+print("✓ Handles cached, per-GPU and aggregate keys present")
+
+collector.close()
+assert nvml.calls['nvmlShutdown'] == 1
+assert collector.collect()['usage'] == 0
+print("✓ Shutdown OK")
+
+print("\n" + "=" * 60)
@@ -0,0 +1,68 @@
+"""
+Test newline framing of the Pi link and config IPC streams.
+
+Feeds LineFramer partial lines, several lines at once and over-long lines
+(within one feed and spread over several), and checks that complete lines
+come out whole and in order, that an over-long line is dropped up to its
+newline without losing the line after it, and that feed_json() skips
+malformed lines and anything that isn't a JSON object.
+"""
+
+import os
+import sys
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from usb.line_framer import LineFramer
+
+
+def main():
+    print("Testing line framer...")
+    logging.disable(logging.WARNING)
+
+    framer = LineFramer(max_line=16)
+
+    # A line split across feeds
+    assert framer.feed(b'{"type":') == []
+    assert framer.feed(b' "ping"}\n') == ['{"type": "ping"}']
+
+    # Several lines in one feed; blank lines and CRLF are dropped
+    assert framer.feed(b'one\r\n\ntwo\n  \nthr') == ['one', 'two']
+    assert framer.feed(b'ee\n') == ['three']
+    assert not framer.buffer
+
+    # Over-long line in one feed: dropped, the next line still delivered
+    assert framer.feed(b'x' * 40 + b'\nafter\n') == ['after']
+    assert framer.overflows == 1
+
+    # Over-long line over several feeds: counted once, buffer stays bounded
+    for _ in range(10):
+        assert framer.feed(b'y' * 12) == []
+        assert len(framer.buffer) <= framer.max_line
+    assert framer.feed(b'yyy\nnext\n') == ['next']
+    assert framer.overflows == 2, framer.overflows
+
+    # A line of exactly max_line bytes is fine
+    assert framer.feed(b'z' * 16 + b'\n') == ['z' * 16]
+
+    # reset() drops a partial line
+    framer.feed(b'half a mess')
+    framer.reset()
+    assert framer.feed(b'age\nwhole\n') == ['age', 'whole']
+
+    # feed_json: malformed and non-object lines are skipped
+    framer = LineFramer()
+    messages = framer.feed_json(
+        b'{"type": "hello"}\nnot json\n[1, 2]\n"text"\n42\nnull\n{"type": "ping"}\n'
+    )
+    assert messages == [{'type': 'hello'}, {'type': 'ping'}], messages
+
+    logging.disable(logging.NOTSET)
+    print(f"  overflows counted: 2, messages kept: {len(messages)} of 7")
+    print("\nLine framer test passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Test the adaptive stats rate.
+
+Feeds idle noise (a few percent of CPU jitter, a trickle of network and
+disk traffic) through AdaptiveRateController and checks that the interval
+backs off to max_ms, that a real spike drops it straight to min_ms, and
+that jitter a deadband rule holds back doesn't count as movement.
+"""
+
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rate_controller import AdaptiveRateController, QUIET_CHANGE
+
+
+def idle_frame(rng):
+    return {
+        'cpu': {'usage': round(rng.uniform(1, 6), 1),
+                'cores': [round(rng.uniform(0, 8), 1) for _ in range(8)],
+                'temp': round(rng.uniform(44, 46), 1)},
+        'ram': {'percent': round(rng.uniform(41, 42), 1)},
+        'network': {'download_speed': round(rng.uniform(0, 12), 1),
+                    'upload_speed': round(rng.uniform(0, 4), 1)},
+        'disk': {'read_speed': round(rng.uniform(0, 0.8), 2),
+                 'write_speed': round(rng.uniform(0, 1.5), 2)}
+    }
+
+
+def main():
+    print("Testing adaptive rate...")
+    rng = random.Random(3)
+
+    rate = AdaptiveRateController({'enabled': True, 'min_ms': 100, 'max_ms': 2000})
+    intervals = [rate.update(idle_frame(rng)) for _ in range(40)]
+    assert intervals[-1] == rate.max_interval, f"idle noise kept the rate at {intervals[-1] * 1000:.0f} ms"
+    assert max(rate.observe(idle_frame(rng)) for _ in range(20)) <= QUIET_CHANGE
+
+    # A real spike: a download starts
+    frame = idle_frame(rng)
+    frame['network']['download_speed'] = 40000.0
+    assert rate.update(frame) == rate.min_interval, "spike didn't drop to min_ms"
+
+    # After that, the download's own jitter is small against its peak
+    for _ in range(40):
+        frame = idle_frame(rng)
+        frame['network']['download_speed'] = round(rng.uniform(38000, 42000), 1)
+        interval = rate.update(frame)
+    assert interval == rate.max_interval, "steady download kept the rate up"
+
+    # Jitter a deadband rule holds back is not movement
+    rate.reset()
+    rate.deadband.configure({'cpu.usage': {'abs': 30}})
+    for i in range(20):
+        rate.update({'cpu': {'usage': 20.0 if i % 2 else 40.0}})
+    assert rate.interval == rate.max_interval, "held jitter counted as activity"
+    rate.deadband.configure({})
+    rate.reset()
+    rate.update({'cpu': {'usage': 20.0}})
+    assert rate.update({'cpu': {'usage': 40.0}}) == rate.min_interval
+
+    print(f"  idle noise: {intervals[0] * 1000:.0f} ms -> {intervals[-1] * 1000:.0f} ms "
+          f"after {len(intervals)} ticks")
+    print("\nAdaptive rate test passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
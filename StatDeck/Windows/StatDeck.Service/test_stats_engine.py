@@ -0,0 +1,114 @@
+"""
+Test the stats engine's tiers, deadlines and stale fallback.
+
+Runs StatsEngine over fake collectors and checks that a collector on a
+slower tier is served from cache within its period, that one missing its
+deadline (or failing) contributes its last good result (or its zero stats
+before it ever had one) and is listed in the snapshot's stale set, that a
+failed collector is retried on the next tick, and that the frame itself
+never grows a 'stale' key.
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from collectors.base_collector import BaseCollector
+from stats_engine import StatsEngine
+
+
+class CountingCollector(BaseCollector):
+    """Returns {'runs': n}, optionally after a delay or by raising."""
+
+    def __init__(self, delay=0.0):
+        super().__init__()
+        self.delay = delay
+        self.runs = 0
+        self.fail = False
+        self.release = threading.Event()
+
+    def collect(self):
+        self.runs += 1
+        if self.delay:
+            self.release.wait(self.delay)
+        if self.fail:
+            raise RuntimeError("sensor went away")
+        return {'runs': self.runs}
+
+    def zero_stats(self):
+        return {'runs': 0}
+
+
+def main():
+    print("Testing stats engine...")
+
+    fast = CountingCollector()
+    medium = CountingCollector()
+    slow = CountingCollector(delay=2.0)
+    flaky = CountingCollector()
+    engine = StatsEngine(
+        {'cpu': fast, 'ram': medium, 'gpu': slow, 'disk': flaky},
+        {'tiers': {'medium': 60.0},
+         'collectors': {'cpu': 'fast', 'ram': 'medium', 'gpu': 'fast', 'disk': 'fast'},
+         'deadlines': {'default': 0.5, 'gpu': 0.05}}
+    )
+    try:
+        data = engine.collect()
+        snapshot = engine.latest()
+        assert list(data) == ['cpu', 'ram', 'gpu', 'disk'], list(data)
+        assert data['cpu'] == {'runs': 1}
+        # Late before it ever finished: zero stats, not a missing key
+        assert data['gpu'] == {'runs': 0}, data['gpu']
+        assert snapshot.stale == {'gpu'}, snapshot.stale
+        assert 'stale' not in data and b'stale' not in snapshot.to_json()
+
+        # Still stuck from the last tick: not resubmitted, still stale
+        data = engine.collect()
+        assert data['cpu'] == {'runs': 2}
+        assert data['ram'] == {'runs': 1}, "medium tier re-ran within its period"
+        assert slow.runs == 1 and engine.latest().stale == {'gpu'}
+
+        # The late result lands in the cache and becomes the last good value
+        slow.release.set()
+        slow.delay = 0.0
+        deadline = time.monotonic() + 2.0
+        while engine.running['gpu'].running() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        data = engine.collect()
+        assert data['gpu'] == {'runs': 2} and not engine.latest().stale
+
+        # A failing collector keeps its last good value and is retried
+        flaky.fail = True
+        data = engine.collect()
+        assert data['disk'] == {'runs': 3}, data['disk']
+        assert engine.latest().stale == {'disk'}
+        data = engine.collect()
+        assert flaky.runs == 5, "failed collector not retried next tick"
+        flaky.fail = False
+        data = engine.collect()
+        assert data['disk'] == {'runs': 6} and not engine.latest().stale
+
+        timings = engine.get_timings()
+        assert timings['gpu']['timeouts'] >= 1, timings['gpu']
+        assert timings['disk']['errors'] == 2, timings['disk']
+        assert timings['ram']['runs'] == 1
+        assert not any(t['stale'] for t in timings.values())
+
+        # invalidate() forces a medium-tier collector to refresh
+        engine.invalidate('ram')
+        assert engine.collect()['ram'] == {'runs': 2}
+    finally:
+        slow.release.set()
+        engine.close()
+
+    print(f"  {engine.seq} snapshots, gpu timeouts: {timings['gpu']['timeouts']}, "
+          f"disk errors: {timings['disk']['errors']}")
+    print("\nStats engine test passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Fixed-rate tick scheduling for stats collection.
+
+Ticks are phase-locked to absolute time.monotonic() deadlines
+(start + n * interval) instead of "interval after the last tick started",
+so collection time and wakeup slack don't accumulate into drift, and wall
+clock changes don't matter. When a tick overruns, the missed deadlines are
+skipped rather than fired back to back.
+
+Tick lateness (how long after its deadline a tick started) and duration
+are kept in running histograms for get_status.
+"""
+
+import bisect
+import time
+from threading import Lock
+
+# Histogram bucket upper bounds (ms); the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class Histogram:
+    """Running histogram of millisecond values with fixed buckets."""
+
+    def __init__(self, bounds=BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value_ms):
+        self.counts[bisect.bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (ms)."""
+        if not self.count:
+            return None
+        target = self.count * p / 100.0
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.bounds[index] if index < len(self.bounds) else round(self.max, 2)
+        return round(self.max, 2)
+
+    def summary(self):
+        labels = [f'<={b}' for b in self.bounds] + [f'>{self.bounds[-1]}']
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 2) if self.count else None,
+            'max': round(self.max, 2),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': {label: n for label, n in zip(labels, self.counts) if n}
+        }
+
+
+class TickScheduler:
+    """Computes tick deadlines and records how well they were met."""
+
+    def __init__(self, interval):
+        """
+        Initialize the scheduler.
+
+        Args:
+            interval: Tick period in seconds
+        """
+        self.interval = interval
+        self.next_deadline = None
+        self.ticks = 0
+        self.skipped = 0
+        self.lateness = Histogram()
+        self.duration = Histogram()
+        self._tick_start = None
+        self._lock = Lock()
+
+    def restart(self, now=None):
+        """Re-phase so the next tick is due now (start, resume)."""
+        self.next_deadline = time.monotonic() if now is None else now
+
+    def set_interval(self, interval):
+        """Change the period, keeping the phase of the next deadline."""
+        if self.next_deadline is not None:
+            self.next_deadline += interval - self.interval
+        self.interval = interval
+
+    def begin(self, now=None):
+        """Mark the start of a tick."""
+        now = time.monotonic() if now is None else now
+        if self.next_deadline is None:
+            self.next_deadline = now
+        self._tick_start = now
+        with self._lock:
+            self.lateness.add(max(0.0, now - self.next_deadline) * 1000)
+
+    def end(self, now=None):
+        """
+        Mark the end of a tick and advance to the next deadline.
+
+        Returns:
+            float: Next deadline (time.monotonic() seconds)
+        """
+        now = time.monotonic() if now is None else now
+        deadline = self.next_deadline + self.interval
+        if deadline <= now:
+            # Overran: skip the deadlines already in the past
+            missed = int((now - deadline) // self.interval) + 1
+            deadline += missed * self.interval
+            self.skipped += missed
+        self.next_deadline = deadline
+        with self._lock:
+            self.ticks += 1
+            if self._tick_start is not None:
+                self.duration.add((now - self._tick_start) * 1000)
+        return deadline
+
+    def get_stats(self):
+        """
+        Get tick timing statistics.
+
+        Returns:
+            dict: interval, tick/skip counts and lateness/duration histograms
+        """
+        with self._lock:
+            return {
+                'interval_ms': round(self.interval * 1000, 1),
+                'ticks': self.ticks,
+                'skipped': self.skipped,
+                'lateness_ms': self.lateness.summary(),
+                'duration_ms': self.duration.summary()
+            }
@@ -0,0 +1,85 @@
+"""
+Chunked transfer of large messages over the Pi link.
+
+A layout with embedded images can be megabytes of JSON. Written as one line
+it holds up every stats frame queued behind it, and a link that drops
+halfway means starting over. Once the Pi acknowledges the "chunked"
+feature, messages larger than one chunk are sent as a series of
+
+    {"type": "chunk", "id": "1a2b3c4d-5e6f", "seq": 0, "total": 12,
+     "crc": 3735928559, "data": "<base64>"}
+
+lines, which the sender interleaves with stats frames. "crc" is the CRC-32
+of the decoded chunk. The id is derived from the content (CRC-32 and length
+of the whole message), so a layout that is re-sent after a reconnect gets
+the same id. The Pi keeps partial transfers across reconnects and answers
+with
+
+    {"type": "chunk_ack", "id": "1a2b3c4d-5e6f", "next": 7}
+
+to say where to resume, and also to ask for a resend from "next" when a
+chunk arrives corrupted or out of order.
+"""
+
+import json
+import zlib
+import base64
+
+FEATURE = 'chunked'
+
+# Raw bytes per chunk. Small enough that a stats frame never waits long
+# behind one, large enough that per-chunk overhead stays negligible.
+DEFAULT_CHUNK_SIZE = 16 * 1024
+
+
+def transfer_id(data):
+    """Content-derived id of a message (bytes)."""
+    return f'{zlib.crc32(data):08x}-{len(data):x}'
+
+
+class OutgoingTransfer:
+    """A message being sent chunk by chunk."""
+
+    def __init__(self, data, chunk_size=DEFAULT_CHUNK_SIZE, on_sent=None):
+        """
+        Initialize the transfer.
+
+        Args:
+            data: The complete message (a JSON line, as bytes)
+            chunk_size: Raw bytes per chunk
+            on_sent: Callback for when the last chunk has been written
+        """
+        # The trailing newline is framing, not content
+        self.data = bytes(data).rstrip(b'\n')
+        self.chunk_size = chunk_size
+        self.id = transfer_id(self.data)
+        self.total = max(1, -(-len(self.data) // chunk_size))
+        self.next_seq = 0
+        self.on_sent = on_sent
+
+    def done(self):
+        return self.next_seq >= self.total
+
+    def seek(self, seq):
+        """Continue from chunk seq (resume or resend)."""
+        self.next_seq = max(0, min(int(seq), self.total))
+
+    def next_chunk(self):
+        """
+        Encode the next chunk and advance.
+
+        Returns:
+            bytes: A complete JSON line
+        """
+        seq = self.next_seq
+        piece = self.data[seq * self.chunk_size:(seq + 1) * self.chunk_size]
+        self.next_seq += 1
+        message = {
+            'type': 'chunk',
+            'id': self.id,
+            'seq': seq,
+            'total': self.total,
+            'crc': zlib.crc32(piece),
+            'data': base64.b64encode(piece).decode('ascii')
+        }
+        return (json.dumps(message) + '\n').encode('utf-8')
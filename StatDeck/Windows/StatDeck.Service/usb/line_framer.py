@@ -0,0 +1,107 @@
+"""
+Newline-delimited message framing for byte streams.
+
+Used for the Pi link and the config IPC connections. Data accumulates in a
+bytearray; each feed() returns every complete line at once and only those
+lines are decoded. Lines longer than max_line are discarded (up to their
+terminating newline) so a misbehaving peer can't grow the buffer without
+bound.
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Layouts with embedded images can be large; anything beyond this is junk
+DEFAULT_MAX_LINE = 4 * 1024 * 1024
+
+
+class LineFramer:
+    """Splits a byte stream into complete lines."""
+
+    def __init__(self, max_line=DEFAULT_MAX_LINE):
+        """
+        Initialize the framer.
+
+        Args:
+            max_line: Maximum line length in bytes (without the newline)
+        """
+        self.max_line = max_line
+        self.buffer = bytearray()
+        self.overflows = 0
+        self._scanned = 0       # bytes of buffer already searched for '\n'
+        self._discarding = False
+
+    def reset(self):
+        """Drop any partial line (e.g. after a reconnect)."""
+        self.buffer.clear()
+        self._scanned = 0
+        self._discarding = False
+
+    def feed(self, data):
+        """
+        Add received bytes.
+
+        Args:
+            data: Bytes from recv()
+
+        Returns:
+            list: Complete, non-empty lines as str (whitespace stripped)
+        """
+        self.buffer += data
+        lines = []
+        start = 0
+        while True:
+            newline = self.buffer.find(b'\n', max(start, self._scanned))
+            if newline < 0:
+                break
+            if self._discarding:
+                # Tail of an over-long line
+                self._discarding = False
+            elif newline - start > self.max_line:
+                self._overflow()
+            else:
+                line = bytes(self.buffer[start:newline]).strip()
+                if line:
+                    lines.append(line.decode('utf-8', errors='replace'))
+            start = newline + 1
+            self._scanned = start
+
+        if start:
+            del self.buffer[:start]
+        self._scanned = len(self.buffer)
+
+        if len(self.buffer) > self.max_line:
+            if not self._discarding:
+                self._overflow()
+            self._discarding = True
+            self.buffer.clear()
+            self._scanned = 0
+        return lines
+
+    def feed_json(self, data):
+        """
+        Add received bytes and parse every complete line as JSON.
+
+        Malformed lines, and lines that aren't a JSON object (messages are
+        always objects), are logged and skipped.
+
+        Returns:
+            list: Decoded messages (dicts)
+        """
+        messages = []
+        for line in self.feed(data):
+            try:
+                message = json.loads(line)
+            except ValueError:
+                message = None
+            if isinstance(message, dict):
+                messages.append(message)
+            else:
+                logger.warning(f"Discarding malformed message: {line[:80]!r}")
+        return messages
+
+    def _overflow(self):
+        self.overflows += 1
+        logger.warning(f"Discarding message longer than {self.max_line} bytes")
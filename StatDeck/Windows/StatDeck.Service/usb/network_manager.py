@@ -0,0 +1,442 @@
+"""
+TCP communication manager for the Raspberry Pi over USB Gadget Mode (Network).
+
+Connecting (mDNS lookup of missioncontrol.local plus the TCP handshake) can
+block for seconds while the Pi is unplugged, so it never happens on the
+caller's thread: a background thread reconnects with exponential backoff
+and jitter, and sends while disconnected fail immediately.
+
+Writing doesn't happen on the caller's thread either. Outgoing messages go
+into lanes drained by a sender thread, in priority order:
+
+    control  small protocol messages (hello, get_layout, ...) - reliable, ordered
+    config   layouts - reliable, ordered
+    stats    a single slot - a newer frame replaces one not yet sent
+
+Stats are handed over unencoded and only encoded (via stats_encoder) when
+the sender picks them up, so a coalesced frame never breaks delta/schema
+state. A stalled Pi therefore costs dropped frames, not growing latency.
+
+With chunk_size set (the Pi acknowledged chunked transfers), config
+messages larger than a chunk are split (see chunked_transfer.py) and the
+sender alternates between their chunks and stats frames, so live values
+keep flowing while a layout uploads.
+"""
+
+import json
+import time
+import random
+import socket
+import logging
+from collections import deque
+from threading import Thread, Lock, Event, Condition
+
+from .line_framer import LineFramer
+from .chunked_transfer import OutgoingTransfer
+
+logger = logging.getLogger(__name__)
+
+# Reconnect backoff (seconds)
+MIN_BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+
+# Reliable lanes, in the order the sender drains them
+LANES = ('control', 'config')
+
+# Give up on a link that accepts no bytes for this long (seconds)
+SEND_STALL_TIMEOUT = 5.0
+
+
+class PiNetworkManager:
+    """Handles direct TCP communication with the Pi over USB Gadget Mode."""
+    def __init__(self, host='missioncontrol.local', port=5556,
+                 min_backoff=MIN_BACKOFF, max_backoff=MAX_BACKOFF):
+        self.host = host
+        self.port = port
+        self.sock = None
+        self.framer = LineFramer()
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        # Called with True/False whenever the link comes up or goes down.
+        # Runs on the reconnect thread (or whichever thread saw the failure).
+        self.on_state_change = None
+
+        # Called on the sender thread with a queued stats item; returns the
+        # list of byte strings to write (None/[] to skip the frame)
+        self.stats_encoder = None
+
+        self._state_lock = Lock()
+        self._wake = Event()
+        self._stopping = Event()
+        self._thread = None
+        self._sender = None
+        self.reconnects = 0
+
+        self._queue_cond = Condition()
+        self._lanes = {lane: deque() for lane in LANES}
+        self._stats_item = None
+        self.sent = {lane: 0 for lane in LANES + ('stats',)}
+        self.dropped = {lane: 0 for lane in LANES + ('stats',)}
+
+        # Split config messages larger than this many bytes (None = never)
+        self.chunk_size = None
+        self._transfer = None
+        # Last completed transfer, kept until the next config message so a
+        # late chunk_ack can still ask for a resend
+        self._finished = None
+        self._last_lane = None
+        # (id, next seq) the Pi reported for a transfer not being sent
+        self._resume = None
+        self.chunks_sent = 0
+        self.chunks_resent = 0
+
+        # Bytes written and seconds spent blocked writing them, which gives
+        # the link's real throughput (see get_link_counters)
+        self.bytes_written = 0
+        self.busy_time = 0.0
+        self.stats_bytes = 0
+
+    def is_connected(self):
+        return self.sock is not None
+
+    def start(self):
+        """Start the background reconnect and sender threads."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = Thread(target=self._reconnect_loop, name='pi-reconnect', daemon=True)
+        self._thread.start()
+        self._sender = Thread(target=self._send_loop, name='pi-sender', daemon=True)
+        self._sender.start()
+
+    def stop(self):
+        """Stop reconnecting and close the link."""
+        self._stopping.set()
+        self._wake.set()
+        with self._queue_cond:
+            self._queue_cond.notify_all()
+        for thread in (self._thread, self._sender):
+            if thread:
+                thread.join(timeout=3.0)
+        self._thread = None
+        self._sender = None
+        self.disconnect()
+
+    def _reconnect_loop(self):
+        backoff = self.min_backoff
+        while not self._stopping.is_set():
+            if self.is_connected():
+                # Sleep until a send/receive failure drops the link
+                self._wake.wait()
+                self._wake.clear()
+                backoff = self.min_backoff
+                continue
+            if self.connect():
+                self.reconnects += 1
+                continue
+            # Full jitter keeps several services from retrying in lockstep
+            delay = random.uniform(backoff / 2, backoff)
+            logger.debug(f"Pi not reachable, retrying in {delay:.1f}s")
+            self._stopping.wait(delay)
+            backoff = min(self.max_backoff, backoff * 2)
+
+    def connect(self):
+        """
+        Try to connect once (blocking).
+
+        Returns:
+            bool: True if connected
+        """
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(2.0)
+            sock.connect((self.host, self.port))
+            sock.settimeout(0.01)
+        except Exception:
+            try: sock.close()
+            except Exception: pass
+            return False
+        with self._state_lock:
+            self.sock = sock
+            self.framer.reset()
+        logger.info(f"Connected to Pi Network at {self.host}:{self.port}")
+        self._notify(True)
+        return True
+
+    def disconnect(self):
+        with self._state_lock:
+            sock, self.sock = self.sock, None
+        if sock is None:
+            return
+        try:
+            sock.close()
+        except Exception:
+            pass
+        logger.info("Pi Network link down")
+        # Queued data was meant for the old connection; the service resyncs
+        # on reconnect
+        self._clear_queues()
+        self._notify(False)
+        # Let the reconnect thread start backing off
+        self._wake.set()
+
+    def _notify(self, connected):
+        if self.on_state_change:
+            try: self.on_state_change(connected)
+            except Exception as e: logger.error(f"Connection state callback failed: {e}")
+
+    def send_message(self, message, lane='control', on_sent=None):
+        data = json.dumps(message) + '\n'
+        return self.send_raw(data.encode('utf-8'), lane, on_sent)
+
+    def send_raw(self, data, lane='control', on_sent=None):
+        """
+        Queue pre-encoded bytes on a reliable lane.
+
+        Args:
+            data: A JSON line or other bytes
+            lane: 'control' or 'config'
+            on_sent: Optional callback, called on the sender thread with the
+                time.monotonic() at which the last byte was handed to the socket
+
+        Returns:
+            bool: True if queued; False right away if the link is down
+        """
+        if self.sock is None:
+            return False
+        with self._queue_cond:
+            self._lanes[lane].append((data, on_sent))
+            self._queue_cond.notify()
+        return True
+
+    def send_stats(self, item):
+        """
+        Offer a stats frame. Replaces any frame still waiting to be sent.
+
+        Args:
+            item: Passed to stats_encoder on the sender thread (or bytes
+                when no encoder is set)
+
+        Returns:
+            bool: True if queued; False right away if the link is down
+        """
+        if self.sock is None:
+            return False
+        with self._queue_cond:
+            if self._stats_item is not None:
+                self.dropped['stats'] += 1
+            self._stats_item = item
+            self._queue_cond.notify()
+        return True
+
+    def get_queue_stats(self):
+        """
+        Get sender queue depths and counters.
+
+        Returns:
+            dict: {'depth': {lane: n}, 'sent': {lane: n}, 'dropped': {lane: n}}
+        """
+        with self._queue_cond:
+            depth = {lane: len(queue) for lane, queue in self._lanes.items()}
+            depth['stats'] = int(self._stats_item is not None)
+            transfer = self._transfer
+            return {
+                'depth': depth,
+                'sent': dict(self.sent),
+                'dropped': dict(self.dropped),
+                'chunks': {
+                    'sent': self.chunks_sent,
+                    'resent': self.chunks_resent,
+                    'transfer': {'id': transfer.id, 'next': transfer.next_seq, 'total': transfer.total}
+                                if transfer else None
+                }
+            }
+
+    def get_link_counters(self):
+        """
+        Get running totals for measuring link throughput.
+
+        Returns:
+            dict: bytes written, seconds blocked writing ('busy'), and the
+            bytes, count and drops of stats frames
+        """
+        return {
+            'bytes': self.bytes_written,
+            'busy': self.busy_time,
+            'stats_bytes': self.stats_bytes,
+            'stats_frames': self.sent['stats'],
+            'stats_dropped': self.dropped['stats']
+        }
+
+    def chunk_ack(self, message):
+        """
+        Handle a chunk_ack from the Pi: resume or resend from its "next".
+
+        Args:
+            message: {'type': 'chunk_ack', 'id': ..., 'next': n}
+        """
+        transfer_id = message.get('id')
+        try:
+            next_seq = int(message.get('next', 0))
+        except (TypeError, ValueError):
+            return
+        with self._queue_cond:
+            transfer = self._transfer
+            finished = self._finished
+            if (transfer is None and finished and finished.id == transfer_id
+                    and next_seq < finished.total):
+                # The last chunk went out before the Pi reported the gap
+                logger.info(f"Resending layout transfer {transfer_id} from chunk "
+                            f"{next_seq}/{finished.total}")
+                transfer = self._transfer = finished
+            if transfer and transfer.id == transfer_id:
+                if next_seq < transfer.next_seq:
+                    self.chunks_resent += transfer.next_seq - next_seq
+                transfer.seek(next_seq)
+                self._queue_cond.notify()
+            else:
+                # The transfer it refers to is (re)queued after this ack
+                self._resume = (transfer_id, next_seq)
+
+    def _clear_queues(self):
+        with self._queue_cond:
+            for lane, queue in self._lanes.items():
+                self.dropped[lane] += len(queue)
+                queue.clear()
+            if self._stats_item is not None:
+                self.dropped['stats'] += 1
+                self._stats_item = None
+            if self._transfer is not None:
+                self.dropped['config'] += 1
+                self._transfer = None
+            self._finished = None
+            self._resume = None
+
+    def _next_item(self):
+        """Wait for the next thing to send, highest priority lane first."""
+        with self._queue_cond:
+            while not self._stopping.is_set():
+                item = self._pick_item()
+                if item:
+                    self._last_lane = item[0]
+                    return item
+                self._queue_cond.wait()
+        return None, None, None
+
+    def _pick_item(self):
+        if self._lanes['control']:
+            data, on_sent = self._lanes['control'].popleft()
+            return 'control', [data], on_sent
+        if self._transfer is None and self._lanes['config']:
+            data, on_sent = self._lanes['config'].popleft()
+            self._finished = None
+            if not self.chunk_size or len(data) <= self.chunk_size:
+                return 'config', [data], on_sent
+            self._start_transfer(data, on_sent)
+        # While a chunked transfer runs, stats get every other turn
+        stats_turn = self._stats_item is not None and self._last_lane == 'chunk'
+        if self._transfer is not None and not stats_turn:
+            transfer = self._transfer
+            data = transfer.next_chunk()
+            self.chunks_sent += 1
+            if not transfer.done():
+                return 'chunk', [data], None
+            self._transfer = None
+            if transfer is self._finished:
+                # End of a resend; the message was already counted as sent
+                return 'chunk', [data], None
+            self._finished = transfer
+            return 'config', [data], transfer.on_sent
+        if self._stats_item is not None:
+            item, self._stats_item = self._stats_item, None
+            return 'stats', item, None
+        return None
+
+    def _start_transfer(self, data, on_sent):
+        transfer = OutgoingTransfer(data, self.chunk_size, on_sent)
+        if self._resume and self._resume[0] == transfer.id:
+            transfer.seek(min(self._resume[1], transfer.total - 1))
+            logger.info(f"Resuming layout transfer {transfer.id} at chunk "
+                        f"{transfer.next_seq}/{transfer.total}")
+        self._resume = None
+        self._transfer = transfer
+
+    def _send_loop(self):
+        while not self._stopping.is_set():
+            lane, item, on_sent = self._next_item()
+            if lane is None:
+                break
+            if lane == 'stats':
+                try:
+                    item = self.stats_encoder(item) if self.stats_encoder else [item]
+                except Exception as e:
+                    logger.error(f"Error encoding stats frame: {e}")
+                    continue
+                if not item:
+                    continue
+            # Chunks count towards their config message: sent once the last
+            # one is written, dropped (by _clear_queues) if the link goes
+            sock = self.sock
+            if sock is None:
+                if lane != 'chunk':
+                    self.dropped[lane] += 1
+                continue
+            started = time.monotonic()
+            try:
+                written = 0
+                for data in item:
+                    self._write(sock, data)
+                    written += len(data)
+            except Exception:
+                if lane != 'chunk':
+                    self.dropped[lane] += 1
+                self.disconnect()
+                continue
+            finished = time.monotonic()
+            self.bytes_written += written
+            self.busy_time += finished - started
+            if lane == 'stats':
+                self.stats_bytes += written
+            if lane == 'chunk':
+                continue
+            self.sent[lane] += 1
+            if on_sent:
+                try: on_sent(finished)
+                except Exception as e: logger.error(f"Send callback failed: {e}")
+
+    def _write(self, sock, data):
+        # The socket has a short timeout for polling reads, so write
+        # piecewise and only give up on a link that is truly stalled
+        view = memoryview(data)
+        deadline = time.monotonic() + SEND_STALL_TIMEOUT
+        while view:
+            try:
+                sent = sock.send(view)
+            except socket.timeout:
+                if time.monotonic() > deadline or self._stopping.is_set():
+                    raise
+                continue
+            view = view[sent:]
+            deadline = time.monotonic() + SEND_STALL_TIMEOUT
+
+    def receive_messages(self):
+        """
+        Read whatever the Pi has sent.
+
+        Returns:
+            list: Every complete message received (possibly empty)
+        """
+        sock = self.sock
+        if sock is None:
+            return []
+        try:
+            data = sock.recv(65536)
+        except socket.timeout:
+            return []
+        except Exception:
+            self.disconnect()
+            return []
+        if not data:
+            self.disconnect()
+            return []
+        return self.framer.feed_json(data)
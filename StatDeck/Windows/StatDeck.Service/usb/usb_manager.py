@@ -1,5 +1,11 @@
 """
 USB communication manager for serial connection to Raspberry Pi.
+
+Legacy transport: the service talks to the Pi over USB gadget networking
+(usb/network_manager.py) and does not construct this class. The negotiated
+link features (delta and binary stats, chunked layouts) and the sender
+lanes only exist on PiNetworkManager; send_raw() here just writes bytes
+that were already encoded.
 """
 
 import serial
@@ -113,6 +119,23 @@ class USBManager:
         Args:
             message: Dictionary to send as JSON
         
+        Returns:
+            bool: True if sent successfully
+        """
+        # Convert to JSON and add newline
+        json_str = json.dumps(message) + '\n'
+        return self.send_raw(json_str.encode('utf-8'))
+    
+    def send_raw(self, data):
+        """
+        Send pre-encoded bytes to the Pi.
+        
+        Used for JSON lines and for binary stats frames (see
+        binary_protocol.py), which share the same serial stream.
+        
+        Args:
+            data: Bytes to write
+        
         Returns:
             bool: True if sent successfully
         """
@@ -122,11 +145,7 @@ class USBManager:
         
         try:
             with self.lock:
-                # Convert to JSON and add newline
-                json_str = json.dumps(message) + '\n'
-                
-                # Send as bytes
-                self.serial.write(json_str.encode('utf-8'))
+                self.serial.write(data)
                 self.serial.flush()
                 
                 return True